@@ -0,0 +1,41 @@
+"""require created_at on paged tables
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 20:12:40.518236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keyset pages seek on (created_at, id), which a NULL created_at would fall outside of
+PAGED_TABLES = ('users', 'disaster_simulations')
+
+
+def upgrade() -> None:
+    for table in PAGED_TABLES:
+        # Rows without a creation time are stamped with the migration time
+        op.execute(f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   nullable=False,
+                   existing_server_default=sa.text('(CURRENT_TIMESTAMP)'))
+
+
+def downgrade() -> None:
+    for table in reversed(PAGED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   nullable=True,
+                   existing_server_default=sa.text('(CURRENT_TIMESTAMP)'))
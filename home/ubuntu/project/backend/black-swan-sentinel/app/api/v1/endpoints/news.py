@@ -1,27 +1,58 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import false, select
+from sqlalchemy.orm import load_only
+from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
+from app.models.news import NewsArticle
+from app.models.loading import NO_RELATIONSHIPS
 from app.models.user import User
+from app.schemas.news import NewsArticleSummary
 
 router = APIRouter()
 
 
-@router.get("/")
+@router.get("/", response_model=List[NewsArticleSummary])
 async def get_news(
+    category: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get latest financial news."""
-    # TODO: Implement news retrieval
-    return {"message": "News monitoring - Coming soon"}
+    
+    # Only the hot (unarchived) slice is scanned, newest first
+    query = (
+        select(NewsArticle)
+        .options(load_only(
+            NewsArticle.id,
+            NewsArticle.title,
+            NewsArticle.url,
+            NewsArticle.source,
+            NewsArticle.category,
+            NewsArticle.sectors_affected,
+            NewsArticle.assets_mentioned,
+            NewsArticle.sentiment,
+            NewsArticle.impact_score,
+            NewsArticle.published_at
+        ), *NO_RELATIONSHIPS)
+        .where(NewsArticle.is_archived == false())
+        .order_by(NewsArticle.published_at.desc())
+        .limit(limit)
+    )
+    if category:
+        query = query.where(NewsArticle.category == category)
+    
+    result = await db.execute(query)
+    return result.scalars().all()
 
 
 @router.get("/alerts")
 async def get_news_alerts(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get news-based alerts."""
     # TODO: Implement news alerts retrieval
@@ -31,7 +62,7 @@ async def get_news_alerts(
 @router.get("/policy-updates")
 async def get_policy_updates(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get policy updates."""
     # TODO: Implement policy updates retrieval
@@ -1,40 +1,114 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List
+import json
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db, get_read_db
 from app.core.deps import get_current_user
+from app.models.loading import NO_RELATIONSHIPS
+from app.models.playbook import DefensePlaybook
+from app.models.portfolio import Portfolio
 from app.models.user import User
+from app.schemas.playbook import PlaybookGenerateRequest, PlaybookResponse, PlaybookSummary
+from app.services.playbook_engine import playbook_engine
+from app.utils.pagination import project
 
 router = APIRouter()
 
 
-@router.post("/generate")
+@router.post("/generate", response_model=PlaybookResponse, status_code=status.HTTP_201_CREATED)
 async def generate_playbook(
+    request: PlaybookGenerateRequest,
+    stream: bool = Query(default=False, description="Stream steps as they are generated"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Generate defense playbook."""
-    # TODO: Implement playbook generation
-    return {"message": "Defense playbook generation - Coming soon"}
+    
+    if request.portfolio_id is not None:
+        result = await db.execute(
+            select(Portfolio.id).where(
+                Portfolio.id == request.portfolio_id,
+                Portfolio.user_id == current_user.id
+            )
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+    
+    if not stream:
+        return await playbook_engine.generate(
+            db,
+            current_user,
+            scenario_type=request.scenario_type,
+            risk_level=request.risk_level,
+            risk_factors=request.risk_factors,
+            portfolio_id=request.portfolio_id
+        )
+    
+    plan = await playbook_engine.prepare(
+        db,
+        current_user,
+        scenario_type=request.scenario_type,
+        risk_level=request.risk_level,
+        risk_factors=request.risk_factors,
+        portfolio_id=request.portfolio_id
+    )
+    playbook = playbook_engine.new_playbook(plan, status="generating")
+    db.add(playbook)
+    await db.commit()
+    playbook_id = playbook.id
+    
+    async def step_stream():
+        # The request session is closed once the response starts, so use our own
+        async with AsyncSessionLocal() as stream_db:
+            yield "[\n"
+            separator = ""
+            async for step in playbook_engine.stream_steps(stream_db, plan, playbook_id):
+                yield separator + json.dumps(step)
+                separator = ",\n"
+            yield "\n]\n"
+    
+    return StreamingResponse(
+        step_stream(),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+        headers={"X-Playbook-Id": str(playbook_id), "Cache-Control": "no-cache"}
+    )
 
 
-@router.get("/")
+@router.get("/", response_model=List[PlaybookSummary])
 async def get_playbooks(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's defense playbooks."""
-    # TODO: Implement playbook retrieval
-    return {"message": "Defense playbooks - Coming soon"}
+    result = await db.execute(
+        select(DefensePlaybook)
+        .options(project(DefensePlaybook, PlaybookSummary), *NO_RELATIONSHIPS)
+        .where(DefensePlaybook.user_id == current_user.id)
+        .order_by(DefensePlaybook.created_at.desc(), DefensePlaybook.id.desc())
+    )
+    return result.scalars().all()
 
 
-@router.get("/{playbook_id}")
+@router.get("/{playbook_id}", response_model=PlaybookResponse)
 async def get_playbook(
     playbook_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get specific playbook."""
-    # TODO: Implement specific playbook retrieval
-    return {"message": "Specific playbook - Coming soon"}
-
+    result = await db.execute(
+        select(DefensePlaybook).options(*NO_RELATIONSHIPS).where(
+            DefensePlaybook.id == playbook_id,
+            DefensePlaybook.user_id == current_user.id
+        )
+    )
+    playbook = result.scalar_one_or_none()
+    
+    if playbook is None:
+        raise HTTPException(status_code=404, detail="Playbook not found")
+    
+    return playbook
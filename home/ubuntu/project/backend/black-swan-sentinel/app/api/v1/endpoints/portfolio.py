@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_user
+from app.models.portfolio import Portfolio, Transaction
 from app.models.user import User
+from app.schemas.portfolio import ImportReportResponse
+from app.services.export import export_response
 
 router = APIRouter()
 
@@ -11,7 +17,7 @@ router = APIRouter()
 @router.get("/")
 async def get_portfolios(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user portfolios."""
     # TODO: Implement portfolio retrieval
@@ -32,7 +38,7 @@ async def create_portfolio(
 async def get_portfolio_holdings(
     portfolio_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get portfolio holdings."""
     # TODO: Implement holdings retrieval
@@ -49,3 +55,53 @@ async def add_transaction(
     # TODO: Implement transaction creation
     return {"message": "Transaction creation - Coming soon"}
 
+
+
+@router.post("/{portfolio_id}/import", response_model=ImportReportResponse)
+async def import_portfolio_data(
+    portfolio_id: int,
+    kind: str = Query(..., pattern="^(transactions|holdings|expenses|income)$"),
+    format: Optional[str] = Query(None, pattern="^(csv|parquet)$"),
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Bulk import transactions, holdings, expenses or income from a CSV or Parquet file."""
+    # pandas is only loaded once the first import arrives, keeping it out of worker startup
+    from app.services.bulk_import import ImportFileError, detect_format, import_file
+    
+    user_id = current_user.id
+    result = await db.execute(
+        select(Portfolio.id).where(Portfolio.id == portfolio_id, Portfolio.user_id == user_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    
+    try:
+        return await import_file(kind, file.file, detect_format(file.filename, format), portfolio_id, user_id)
+    except ImportFileError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+
+@router.get("/{portfolio_id}/export/transactions")
+async def export_transactions(
+    portfolio_id: int,
+    format: str = Query(default="csv", pattern="^(csv|ndjson|parquet)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Download the full transaction history of a portfolio as CSV, NDJSON or Parquet."""
+    result = await db.execute(
+        select(Portfolio.id).where(Portfolio.id == portfolio_id, Portfolio.user_id == current_user.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    
+    return export_response(
+        Transaction, format, f"portfolio-{portfolio_id}-transactions",
+        where=[Transaction.portfolio_id == portfolio_id],
+        order_by=[Transaction.transaction_date, Transaction.id]
+    )
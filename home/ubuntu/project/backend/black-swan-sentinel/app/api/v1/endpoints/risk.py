@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_user
+from app.models.risk import RiskAssessment
 from app.models.user import User
+from app.services.export import export_response
 
 router = APIRouter()
 
@@ -11,7 +13,7 @@ router = APIRouter()
 @router.get("/assessment")
 async def get_risk_assessment(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get latest risk assessment."""
     # TODO: Implement risk assessment retrieval
@@ -31,9 +33,22 @@ async def trigger_risk_scan(
 @router.get("/alerts")
 async def get_risk_alerts(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get active risk alerts."""
     # TODO: Implement risk alerts retrieval
     return {"message": "Risk alerts - Coming soon"}
 
+
+
+@router.get("/export/assessments")
+async def export_risk_assessments(
+    format: str = Query(default="csv", pattern="^(csv|ndjson|parquet)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """Download the full risk assessment history as CSV, NDJSON or Parquet."""
+    return export_response(
+        RiskAssessment, format, "risk-assessments",
+        where=[RiskAssessment.user_id == current_user.id],
+        order_by=[RiskAssessment.assessed_at, RiskAssessment.id]
+    )
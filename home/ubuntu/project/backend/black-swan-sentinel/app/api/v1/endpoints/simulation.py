@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_user
+from app.models.loading import NO_RELATIONSHIPS, SIMULATION_WITH_REPORTS
+from app.models.simulation import DamageReport, DisasterSimulation
 from app.models.user import User
+from app.schemas.pagination import Page
+from app.schemas.simulation import SimulationResponse, SimulationSummary
+from app.services.export import export_response
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, project
 
 router = APIRouter()
 
@@ -21,19 +29,60 @@ async def run_simulation(
 @router.get("/scenarios")
 async def get_scenario_templates(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get available scenario templates."""
     # TODO: Implement scenario templates retrieval
     return {"message": "Scenario templates - Coming soon"}
 
 
-@router.get("/history")
+@router.get("/history", response_model=Page[SimulationSummary])
 async def get_simulation_history(
+    cursor: Optional[str] = Query(default=None, description="Cursor from the previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get simulation history, newest first."""
+    query = (
+        select(DisasterSimulation)
+        .options(project(DisasterSimulation, SimulationSummary), *NO_RELATIONSHIPS)
+        .where(DisasterSimulation.user_id == current_user.id)
+    )
+    items, next_cursor = await paginate(db, query, DisasterSimulation, cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/export/damage-reports")
+async def export_damage_reports(
+    format: str = Query(default="csv", pattern="^(csv|ndjson|parquet)$"),
+    current_user: User = Depends(get_current_user)
 ):
-    """Get simulation history."""
-    # TODO: Implement simulation history retrieval
-    return {"message": "Simulation history - Coming soon"}
+    """Download the damage reports of all your simulations as CSV, NDJSON or Parquet."""
+    owned = select(DisasterSimulation.id).where(DisasterSimulation.user_id == current_user.id)
+    return export_response(
+        DamageReport, format, "damage-reports",
+        where=[DamageReport.simulation_id.in_(owned)],
+        order_by=[DamageReport.simulation_id, DamageReport.id]
+    )
+
 
+@router.get("/{simulation_id}", response_model=SimulationResponse)
+async def get_simulation(
+    simulation_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a simulation with its configuration, results and damage reports."""
+    result = await db.execute(
+        select(DisasterSimulation).options(*SIMULATION_WITH_REPORTS).where(
+            DisasterSimulation.id == simulation_id,
+            DisasterSimulation.user_id == current_user.id
+        )
+    )
+    simulation = result.scalar_one_or_none()
+    
+    if simulation is None:
+        raise HTTPException(status_code=404, detail="Simulation not found")
+    
+    return simulation
@@ -0,0 +1,54 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_streaming_user
+from app.core.security import create_stream_ticket
+from app.models.user import User
+from app.schemas.auth import StreamTicket
+from app.services.alert_broker import alert_broker
+
+router = APIRouter()
+
+
+def _format_event(event) -> str:
+    """Serialize an alert event in text/event-stream format."""
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.data, default=str)}\n\n"
+
+
+@router.post("/ticket", response_model=StreamTicket)
+async def create_ticket(current_user: User = Depends(get_current_user)):
+    """Issue a short-lived ticket for opening the alert stream without an Authorization header."""
+    return {
+        "ticket": create_stream_ticket({"sub": current_user.username, "user_id": current_user.id}),
+        "expires_in": settings.alert_stream_ticket_expire_seconds
+    }
+
+
+@router.get("/alerts")
+async def stream_alerts(
+    last_event_id: Optional[int] = Header(default=None, alias="Last-Event-ID"),
+    since: Optional[int] = Query(default=None, description="Resume after this event id"),
+    current_user: User = Depends(get_streaming_user)
+):
+    """Stream the current user's news and risk alerts as server-sent events."""
+    resume_from = last_event_id if last_event_id is not None else since
+    user_id = current_user.id
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        async for event in alert_broker.listen(
+            user_id,
+            resume_from,
+            keepalive=settings.alert_stream_keepalive_seconds
+        ):
+            yield ": keepalive\n\n" if event is None else _format_event(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,36 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from sqlalchemy import delete, select
+from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_user, get_current_admin_user
+from app.models.features import UserFeatures
+from app.models.loading import NO_RELATIONSHIPS
+from app.models.news import NewsSubscription
+from app.models.portfolio import Income
+from app.models.risk import RiskAlert, RiskThreshold
+from app.models.simulation import DisasterSimulation, SimulationResult
 from app.models.user import User
 from app.schemas.auth import UserResponse, UserUpdate
+from app.schemas.pagination import Page
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, project
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=Page[UserResponse])
 async def get_users(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(default=None, description="Cursor from the previous page"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_admin_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get list of users (admin only)."""
-    # TODO: Implement user listing
-    return []
+    """Get list of users, newest first (admin only)."""
+    query = select(User).options(project(User, UserResponse), *NO_RELATIONSHIPS)
+    items, next_cursor = await paginate(db, query, User, cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user by ID (admin only)."""
-    # TODO: Implement user retrieval
-    raise HTTPException(status_code=404, detail="User not found")
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -41,8 +53,30 @@ async def update_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Update user (admin only)."""
-    # TODO: Implement user update
-    raise HTTPException(status_code=404, detail="User not found")
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    changes = user_update.model_dump(exclude_unset=True)
+    unique_fields = {"email": "Email already registered", "username": "Username already taken"}
+    for field, detail in unique_fields.items():
+        if changes.get(field) is not None and changes[field] != getattr(user, field):
+            result = await db.execute(
+                select(User.id).where(getattr(User, field) == changes[field])
+            )
+            if result.scalar_one_or_none() is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=detail
+                )
+    
+    for field, value in changes.items():
+        setattr(user, field, value)
+    
+    # Committing invalidates the cached principal for this user
+    await db.commit()
+    await db.refresh(user)
+    return user
 
 
 @router.delete("/{user_id}")
@@ -52,6 +86,23 @@ async def delete_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete user (admin only)."""
-    # TODO: Implement user deletion
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Rows with no ORM relationship to cascade through; these are deleted
+    # through the session so commit hooks (subscription index, caches) see them go
+    for model in (Income, NewsSubscription, RiskThreshold, RiskAlert):
+        result = await db.execute(select(model).where(model.user_id == user.id))
+        for row in result.scalars():
+            await db.delete(row)
+    await db.execute(delete(UserFeatures).where(UserFeatures.user_id == user.id))
+    await db.execute(
+        delete(SimulationResult).where(
+            SimulationResult.simulation_id.in_(select(DisasterSimulation.id).where(DisasterSimulation.user_id == user.id))
+        )
+    )
+    await db.delete(user)
+    await db.commit()
     return {"message": "User deleted successfully"}
 
@@ -7,7 +7,8 @@ from app.api.v1.endpoints import (
     risk,
     news,
     simulation,
-    playbook
+    playbook,
+    stream
 )
 
 api_router = APIRouter()
@@ -20,4 +21,4 @@ api_router.include_router(risk.router, prefix="/risk", tags=["risk-analysis"])
 api_router.include_router(news.router, prefix="/news", tags=["news-monitoring"])
 api_router.include_router(simulation.router, prefix="/simulation", tags=["disaster-simulation"])
 api_router.include_router(playbook.router, prefix="/playbook", tags=["defense-playbook"])
-
+api_router.include_router(stream.router, prefix="/stream", tags=["live-alerts"])
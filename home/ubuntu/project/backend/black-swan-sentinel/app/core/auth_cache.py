@@ -0,0 +1,90 @@
+"""
+In-process cache of authenticated principals.
+
+Decoded access tokens are memoized by the SHA-256 of the token until their
+`exp`, and user rows are cached by id for a short TTL, so authenticating a
+request normally costs neither a signature check nor a query. Cached users
+are dropped as soon as a commit touches the row; the TTL bounds staleness
+for changes made by other processes or by bulk UPDATE statements.
+"""
+
+import hashlib
+import time
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.core.security import verify_token
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+_token_cache: LRUCache[dict] = LRUCache(maxsize=settings.auth_token_cache_size)
+_user_cache: LRUCache[User] = LRUCache(
+    maxsize=settings.auth_user_cache_size,
+    ttl=settings.auth_user_cache_ttl_seconds
+)
+# Bumped on every invalidation so a read racing a commit is not cached
+_epoch = 0
+
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT, reusing the decoded payload until the token expires."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _token_cache.set(key, payload, ttl=expires_in)
+    return payload
+
+
+def _detached_copy(user: User) -> User:
+    """Copy a user's column values into a detached instance safe to share."""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Return a user attached to `db`, from the cache when possible.
+
+    Cached rows are merged without a SELECT, so changes made to the returned
+    instance are flushed by `db` like any other loaded object.
+    """
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    epoch = _epoch
+    user = await db.get(User, user_id)
+    if user is not None and epoch == _epoch:
+        _user_cache.set(user_id, _detached_copy(user))
+    return user
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a cached user row."""
+    global _epoch
+    _epoch += 1
+    _user_cache.pop(user_id)
+
+
+def clear() -> None:
+    """Drop every cached token and user."""
+    _token_cache.clear()
+    _user_cache.clear()
+
+
+def _invalidate_users(upserted: list, deleted: list) -> None:
+    for user_id in upserted + deleted:
+        invalidate_user(user_id)
+
+
+register_commit_hook(User, _invalidate_users, lambda session, user: user.id)
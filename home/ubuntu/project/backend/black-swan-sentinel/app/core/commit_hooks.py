@@ -0,0 +1,93 @@
+"""
+Post-commit hooks for keeping in-process state in sync with the database.
+
+Changes to registered models are snapshotted while the session flushes and
+handed to the hook only once the surrounding transaction commits, so rolled
+back writes never reach in-memory indexes or caches.
+"""
+
+import logging
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding changes collected since the last commit
+_PENDING_KEY = "commit_hooks_pending"
+
+SnapshotFn = Callable[[Session, Any], Any]
+ApplyFn = Callable[[List[Any], List[Any]], None]
+
+
+class CommitHook:
+    """A snapshot/apply pair registered for one model class."""
+
+    def __init__(self, model: Type, apply: ApplyFn, snapshot: Optional[SnapshotFn] = None):
+        self.model = model
+        self.apply = apply
+        self.snapshot = snapshot or (lambda session, obj: obj)
+
+
+_hooks: List[CommitHook] = []
+
+
+def register_commit_hook(
+    model: Type,
+    apply: ApplyFn,
+    snapshot: Optional[SnapshotFn] = None
+) -> CommitHook:
+    """
+    Run `apply(upserted, deleted)` after every commit touching `model`.
+
+    `snapshot(session, obj)` is called during the flush, while the instance
+    is still attached and its attributes can be read, and its return value is
+    what `apply` receives. It defaults to the instance itself.
+    """
+    hook = CommitHook(model, apply, snapshot)
+    _hooks.append(hook)
+    return hook
+
+
+def _hooks_for(obj: Any) -> List[CommitHook]:
+    return [hook for hook in _hooks if isinstance(obj, hook.model)]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    if not _hooks:
+        return
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in chain(session.new, session.dirty):
+        for hook in _hooks_for(obj):
+            pending.append((hook, False, hook.snapshot(session, obj)))
+    for obj in session.deleted:
+        for hook in _hooks_for(obj):
+            pending.append((hook, True, hook.snapshot(session, obj)))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    grouped: Dict[CommitHook, tuple] = {}
+    for hook, deleted, item in pending:
+        upserts, deletes = grouped.setdefault(hook, ([], []))
+        (deletes if deleted else upserts).append(item)
+
+    for hook, (upserts, deletes) in grouped.items():
+        try:
+            hook.apply(upserts, deletes)
+        except Exception:
+            # A broken hook must never turn a successful commit into an error
+            logger.exception("Commit hook for %s failed", hook.model.__name__)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
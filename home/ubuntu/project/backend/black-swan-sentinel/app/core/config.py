@@ -25,6 +25,25 @@ class Settings(BaseSettings):
         default="sqlite+aiosqlite:///./black_swan_sentinel.db",
         env="DATABASE_URL"
     )
+    database_read_url: Optional[str] = Field(default=None, env="DATABASE_READ_URL")
+    # The schema comes from Alembic migrations; create_all at boot is a development convenience
+    db_create_schema_on_startup: bool = Field(default=False, env="DB_CREATE_SCHEMA_ON_STARTUP")
+    
+    # Connection pool settings (ignored for SQLite)
+    db_pool_size: int = Field(default=10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, env="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    db_statement_cache_size: int = Field(default=500, env="DB_STATEMENT_CACHE_SIZE")  # 0 behind pgbouncer
+    
+    # SQLite production mode (WAL, pragmas, single writer)
+    sqlite_production_mode: bool = Field(default=False, env="SQLITE_PRODUCTION_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", env="SQLITE_SYNCHRONOUS", pattern="^(OFF|NORMAL|FULL|EXTRA)$")
+    sqlite_cache_size_kb: int = Field(default=65536, env="SQLITE_CACHE_SIZE_KB")
+    sqlite_mmap_size_mb: int = Field(default=256, env="SQLITE_MMAP_SIZE_MB")
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_write_batch_size: int = Field(default=100, env="SQLITE_WRITE_BATCH_SIZE")
     
     # Security settings
     secret_key: str = Field(
@@ -36,11 +55,54 @@ class Settings(BaseSettings):
         default=30, 
         env="ACCESS_TOKEN_EXPIRE_MINUTES"
     )
+    auth_token_cache_size: int = Field(default=10000, env="AUTH_TOKEN_CACHE_SIZE")
+    auth_user_cache_size: int = Field(default=10000, env="AUTH_USER_CACHE_SIZE")
+    auth_user_cache_ttl_seconds: float = Field(default=60.0, env="AUTH_USER_CACHE_TTL_SECONDS")
+    password_hash_workers: int = Field(default=4, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_depth: int = Field(default=32, env="PASSWORD_HASH_QUEUE_DEPTH")
     
     # External API settings
     news_api_key: Optional[str] = Field(default=None, env="NEWS_API_KEY")
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
     
+    # LLM settings
+    llm_provider: str = Field(default="openai", env="LLM_PROVIDER")  # openai, fake
+    llm_base_url: str = Field(default="https://api.openai.com/v1", env="LLM_BASE_URL")
+    llm_model: str = Field(default="gpt-4o-mini", env="LLM_MODEL")
+    llm_timeout_seconds: float = Field(default=30.0, env="LLM_TIMEOUT_SECONDS")
+    
+    # Playbook settings
+    playbook_fragment_cache_size: int = Field(
+        default=2048,
+        env="PLAYBOOK_FRAGMENT_CACHE_SIZE"
+    )
+    
+    # Metrics settings
+    metrics_enabled: bool = Field(default=True, env="METRICS_ENABLED")
+    slow_request_threshold_ms: int = Field(default=1000, env="SLOW_REQUEST_THRESHOLD_MS")
+    slow_request_sql_count: int = Field(default=5, env="SLOW_REQUEST_SQL_COUNT")  # Slowest statements logged
+    event_loop_lag_interval_seconds: float = Field(default=0.5, env="EVENT_LOOP_LAG_INTERVAL_SECONDS")
+    # /metrics answers clients in these comma-separated addresses/networks, or any client sending the token
+    metrics_allowed_networks: str = Field(default="127.0.0.1/32,::1/128", env="METRICS_ALLOWED_NETWORKS")
+    metrics_token: Optional[str] = Field(default=None, env="METRICS_TOKEN")
+    
+    # Query audit settings (development and tests: flags N+1 query patterns per request)
+    query_audit_enabled: bool = Field(default=False, env="QUERY_AUDIT_ENABLED")
+    query_audit_repeat_threshold: int = Field(default=5, env="QUERY_AUDIT_REPEAT_THRESHOLD")
+    
+    # Response cache settings
+    response_cache_enabled: bool = Field(default=True, env="RESPONSE_CACHE_ENABLED")
+    response_cache_backend: str = Field(default="memory", env="RESPONSE_CACHE_BACKEND", pattern="^(memory|redis)$")
+    response_cache_redis_url: str = Field(default="redis://localhost:6379/0", env="RESPONSE_CACHE_REDIS_URL")
+    response_cache_size: int = Field(default=4096, env="RESPONSE_CACHE_SIZE")
+    response_cache_ttl_seconds: int = Field(default=300, env="RESPONSE_CACHE_TTL_SECONDS")
+    response_cache_max_body_kb: int = Field(default=512, env="RESPONSE_CACHE_MAX_BODY_KB")
+    
+    # Bulk import/export settings
+    import_chunk_size: int = Field(default=50000, env="IMPORT_CHUNK_SIZE")
+    import_max_errors: int = Field(default=1000, env="IMPORT_MAX_ERRORS")
+    export_chunk_size: int = Field(default=5000, env="EXPORT_CHUNK_SIZE")
+    
     # Risk scanning settings
     risk_scan_interval_hours: int = Field(
         default=6, 
@@ -52,6 +114,60 @@ class Settings(BaseSettings):
         default=10000, 
         env="SIMULATION_ITERATIONS"
     )
+    # Historical crisis replay: `.npz` return series and bootstrap block length (trading days)
+    crisis_data_dir: str = Field(default="./data/crises", env="CRISIS_DATA_DIR")
+    crisis_block_days: int = Field(default=10, env="CRISIS_BLOCK_DAYS")
+    
+    # Cash-flow projection settings
+    cashflow_horizon_months: int = Field(default=24, env="CASHFLOW_HORIZON_MONTHS")
+    
+    # Feature store settings (per-user features for scans, simulations and playbooks)
+    feature_store_cache_size: int = Field(default=50000, env="FEATURE_STORE_CACHE_SIZE")
+    feature_store_max_age_minutes: int = Field(default=60, env="FEATURE_STORE_MAX_AGE_MINUTES")
+    feature_store_refresh_interval_seconds: int = Field(default=60, env="FEATURE_STORE_REFRESH_INTERVAL_SECONDS")
+    feature_store_batch_size: int = Field(default=500, env="FEATURE_STORE_BATCH_SIZE")
+    
+    # In-memory alert routing indexes (subscriptions, holdings); commit hooks keep
+    # them current within a worker, the rebuild picks up bulk writes and other workers
+    index_rebuild_interval_minutes: int = Field(default=10, env="INDEX_REBUILD_INTERVAL_MINUTES")
+    
+    # Alert delivery settings
+    alert_transport: str = Field(default="file", env="ALERT_TRANSPORT")  # file, smtp
+    alert_outbox_dir: str = Field(default="./alert_outbox", env="ALERT_OUTBOX_DIR")
+    alert_immediate_window_seconds: int = Field(
+        default=5,
+        env="ALERT_IMMEDIATE_WINDOW_SECONDS"
+    )
+    digest_daily_hour: int = Field(default=7, env="DIGEST_DAILY_HOUR")  # UTC
+    digest_weekly_day: str = Field(default="mon", env="DIGEST_WEEKLY_DAY")
+    smtp_host: str = Field(default="localhost", env="SMTP_HOST")
+    smtp_port: int = Field(default=1025, env="SMTP_PORT")
+    smtp_sender: str = Field(
+        default="alerts@blackswansentinel.com",
+        env="SMTP_SENDER"
+    )
+    
+    # News retention settings
+    news_retention_days: int = Field(default=90, env="NEWS_RETENTION_DAYS")
+    news_archive_batch_size: int = Field(default=500, env="NEWS_ARCHIVE_BATCH_SIZE")
+    news_archive_interval_minutes: int = Field(
+        default=60,
+        env="NEWS_ARCHIVE_INTERVAL_MINUTES"
+    )
+    
+    # Live alert stream settings
+    alert_stream_history_size: int = Field(
+        default=100,
+        env="ALERT_STREAM_HISTORY_SIZE"
+    )
+    alert_stream_keepalive_seconds: int = Field(
+        default=15,
+        env="ALERT_STREAM_KEEPALIVE_SECONDS"
+    )
+    alert_stream_ticket_expire_seconds: int = Field(
+        default=60,
+        env="ALERT_STREAM_TICKET_EXPIRE_SECONDS"
+    )
     
     # CORS settings - simplified
     cors_origins: str = Field(default="*")
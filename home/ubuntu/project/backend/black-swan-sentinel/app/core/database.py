@@ -1,23 +1,74 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
 from sqlalchemy import MetaData
 
+from app.core import sqlite
 from app.core.config import settings
 
+
+def engine_options(database_url: str) -> dict:
+    """Engine keyword arguments for the configured pooling profile."""
+    options = {"echo": settings.debug, "future": True}
+    url = make_url(database_url)
+    
+    # SQLite keeps SQLAlchemy's default pool; the pool settings only apply to servers
+    if url.get_backend_name() == "sqlite":
+        return options
+    
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if url.get_driver_name() == "asyncpg":
+        # SQLAlchemy's prepared statement cache plus asyncpg's own statement cache
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
+def create_engine_for(database_url: str, read_only: bool = False) -> AsyncEngine:
+    """Create an async engine using the configured pooling profile."""
+    engine = create_async_engine(database_url, **engine_options(database_url))
+    if settings.sqlite_production_mode and sqlite.is_sqlite(database_url):
+        sqlite.configure_engine(engine, read_only=read_only)
+    return engine
+
+
+# SQLite production mode: WAL, tuned pragmas, serialized write transactions, separate readers
+sqlite_mode = settings.sqlite_production_mode and sqlite.is_sqlite(settings.database_url)
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True
-)
+engine = create_engine_for(settings.database_url)
 
-# Create async session factory
+# Optional read replica for heavy read-only endpoints; falls back to the primary,
+# or to a read-only engine on the same file in SQLite production mode
+if settings.database_read_url:
+    read_engine = create_engine_for(settings.database_read_url, read_only=True)
+elif sqlite_mode and sqlite.is_file_database(settings.database_url):
+    read_engine = create_engine_for(settings.database_url, read_only=True)
+else:
+    read_engine = engine
+
+# Create async session factories. Sessions are lazy: a connection is only
+# checked out of the pool when the first statement runs.
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -42,11 +93,17 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db() -> AsyncSession:
+    """Dependency to get a session on the read replica (or the primary if none is configured)."""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         # Import all models to ensure they are registered
-        from app.models import user, portfolio, risk, news, simulation
+        from app.models import user, portfolio, risk, news, simulation, playbook, features
         
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
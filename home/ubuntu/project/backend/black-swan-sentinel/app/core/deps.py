@@ -1,24 +1,24 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.auth_cache import decode_token, load_user
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.security import STREAM_TICKET
 from app.models.user import User
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
-    token = credentials.credentials
-    payload = verify_token(token)
+async def _user_from_payload(payload: dict, db: AsyncSession) -> User:
+    """Resolve a decoded token's claims to an active user."""
     username = payload.get("sub")
+    user_id = payload.get("user_id")
     
     if username is None:
         raise HTTPException(
@@ -26,9 +26,14 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
     
-    # Get user from database
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
+    # Get user from cache or database
+    if user_id is not None:
+        user = await load_user(db, user_id)
+        if user is not None and user.username != username:
+            user = None
+    else:
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalar_one_or_none()
     
     if user is None:
         raise HTTPException(
@@ -45,6 +50,61 @@ async def get_current_user(
     return user
 
 
+def _decode_access_token(token: str) -> dict:
+    """Decode a bearer token, refusing stream tickets."""
+    payload = decode_token(token)
+    if payload.get("type") == STREAM_TICKET:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Stream tickets only authenticate event streams",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get the current authenticated user."""
+    payload = _decode_access_token(credentials.credentials)
+    return await _user_from_payload(payload, db)
+
+
+async def get_streaming_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    ticket: Optional[str] = Query(default=None, description="Ticket from POST /stream/ticket, for clients that cannot set headers")
+) -> User:
+    """
+    Get the current user for long-lived streaming responses.
+
+    The lookup uses its own short-lived session so no database connection is
+    held for the lifetime of the stream. Browsers' EventSource cannot set an
+    Authorization header, so they pass a short-lived stream ticket as
+    `?ticket=` instead; access tokens are never accepted in the URL, where
+    they would end up in access logs.
+    """
+    if credentials is not None:
+        payload = _decode_access_token(credentials.credentials)
+    elif ticket is not None:
+        payload = decode_token(ticket)
+        if payload.get("type") != STREAM_TICKET:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Pass access tokens in the Authorization header",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    async with AsyncSessionLocal() as db:
+        return await _user_from_payload(payload, db)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
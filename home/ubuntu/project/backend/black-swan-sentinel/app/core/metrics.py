@@ -0,0 +1,352 @@
+"""
+Request, database and event-loop metrics in the Prometheus text format.
+
+`MetricsMiddleware` times every HTTP request per route template, tracks
+requests in flight and, through SQLAlchemy cursor events on the primary and
+read engines, how many queries each request ran and how long they took.
+A background task samples event-loop lag. Everything is rendered by
+`render()` for the `/metrics` endpoint, which only answers scrapers that
+`scrape_allowed` accepts, and requests slower than
+SLOW_REQUEST_THRESHOLD_MS are logged through structlog together with their
+slowest SQL statements.
+"""
+
+import asyncio
+import heapq
+import hmac
+import ipaddress
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import structlog
+from sqlalchemy import event
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.database import engine, read_engine
+
+slow_request_logger = structlog.get_logger("app.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Longest SQL text kept for slow-request logs
+_MAX_STATEMENT_LENGTH = 500
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Base for labelled metrics."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Cumulative bucketed observations per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", LATENCY_BUCKETS, ("method", "route")
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",)
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", QUERY_COUNT_BUCKETS, ("method", "route")
+)
+http_request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL per HTTP request.", LATENCY_BUCKETS, ("method", "route")
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", QUERY_BUCKETS, ("engine",)
+)
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds", "Delay of a scheduled event-loop wakeup past its deadline.", LAG_BUCKETS
+)
+
+METRICS: List[Metric] = [
+    http_requests_total,
+    http_request_duration,
+    http_requests_in_flight,
+    http_request_db_queries,
+    http_request_db_duration,
+    db_query_duration,
+    event_loop_lag,
+]
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def _allowed_networks() -> List:
+    return [
+        ipaddress.ip_network(network.strip(), strict=False)
+        for network in settings.metrics_allowed_networks.split(",") if network.strip()
+    ]
+
+
+def scrape_allowed(client_host: Optional[str], authorization: Optional[str]) -> bool:
+    """Whether a scrape comes from an allowed network or carries the metrics token."""
+    if settings.metrics_token and authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(client_host or "")
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks())
+
+
+@dataclass
+class RequestStats:
+    """SQL activity attributed to the current request."""
+    queries: int = 0
+    query_seconds: float = 0.0
+    # Min-heap of (duration, sequence, statement) holding the slowest statements
+    slowest: List[Tuple[float, int, str]] = field(default_factory=list)
+
+    def record(self, duration: float, statement: str, keep: int) -> None:
+        self.queries += 1
+        self.query_seconds += duration
+        item = (duration, self.queries, statement)
+        if len(self.slowest) < keep:
+            heapq.heappush(self.slowest, item)
+        elif keep and duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """SQL stats of the request being served, if any."""
+    return _current_request.get()
+
+
+def instrument_engine(async_engine, label: str) -> None:
+    """Time every statement run on an engine."""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        db_query_duration.observe(duration, label)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.record(duration, statement, settings.slow_request_sql_count)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("metrics_query_start"):
+            connection.info["metrics_query_start"].pop()
+
+
+class LoopLagMonitor:
+    """Background task measuring how late the event loop runs a timer."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            event_loop_lag.observe(max(loop.time() - started - self.interval, 0.0))
+
+
+# Global event-loop lag monitor
+loop_lag_monitor = LoopLagMonitor(settings.event_loop_lag_interval_seconds)
+
+def _route_label(scope) -> str:
+    """Route template for a request; templates keep label cardinality bounded."""
+    route = scope.get("route")
+    if route is None and "app" in scope:
+        # Answered before routing (e.g. by the response cache); match it ourselves
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, in-flight requests and SQL per request."""
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        response = {"status": 500, "content_type": b""}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["content_type"] = dict(message.get("headers", [])).get(b"content-type", b"")
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            http_requests_in_flight.dec(method)
+            _current_request.reset(token)
+            route = _route_label(scope)
+            http_requests_total.inc(method, route, str(response["status"]))
+            http_request_duration.observe(duration, method, route)
+            http_request_db_queries.observe(stats.queries, method, route)
+            http_request_db_duration.observe(stats.query_seconds, method, route)
+
+            # Event streams are long-lived by design
+            if (
+                duration * 1000 >= settings.slow_request_threshold_ms
+                and not response["content_type"].startswith(b"text/event-stream")
+            ):
+                slow_request_logger.warning(
+                    "slow_request",
+                    method=method,
+                    path=scope["path"],
+                    route=route,
+                    status=response["status"],
+                    duration_ms=round(duration * 1000, 1),
+                    db_queries=stats.queries,
+                    db_time_ms=round(stats.query_seconds * 1000, 1),
+                    slowest_sql=[
+                        {"duration_ms": round(seconds * 1000, 2), "sql": statement[:_MAX_STATEMENT_LENGTH]}
+                        for seconds, _, statement in sorted(stats.slowest, reverse=True)
+                    ],
+                )
+
+
+instrument_engine(engine, "primary")
+if read_engine is not engine:
+    instrument_engine(read_engine, "read")
@@ -0,0 +1,143 @@
+"""
+N+1 query detection for development and tests.
+
+Every SQL statement run while an audit is active is normalized to its
+shape (parameters, literals and expanded IN lists collapsed) and counted.
+The same shape running many times within one request is the signature of
+a lazy relationship being loaded row by row. With QUERY_AUDIT_ENABLED the
+middleware audits each request, reports the totals in `X-Query-Count` /
+`X-Query-Repeats` response headers and logs suspected N+1 patterns;
+`assert_max_queries` lets tests pin a code path to a query budget.
+"""
+
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import engine, read_engine
+
+logger = structlog.get_logger("app.query_audit")
+
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|\?|\b\d+(\.\d+)?\b|'(?:[^']|'')*'")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(::\w+)?(\s*,\s*\?(::\w+)?)*\s*\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with parameters, literals and IN lists collapsed, so repeats compare equal."""
+    shape = _POSTCOMPILE.sub("(?)", statement)
+    shape = _PARAMETER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryAudit:
+    """Statements counted by shape within one request or `audit_queries` block."""
+
+    def __init__(self):
+        self.shapes: Counter = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.shapes.values())
+
+    def record(self, statement: str) -> None:
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes run at least `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by `assert_max_queries` when a block runs too many or too repetitive queries."""
+
+
+_current_audit: ContextVar[Optional[QueryAudit]] = ContextVar("current_query_audit", default=None)
+
+
+@contextmanager
+def audit_queries() -> Iterator[QueryAudit]:
+    """Count the statements run in this block (and tasks it starts)."""
+    audit = QueryAudit()
+    token = _current_audit.set(audit)
+    try:
+        yield audit
+    finally:
+        _current_audit.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Iterator[QueryAudit]:
+    """
+    Fail if the block runs more than `max_queries` statements, or any one
+    shape more than `max_repeats` times.
+
+        with assert_max_queries(3, max_repeats=1):
+            await client.get("/api/v1/playbook/")
+    """
+    with audit_queries() as audit:
+        yield audit
+
+    problems = []
+    if max_queries is not None and audit.total > max_queries:
+        problems.append(f"{audit.total} queries (budget {max_queries})")
+    if max_repeats is not None:
+        problems.extend(
+            f"{count}x {shape}" for shape, count in audit.repeated(max_repeats + 1)
+        )
+    if problems:
+        raise QueryBudgetExceeded("Query budget exceeded:\n  " + "\n  ".join(problems))
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    audit = _current_audit.get()
+    if audit is not None:
+        audit.record(statement)
+
+
+for _engine in {engine, read_engine}:
+    event.listen(_engine.sync_engine, "before_cursor_execute", _record_statement)
+
+
+class QueryAuditMiddleware:
+    """ASGI middleware auditing each HTTP request's queries (development and test only)."""
+
+    def __init__(self, app, repeat_threshold: Optional[int] = None):
+        self.app = app
+        self.repeat_threshold = repeat_threshold or settings.query_audit_repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with audit_queries() as audit:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    repeats = audit.repeated(self.repeat_threshold)
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"x-query-count", str(audit.total).encode()),
+                        (b"x-query-repeats", str(sum(count for _, count in repeats)).encode()),
+                    ]}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        repeats = audit.repeated(self.repeat_threshold)
+        if repeats:
+            logger.warning(
+                "n_plus_one_suspected",
+                method=scope["method"],
+                path=scope["path"],
+                queries=audit.total,
+                repeated=[{"count": count, "sql": shape[:500]} for shape, count in repeats],
+            )
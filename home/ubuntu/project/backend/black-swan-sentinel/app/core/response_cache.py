@@ -0,0 +1,356 @@
+"""
+Per-user response cache with ETags for read-heavy GET endpoints.
+
+Cached routes declare the models their responses are built from. Every
+model has a version counter that is bumped after any commit writing to it
+(through the unit of work or a bulk INSERT/UPDATE/DELETE), and the
+current versions are part of the cache key, so a write makes older
+entries unreachable instead of having to find and delete them. Entries
+are keyed by (user, path, query string, versions) and live in an
+in-process LRU or, with RESPONSE_CACHE_BACKEND=redis, in a shared Redis
+so several workers see the same entries and counters. The in-process
+backend only sees its own worker's commits: with several workers an entry
+can be served stale until RESPONSE_CACHE_TTL_SECONDS after another worker's
+write.
+
+Responses carry a strong ETag of the body; a request whose If-None-Match
+matches a cached entry gets a 304 straight from the cache without the
+endpoint running or the body being serialized again.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Type
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.auth_cache import decode_token
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding tables written by bulk statements since the last commit
+_BULK_PENDING_KEY = "response_cache_bulk_pending"
+
+_REDIS_PREFIX = "response-cache:"
+
+
+class CachedResponse(NamedTuple):
+    """A stored 200 response."""
+    etag: str
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class MemoryBackend:
+    """Entries and version counters in this process."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries: LRUCache[CachedResponse] = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        self._entries.set(key, entry)
+
+    async def versions(self, names: Sequence[str]) -> Optional[Tuple[int, ...]]:
+        """Current versions of `names`, or None when the cache must not be used."""
+        return tuple(self._versions.get(name, 0) for name in names)
+
+    def bump(self, names: Iterable[str]) -> None:
+        for name in names:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class RedisBackend(MemoryBackend):
+    """
+    Entries and version counters in Redis, shared by every worker.
+
+    Keys use the shared counters only, so every worker reads the entries
+    the others wrote. Until this worker's INCR for a bump reaches Redis (or
+    after it failed, until a later one succeeds) requests reading that
+    table bypass the cache, so the writing worker never serves what it just
+    changed. Redis errors are treated as cache misses.
+    """
+
+    def __init__(self, url: str, ttl: float):
+        super().__init__(maxsize=0, ttl=ttl)
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the optional 'redis' package")
+        self._redis = redis.from_url(url)
+        self._ttl = int(ttl)
+        # Bumps whose INCR is still in flight, and names whose last INCR failed
+        self._unpublished: Counter = Counter()
+        self._failed: Set[str] = set()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            raw = await self._redis.get(_REDIS_PREFIX + key)
+        except Exception:
+            logger.warning("Response cache read failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        meta, body = raw.split(b"\n", 1)
+        etag, headers = json.loads(meta)
+        return CachedResponse(etag, [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers], body)
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in entry.headers]
+        raw = json.dumps([entry.etag, headers]).encode() + b"\n" + entry.body
+        try:
+            await self._redis.set(_REDIS_PREFIX + key, raw, ex=self._ttl)
+        except Exception:
+            logger.warning("Response cache write failed", exc_info=True)
+
+    async def versions(self, names: Sequence[str]) -> Optional[Tuple[int, ...]]:
+        if any(self._unpublished[name] > 0 or name in self._failed for name in names):
+            return None
+        try:
+            shared = await self._redis.mget([f"{_REDIS_PREFIX}version:{name}" for name in names])
+        except Exception:
+            logger.warning("Response cache version read failed", exc_info=True)
+            return None
+        return tuple(int(value or 0) for value in shared)
+
+    def bump(self, names: Iterable[str]) -> None:
+        names = list(names)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Commits outside the event loop (scripts) have nobody to serve stale entries to
+            return
+        self._unpublished.update(names)
+        loop.create_task(self._incr(names))
+
+    async def _incr(self, names: List[str]) -> None:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for name in names:
+                    pipe.incr(f"{_REDIS_PREFIX}version:{name}")
+                await pipe.execute()
+            self._failed.difference_update(names)
+        except Exception:
+            logger.warning("Response cache version bump failed", exc_info=True)
+            self._failed.update(names)
+        finally:
+            self._unpublished.subtract(names)
+            for name in names:
+                if self._unpublished[name] <= 0:
+                    del self._unpublished[name]
+
+
+class ResponseCache:
+    """Version-keyed response store plus the commit tracking that bumps versions."""
+
+    def __init__(self, backend: MemoryBackend):
+        self.backend = backend
+        self._tracked: Dict[str, Type] = {}
+
+    def track(self, model: Type) -> None:
+        """Bump `model`'s version after every commit that writes to it."""
+        table = model.__tablename__
+        if table in self._tracked:
+            return
+        self._tracked[table] = model
+        register_commit_hook(model, lambda upserted, deleted: self.backend.bump([table]), lambda session, obj: None)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        """Invalidate every entry built from the given tables."""
+        self.backend.bump(tables)
+
+    def is_tracked(self, table: str) -> bool:
+        return table in self._tracked
+
+    async def key(self, user_id: int, path: str, query_string: bytes, models: Sequence[Type]) -> Optional[str]:
+        """Cache key for a request under the current model versions, or None to bypass the cache."""
+        names = [f"user:{user_id}"] + [model.__tablename__ for model in models]
+        versions = await self.backend.versions(names)
+        if versions is None:
+            return None
+        raw = f"{user_id}|{path}|{query_string.decode('latin-1')}|{versions}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _create_backend() -> MemoryBackend:
+    if settings.response_cache_backend == "redis":
+        return RedisBackend(settings.response_cache_redis_url, settings.response_cache_ttl_seconds)
+    return MemoryBackend(settings.response_cache_size, settings.response_cache_ttl_seconds)
+
+
+# Global response cache
+response_cache = ResponseCache(_create_backend())
+
+# A user's own row changing (deactivation, profile edits) invalidates their entries
+register_commit_hook(
+    User,
+    lambda upserted, deleted: response_cache.bump(f"user:{user_id}" for user_id in upserted + deleted),
+    lambda session, user: user.id
+)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state) -> None:
+    # Bulk statements skip the unit of work, so the commit hooks never see them
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and response_cache.is_tracked(mapper.local_table.name):
+        orm_execute_state.session.info.setdefault(_BULK_PENDING_KEY, set()).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_bulk_writes(session: Session) -> None:
+    tables = session.info.pop(_BULK_PENDING_KEY, None)
+    if tables:
+        response_cache.bump(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bulk_writes(session: Session) -> None:
+    session.info.pop(_BULK_PENDING_KEY, None)
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _user_id(scope) -> Optional[int]:
+    """User id from a valid bearer token, or None to leave the request uncached."""
+    authorization = _header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith(b"bearer "):
+        return None
+    try:
+        payload = decode_token(authorization[7:].decode("latin-1").strip())
+    except Exception:
+        return None
+    return payload.get("user_id")
+
+
+def _etag_matches(scope, etag: str) -> bool:
+    if_none_match = _header(scope, b"if-none-match")
+    if if_none_match is None:
+        return False
+    candidates = [value.strip() for value in if_none_match.decode("latin-1").split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _cache_headers(etag: str, status: str) -> List[Tuple[bytes, bytes]]:
+    return [
+        (b"etag", etag.encode()),
+        (b"cache-control", b"private, no-cache"),
+        (b"vary", b"Authorization"),
+        (b"x-cache", status.encode()),
+    ]
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving cached GET responses for the configured routes.
+
+    `routes` maps exact request paths to the models their responses read.
+    Only authenticated 200 responses up to RESPONSE_CACHE_MAX_BODY_KB are stored.
+    """
+
+    def __init__(self, app, routes: Dict[str, Sequence[Type]], cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.routes = routes
+        self.cache = cache or response_cache
+        self.max_body = settings.response_cache_max_body_kb * 1024
+        for models in routes.values():
+            for model in models:
+                self.cache.track(model)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not settings.response_cache_enabled
+            or scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.routes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        user_id = _user_id(scope)
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = await self.cache.key(user_id, scope["path"], scope["query_string"], self.routes[scope["path"]])
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        entry = await self.cache.backend.get(key)
+        if entry is not None:
+            await self._send_entry(scope, send, entry, "HIT")
+            return
+
+        await self._fill(scope, receive, send, key)
+
+    async def _send_entry(self, scope, send, entry: CachedResponse, cache_status: str) -> None:
+        if _etag_matches(scope, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": _cache_headers(entry.etag, cache_status)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": entry.headers + _cache_headers(entry.etag, cache_status),
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def _fill(self, scope, receive, send, key: str) -> None:
+        """Run the endpoint, buffering a cacheable response to add its ETag and store it."""
+        start = None
+        chunks: List[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def capture(message):
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200:
+                    passthrough = True
+                    await send(start)
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > self.max_body:
+                # Too large to keep; stream it through uncached
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": message.get("more_body", False)})
+                return
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            headers = [
+                (name, value) for name, value in start["headers"]
+                if name.lower() not in (b"etag", b"cache-control", b"vary", b"content-length")
+            ] + [(b"content-length", str(len(body)).encode())]
+            entry = CachedResponse(etag, headers, body)
+            await self.cache.backend.set(key, entry)
+            await self._send_entry(scope, send, entry, "MISS")
+
+        await self.app(scope, receive, capture)
@@ -0,0 +1,6 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+
+def create_scheduler() -> AsyncIOScheduler:
+    """Create the scheduler for periodic background jobs; one per app lifespan, as it binds to the running loop."""
+    return AsyncIOScheduler(timezone="UTC")
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -9,6 +12,16 @@ from app.core.config import settings
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for bcrypt so hashing never blocks the event loop; created on first use
+_hash_executor: Optional[ThreadPoolExecutor] = None
+# Hashes running or queued; beyond the limit new requests are shed
+_hash_pending = 0
+_hash_lock = threading.Lock()
+_hash_limit = settings.password_hash_workers + settings.password_hash_queue_depth
+
+# Token type of stream tickets, which are only accepted by get_streaming_user
+STREAM_TICKET = "stream"
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
@@ -54,6 +67,77 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _hash_pool() -> ThreadPoolExecutor:
+    """Return the hashing pool, creating it on first use or after a shutdown."""
+    global _hash_executor
+    with _hash_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix="password-hash"
+            )
+        return _hash_executor
+
+
+def _hash_done(future: Optional[Future]) -> None:
+    global _hash_pending
+    with _hash_lock:
+        _hash_pending -= 1
+
+
+async def _run_hash(func: Callable, *args):
+    """
+    Run a bcrypt call on the hashing pool, rejecting work once the queue is full.
+
+    A hash counts against the limit until its thread is done with it, even
+    if the caller was cancelled in the meantime.
+    """
+    global _hash_pending
+    with _hash_lock:
+        if _hash_pending >= _hash_limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _hash_pending += 1
+    try:
+        future = _hash_pool().submit(func, *args)
+    except BaseException:
+        _hash_done(None)
+        raise
+    future.add_done_callback(_hash_done)
+    return await asyncio.wrap_future(future)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _run_hash(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await _run_hash(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing pool's worker threads; the next hash starts a new pool."""
+    global _hash_executor
+    with _hash_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_stream_ticket(data: dict) -> str:
+    """Create a short-lived ticket that only authenticates event streams."""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + timedelta(seconds=settings.alert_stream_ticket_expire_seconds)
+    to_encode.update({"exp": expire, "type": STREAM_TICKET})
+    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return encoded_jwt
+
+
 def create_refresh_token(data: dict) -> str:
     """Create a refresh token with longer expiration."""
     to_encode = data.copy()
@@ -0,0 +1,186 @@
+"""
+SQLite production mode.
+
+SQLite allows one writer at a time, and concurrent writers from the scheduler,
+ingestion and request handlers otherwise fail with "database is locked".
+In production mode every connection runs in WAL (readers never block the
+writer), with tuned synchronous/cache/mmap pragmas and a busy timeout.
+
+Transactions on the primary engine start deferred and take no lock, so
+read-only sessions run concurrently. The first write statement of a
+transaction takes the in-process `write_lock`, ends the transaction's read
+snapshot and restarts it with BEGIN IMMEDIATE (re-opening any savepoints),
+then holds both until COMMIT or ROLLBACK. Upgrading the deferred
+transaction in place would fail with "database is locked" whenever another
+connection committed since its first read, whatever the busy timeout;
+restarting it gives reads before the first write read-committed semantics,
+as on PostgreSQL. Autoflush, `flush()`, bulk statements and savepoints all
+go through the same hook, so every write through the engine is covered.
+"""
+
+import asyncio
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.util import await_only
+
+from app.core.config import settings
+
+
+def is_sqlite(database_url: str) -> bool:
+    """Whether a database URL points at SQLite."""
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def is_file_database(database_url: str) -> bool:
+    """Whether a SQLite URL refers to a file that several connections can share."""
+    database = make_url(database_url).database
+    return bool(database) and database != ":memory:" and not database.startswith("file::memory:")
+
+
+def configure_engine(engine: AsyncEngine, read_only: bool = False) -> None:
+    """Apply production pragmas and explicit transaction control to a SQLite engine."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs and batching behave
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        # Negative cache_size is in KiB
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    if read_only:
+        @event.listens_for(engine.sync_engine, "begin")
+        def _on_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+        return
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _on_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+        connection.info[_SAVEPOINTS] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _on_execute(connection, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip()[:16].split(None, 1)[0].upper() if statement.strip() else ""
+        if verb in _READ_VERBS:
+            _track_savepoint(connection.info, verb, statement)
+            return
+        if connection.info.get(_LOCK_HELD) or not connection.in_transaction():
+            return
+        # Events run inside SQLAlchemy's greenlet, so the asyncio lock can be awaited here
+        await_only(write_lock.acquire())
+        try:
+            cursor.execute("COMMIT")
+            cursor.execute("BEGIN IMMEDIATE")
+            for name in connection.info.get(_SAVEPOINTS, ()):
+                cursor.execute(f"SAVEPOINT {name}")
+        except BaseException:
+            write_lock.release()
+            raise
+        connection.info[_LOCK_HELD] = True
+
+    # COMMIT and ROLLBACK are issued here so the lock is released only once
+    # they have finished; the driver's own commit/rollback then has nothing to do
+    @event.listens_for(engine.sync_engine, "commit")
+    def _on_commit(connection):
+        connection.exec_driver_sql("COMMIT")
+        _release(connection.info)
+
+    @event.listens_for(engine.sync_engine, "rollback")
+    def _on_rollback(connection):
+        if not connection.info.get(_LOCK_HELD):
+            # A read-only transaction; the driver rolls it back itself
+            return
+        try:
+            connection.exec_driver_sql("ROLLBACK")
+        except DBAPIError:
+            # SQLite already rolled back on its own (e.g. after a full disk)
+            pass
+        finally:
+            _release(connection.info)
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        # The pool resets connections without Connection events; never leak the lock
+        _release(connection_record.info)
+
+
+# Connection.info key marking a connection that holds `write_lock`
+_LOCK_HELD = "sqlite_write_lock_held"
+# Connection.info key listing the savepoints open in the current transaction
+_SAVEPOINTS = "sqlite_savepoints"
+
+# Statements that neither write nor need the write lock
+_READ_VERBS = frozenset({"SELECT", "EXPLAIN", "PRAGMA", "SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT", "END"})
+
+
+def _track_savepoint(info: dict, verb: str, statement: str) -> None:
+    savepoints: List[str] = info.setdefault(_SAVEPOINTS, [])
+    if verb == "SAVEPOINT":
+        savepoints.append(statement.split()[-1])
+    elif verb in ("RELEASE", "ROLLBACK") and "SAVEPOINT" in statement.upper():
+        name = statement.split()[-1]
+        if name in savepoints:
+            # RELEASE drops the savepoint itself, ROLLBACK TO keeps it open
+            del savepoints[savepoints.index(name) + (verb == "ROLLBACK"):]
+
+
+def _release(info: dict) -> None:
+    if info.pop(_LOCK_HELD, False):
+        write_lock.release()
+
+
+class WriteLock:
+    """
+    Process-wide asyncio lock that the owning task may re-acquire.
+
+    Re-entrancy lets the batched writer hold the lock around a whole batch
+    while the transactions it opens take it again.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._owner: Optional[asyncio.Task] = None
+        self._depth = 0
+
+    async def acquire(self) -> None:
+        task = asyncio.current_task()
+        if self._owner is not task:
+            await self._lock.acquire()
+            self._owner = task
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if not self._depth:
+            self._owner = None
+            self._lock.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def held_by_current_task(self) -> bool:
+        return self._owner is not None and self._owner is asyncio.current_task()
+
+
+# Serializes write transactions on the primary SQLite database
+write_lock = WriteLock()
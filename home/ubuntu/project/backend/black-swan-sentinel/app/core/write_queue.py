@@ -0,0 +1,116 @@
+"""
+Single writer task with batched commits for background database writes.
+
+Jobs submit `async def work(db)` callables instead of opening their own
+sessions. In SQLite production mode one task drains the queue and runs up to
+`sqlite_write_batch_size` jobs per transaction, each inside a SAVEPOINT so a
+failing job does not undo the rest, and commits once per batch under the
+write lock. On other databases `submit` simply runs the job in its own
+session, since the server handles concurrent writers itself.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, sqlite_mode
+from app.core.sqlite import write_lock
+
+logger = logging.getLogger(__name__)
+
+WriteFn = Callable[[AsyncSession], Awaitable[Any]]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Serializes and batches write jobs onto one session at a time."""
+
+    def __init__(self, session_factory=AsyncSessionLocal, batch_size: int = 100, enabled: bool = True):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self.enabled and not self.running:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(), name="write-queue")
+
+    async def stop(self) -> None:
+        """Finish queued jobs and stop the writer task."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, work: WriteFn) -> Any:
+        """Run `work(db)` in a write transaction and return its result once committed."""
+        if write_lock.held_by_current_task():
+            # The writer would wait for this task's lock while this task waits for the writer
+            raise RuntimeError("Commit or roll back pending writes before submitting to the write queue")
+        if not self.running:
+            async with self.session_factory() as db:
+                result = await work(db)
+                await db.commit()
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((work, future))
+        return await future
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[Tuple[WriteFn, asyncio.Future]]) -> None:
+        outcomes = []
+        try:
+            async with write_lock:
+                async with self.session_factory() as db:
+                    for work, future in batch:
+                        try:
+                            async with db.begin_nested():
+                                outcomes.append((future, await work(db), None))
+                        except Exception as exc:
+                            outcomes.append((future, None, exc))
+                    await db.commit()
+        except Exception as exc:
+            logger.exception("Write batch of %d jobs failed", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for future, result, exc in outcomes:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+# Global write queue; only batches in SQLite production mode
+write_queue = WriteQueue(batch_size=settings.sqlite_write_batch_size, enabled=sqlite_mode)
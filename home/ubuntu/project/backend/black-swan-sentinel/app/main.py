@@ -1,20 +1,62 @@
-from fastapi import FastAPI
+import logging
+import time
+
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core import metrics
+from app.core.database import init_db, AsyncSessionLocal
+from app.core.response_cache import ResponseCacheMiddleware
+from app.core.scheduler import create_scheduler
+from app.core.security import shutdown_password_hashing
+from app.core.write_queue import write_queue
 from app.api.v1.router import api_router
+from app.models.news import NewsArticle
+from app.models.portfolio import Holding, Portfolio
+from app.models.risk import RiskAlert, RiskAssessment
+from app.services.alert_delivery import alert_delivery
+from app.services.feature_store import feature_store
+from app.services.holding_index import holding_index
+from app.services import news_retention
+from app.services.subscription_matcher import subscription_matcher
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    await init_db()
+    started = time.perf_counter()
+    # The schema is normally managed by `alembic upgrade head`
+    if settings.db_create_schema_on_startup:
+        await init_db()
+    write_queue.start()
+    async with AsyncSessionLocal() as db:
+        await subscription_matcher.rebuild(db)
+        await holding_index.rebuild(db)
+        # Digest buffers are in memory; route whatever was still unsent when the last worker stopped
+        await alert_delivery.restore(db)
+    scheduler = create_scheduler()
+    subscription_matcher.schedule_jobs(scheduler)
+    holding_index.schedule_jobs(scheduler)
+    alert_delivery.schedule_jobs(scheduler)
+    news_retention.schedule_jobs(scheduler)
+    feature_store.schedule_jobs(scheduler)
+    scheduler.start()
+    if settings.metrics_enabled:
+        metrics.loop_lag_monitor.start()
+    logger.info("Startup completed in %.0f ms", (time.perf_counter() - started) * 1000)
     yield
     # Shutdown
-    pass
+    await metrics.loop_lag_monitor.stop()
+    scheduler.shutdown(wait=False)
+    await alert_delivery.flush("immediate")
+    await feature_store.refresh_dirty()
+    await write_queue.stop()
+    shutdown_password_hashing()
 
 
 def create_application() -> FastAPI:
@@ -29,6 +71,17 @@ def create_application() -> FastAPI:
         lifespan=lifespan
     )
     
+    # Cache read-heavy GET responses per user; each route lists the models it reads
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        routes={
+            "/api/v1/portfolio/": (Portfolio, Holding),
+            "/api/v1/risk/assessment": (RiskAssessment, RiskAlert),
+            "/api/v1/simulation/scenarios": (),
+            "/api/v1/news/": (NewsArticle,),
+        }
+    )
+    
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -38,6 +91,15 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Flag repeated query shapes (N+1 patterns) per request in development and tests
+    if settings.query_audit_enabled:
+        from app.core.query_audit import QueryAuditMiddleware
+        app.add_middleware(QueryAuditMiddleware)
+    
+    # Record latency, in-flight requests and SQL per request (outermost, so it sees everything)
+    if settings.metrics_enabled:
+        app.add_middleware(metrics.MetricsMiddleware)
+    
     # Include API routes
     app.include_router(api_router, prefix="/api/v1")
     
@@ -55,6 +117,14 @@ def create_application() -> FastAPI:
         """Health check endpoint."""
         return {"status": "healthy", "service": settings.app_name}
     
+    if settings.metrics_enabled:
+        @app.get("/metrics", include_in_schema=False)
+        async def prometheus_metrics(request: Request):
+            """Prometheus metrics endpoint."""
+            if not metrics.scrape_allowed(request.client.host if request.client else None, request.headers.get("authorization")):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to read metrics")
+            return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+    
     return app
 
 
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey, JSON
+
+from app.core.database import Base
+
+
+class UserFeatures(Base):
+    """Precomputed per-user financial features shared by scans, simulations and playbooks."""
+
+    __tablename__ = "user_features"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+
+    # Versioning: feature definitions and per-user recomputation counter
+    feature_version = Column(Integer, nullable=False)
+    revision = Column(Integer, nullable=False, default=1)
+
+    # Wealth and allocation
+    portfolio_value = Column(Float, default=0.0)  # Sum of Portfolio.total_value
+    cash_balance = Column(Float, default=0.0)
+    holdings_value = Column(Float, default=0.0)
+    liquid_assets = Column(Float, default=0.0)  # Cash balances plus cash holdings
+    allocation = Column(JSON, nullable=True)  # {asset_type: weight of holdings value}
+    top_holdings = Column(JSON, nullable=True)  # [[symbol, weight], ...] largest first
+    top_sectors = Column(JSON, nullable=True)  # [[sector, weight], ...] largest first
+
+    # Cash flow
+    monthly_income = Column(Float, default=0.0)
+    monthly_expenses = Column(Float, default=0.0)  # Monthly burn
+    burn_ratio = Column(Float, nullable=True)  # Expenses / income; null when there is no income
+    emergency_fund_months = Column(Float, nullable=True)  # Null when there are no expenses
+    income_stability = Column(Float, default=0.0)  # 0-1 share of income that is recurring
+    income_sources = Column(Integer, default=0)
+
+    computed_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,27 @@
+"""
+Eager-loading profiles for relationship access.
+
+Relationships are lazy by default. Under AsyncSession a lazy load outside
+the session's greenlet raises MissingGreenlet, and inside it (cascades,
+`run_sync`) it costs one query per parent row. Queries whose results touch
+relationships take one of these profiles instead: collections are loaded
+with `selectinload` (one extra IN query per relationship), many-to-one
+parents with `joinedload`, and every profile ends with `raiseload("*")` so
+touching a relationship outside the profile fails loudly rather than
+issuing hidden queries. Profiles are added here when a query first needs
+them.
+"""
+
+from sqlalchemy.orm import raiseload, selectinload
+
+# Building loader options configures the mappers, so every model must be registered first
+from app.models import news, playbook, portfolio, risk, user  # noqa: F401
+from app.models.simulation import DisasterSimulation
+
+# Plain rows; any relationship access raises
+NO_RELATIONSHIPS = (raiseload("*"),)
+
+SIMULATION_WITH_REPORTS = (
+    selectinload(DisasterSimulation.damage_reports),
+    raiseload("*"),
+)
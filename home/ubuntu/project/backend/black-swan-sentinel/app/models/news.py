@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, JSON, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, JSON, ForeignKey, Index
+from sqlalchemy.sql import false, func
 from sqlalchemy.orm import relationship
 import enum
 
@@ -68,10 +68,61 @@ class NewsArticle(Base):
     # Relationships
     alerts = relationship("NewsAlert", back_populates="article", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Recent-news queries only scan the hot (unarchived) slice of the table
+        Index("ix_news_articles_is_archived_published_at", "is_archived", "published_at"),
+        Index("ix_news_articles_published_at", "published_at"),
+        # Partial index over the processing backlog only; it stays small as articles are processed
+        Index(
+            "ix_news_articles_unprocessed",
+            "created_at",
+            postgresql_where=is_processed == false(),
+            sqlite_where=is_processed == false(),
+        ),
+    )
+    
     def __repr__(self):
         return f"<NewsArticle(id={self.id}, title='{self.title[:50]}...', source='{self.source}')>"
 
 
+class ArchivedNewsArticle(Base):
+    """Full content of news articles moved out of the hot table by retention."""
+    
+    __tablename__ = "news_article_archive"
+    
+    # Same id as the stub left behind in news_articles
+    id = Column(Integer, primary_key=True)
+    
+    # Article metadata
+    title = Column(String(500), nullable=False)
+    url = Column(String(1000), nullable=True)
+    source = Column(String(255), nullable=False)
+    source_type = Column(String(50), nullable=True)
+    author = Column(String(255), nullable=True)
+    
+    # Article content
+    content = Column(Text, nullable=True)
+    summary = Column(Text, nullable=True)
+    excerpt = Column(Text, nullable=True)
+    
+    # Classification and analysis
+    category = Column(String(100), nullable=True)
+    sectors_affected = Column(JSON, nullable=True)
+    assets_mentioned = Column(JSON, nullable=True)
+    keywords = Column(JSON, nullable=True)
+    sentiment = Column(String(20), nullable=True)
+    sentiment_score = Column(Float, nullable=True)
+    impact_score = Column(Float, nullable=True)
+    
+    # Timestamps
+    published_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<ArchivedNewsArticle(id={self.id}, title='{self.title[:50]}...')>"
+
+
 class NewsAlert(Base):
     """Alerts generated from news articles."""
     
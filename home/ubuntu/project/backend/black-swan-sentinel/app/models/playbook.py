@@ -0,0 +1,79 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, JSON, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class DefensePlaybook(Base):
+    """Generated defense playbooks for users."""
+    
+    __tablename__ = "defense_playbooks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=True)
+    
+    # Playbook context
+    title = Column(String(255), nullable=False)
+    scenario_type = Column(String(50), nullable=False)
+    risk_level = Column(String(20), nullable=False)  # low, medium, high, critical
+    risk_factors = Column(JSON, nullable=True)  # Risk factors the playbook addresses
+    
+    # Playbook content
+    strategies = Column(JSON, nullable=True)  # Ordered list of strategy steps
+    
+    # Generation metadata
+    status = Column(String(20), default="completed")  # generating, completed, failed
+    generation_source = Column(String(20), nullable=True)  # template, llm, mixed
+    generation_time_ms = Column(Float, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="playbooks")
+    portfolio = relationship("Portfolio")
+    
+    __table_args__ = (
+        # A user's playbooks, newest first
+        Index("ix_defense_playbooks_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<DefensePlaybook(id={self.id}, user_id={self.user_id}, scenario='{self.scenario_type}')>"
+
+
+class PlaybookFragment(Base):
+    """Reusable strategy fragments shared by every playbook with the same key."""
+    
+    __tablename__ = "playbook_fragments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Fragment key
+    risk_factor = Column(String(50), nullable=False)
+    scenario_type = Column(String(50), nullable=False)
+    risk_level = Column(String(20), nullable=False)
+    risk_tolerance = Column(String(20), nullable=False)
+    
+    # Parameterized step templates (str.format placeholders filled per user)
+    steps = Column(JSON, nullable=False)
+    source = Column(String(20), default="template")  # template, llm
+    
+    # Usage statistics
+    usage_count = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint(
+            "risk_factor", "scenario_type", "risk_level", "risk_tolerance",
+            name="uq_playbook_fragments_key"
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<PlaybookFragment(id={self.id}, factor='{self.risk_factor}', scenario='{self.scenario_type}')>"
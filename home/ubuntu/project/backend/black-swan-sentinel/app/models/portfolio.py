@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 
 from app.core.database import Base
 
+# Monthly multipliers for the frequency of recurring expenses and income
+FREQUENCY_TO_MONTHLY = {"daily": 365 / 12, "weekly": 52 / 12, "monthly": 1.0, "quarterly": 1 / 3, "yearly": 1 / 12}
+
 
 class AssetType(enum.Enum):
     """Enum for different asset types."""
@@ -70,7 +73,7 @@ class Holding(Base):
     __tablename__ = "holdings"
     
     id = Column(Integer, primary_key=True, index=True)
-    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=False)
+    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=False, index=True)
     
     # Asset information
     symbol = Column(String(50), nullable=False)  # Stock symbol, fund code, etc.
@@ -126,6 +129,11 @@ class Transaction(Base):
     # Relationships
     portfolio = relationship("Portfolio", back_populates="transactions")
     
+    __table_args__ = (
+        # Portfolio transaction history, newest first
+        Index("ix_transactions_portfolio_id_transaction_date", "portfolio_id", "transaction_date"),
+    )
+    
     def __repr__(self):
         return f"<Transaction(id={self.id}, type='{self.transaction_type}', amount={self.amount})>"
 
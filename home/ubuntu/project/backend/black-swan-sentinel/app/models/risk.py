@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -93,6 +93,11 @@ class RiskAlert(Base):
     assessment = relationship("RiskAssessment", back_populates="alerts")
     user = relationship("User")
     
+    __table_args__ = (
+        # A user's active alerts
+        Index("ix_risk_alerts_user_id_is_active", "user_id", "is_active"),
+    )
+    
     def __repr__(self):
         return f"<RiskAlert(id={self.id}, type='{self.alert_type}', severity='{self.severity}')>"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -67,7 +67,7 @@ class DisasterSimulation(Base):
     error_message = Column(Text, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -76,6 +76,11 @@ class DisasterSimulation(Base):
     portfolio = relationship("Portfolio")
     damage_reports = relationship("DamageReport", back_populates="simulation", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Simulation history per user, newest first
+        Index("ix_disaster_simulations_user_id_created_at", "user_id", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<DisasterSimulation(id={self.id}, name='{self.name}', type='{self.scenario_type}')>"
 
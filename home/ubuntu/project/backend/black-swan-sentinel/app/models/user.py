@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -21,7 +21,7 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_login = Column(DateTime(timezone=True), nullable=True)
     
@@ -34,6 +34,12 @@ class User(Base):
     portfolios = relationship("Portfolio", back_populates="owner", cascade="all, delete-orphan")
     risk_assessments = relationship("RiskAssessment", back_populates="user", cascade="all, delete-orphan")
     simulations = relationship("DisasterSimulation", back_populates="user", cascade="all, delete-orphan")
+    playbooks = relationship("DefensePlaybook", back_populates="user", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Keyset pagination of the user list, newest first
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', username='{self.username}')>"
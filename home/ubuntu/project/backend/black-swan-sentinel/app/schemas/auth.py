@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 from datetime import datetime
 
@@ -25,6 +25,14 @@ class UserUpdate(BaseModel):
     phone_number: Optional[str] = None
     risk_tolerance: Optional[str] = Field(None, pattern="^(conservative|moderate|aggressive)$")
 
+    @field_validator("email", "username", "risk_tolerance")
+    @classmethod
+    def not_null(cls, value: Optional[str]) -> str:
+        """Required columns may be left out of an update but not set to null."""
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 
 class UserResponse(UserBase):
     """Schema for user response."""
@@ -52,6 +60,12 @@ class Token(BaseModel):
     expires_in: int
 
 
+class StreamTicket(BaseModel):
+    """Schema for a stream ticket response."""
+    ticket: str
+    expires_in: int
+
+
 class TokenData(BaseModel):
     """Schema for token data."""
     username: Optional[str] = None
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class NewsArticleSummary(BaseModel):
+    """Schema for news article list entries (no article body)."""
+    id: int
+    title: str
+    url: Optional[str] = None
+    source: str
+    category: Optional[str] = None
+    sectors_affected: Optional[List[str]] = None
+    assets_mentioned: Optional[List[str]] = None
+    sentiment: Optional[str] = None
+    impact_score: Optional[float] = None
+    published_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
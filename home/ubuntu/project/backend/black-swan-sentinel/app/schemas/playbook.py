@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional
+from datetime import datetime
+
+from app.models.simulation import ScenarioType
+from app.services.playbook_engine import RISK_FACTORS
+
+# Requests only name known scenarios and factors, which bounds the fragment
+# keys (and so the model calls and stored fragments) a client can cause
+SCENARIO_TYPE_PATTERN = "^(" + "|".join(scenario.value for scenario in ScenarioType) + ")$"
+RISK_FACTOR_PATTERN = "^(" + "|".join(sorted(RISK_FACTORS)) + ")$"
+
+
+class PlaybookGenerateRequest(BaseModel):
+    """Schema for playbook generation requests."""
+    scenario_type: str = Field(default="market_crash", pattern=SCENARIO_TYPE_PATTERN)
+    risk_level: Optional[str] = Field(None, pattern="^(low|medium|high|critical)$")
+    risk_factors: Optional[List[Annotated[str, Field(pattern=RISK_FACTOR_PATTERN)]]] = Field(None, max_length=10)
+    portfolio_id: Optional[int] = None
+
+
+class PlaybookStep(BaseModel):
+    """Schema for a single playbook strategy step."""
+    step: int
+    action: str
+    description: str
+    category: str
+    risk_factor: str
+    priority: str
+    timeframe: str
+
+
+class PlaybookSummary(BaseModel):
+    """Schema for playbook list entries."""
+    id: int
+    title: str
+    scenario_type: str
+    risk_level: str
+    status: str
+    generation_source: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PlaybookResponse(PlaybookSummary):
+    """Schema for a full playbook."""
+    portfolio_id: Optional[int] = None
+    risk_factors: Optional[List[str]] = None
+    strategies: List[PlaybookStep] = []
+    generation_time_ms: Optional[float] = None
+    completed_at: Optional[datetime] = None
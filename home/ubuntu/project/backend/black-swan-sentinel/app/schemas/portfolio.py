@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ImportRowError(BaseModel):
+    """Schema for one rejected value in a bulk import."""
+    row: int
+    column: str
+    error: str
+
+
+class ImportReportResponse(BaseModel):
+    """Schema for the outcome of a bulk import."""
+    kind: str
+    rows_total: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool
+    error: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
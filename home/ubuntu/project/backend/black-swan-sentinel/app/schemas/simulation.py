@@ -0,0 +1,61 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class SimulationSummary(BaseModel):
+    """Schema for simulation history entries (no scenario or result payloads)."""
+    id: int
+    name: str
+    scenario_type: str
+    portfolio_id: Optional[int] = None
+    status: Optional[str] = None
+    iterations: Optional[int] = None
+    time_horizon_days: Optional[int] = None
+    expected_loss: Optional[float] = None
+    worst_case_loss: Optional[float] = None
+    probability_of_ruin: Optional[float] = None
+    recovery_time_days: Optional[int] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class DamageReportResponse(BaseModel):
+    """Schema for a simulation damage report."""
+    id: int
+    simulation_id: int
+    total_portfolio_loss: float
+    total_portfolio_loss_percent: float
+    asset_impacts: Optional[Dict[str, Any]] = None
+    sector_impacts: Optional[Dict[str, Any]] = None
+    liquid_assets_remaining: Optional[float] = None
+    liquidity_shortfall: Optional[float] = None
+    forced_liquidation_amount: Optional[float] = None
+    monthly_income_impact: Optional[float] = None
+    monthly_expense_increase: Optional[float] = None
+    cash_runway_months: Optional[float] = None
+    estimated_recovery_time: Optional[int] = None
+    recovery_strategy: Optional[Any] = None
+    new_risk_score: Optional[float] = None
+    risk_score_change: Optional[float] = None
+    generated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class SimulationResponse(SimulationSummary):
+    """Schema for a full simulation, including configuration and results."""
+    description: Optional[str] = None
+    scenario_config: Dict[str, Any]
+    simulation_parameters: Optional[Dict[str, Any]] = None
+    confidence_levels: Optional[List[int]] = None
+    results: Optional[Dict[str, Any]] = None
+    summary: Optional[Dict[str, Any]] = None
+    execution_time_seconds: Optional[float] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    damage_reports: List[DamageReportResponse] = []
@@ -0,0 +1,169 @@
+"""
+In-process pub/sub broker for live news and risk alerts.
+
+Events are kept in a small per-user ring buffer with increasing ids, so
+reconnecting clients can resume from the last id they saw. Ids are
+microsecond timestamps (bumped when two events share one), so they keep
+increasing across restarts; an id this process cannot account for, from
+before it started or from another worker, gets a resync instead of a
+replay. Listeners do not get a queue of their own: every connection of a
+user waits on one shared asyncio.Event that is swapped on publish, which
+keeps idle connections down to a suspended coroutine each.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.models.risk import RiskAlert
+
+NEWS_ALERT = "news_alert"
+RISK_ALERT = "risk_alert"
+# Sent when a client resumes from an id that has already left the buffer
+RESYNC = "resync"
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    """A single event delivered to a user's live alert stream."""
+    id: int
+    kind: str
+    data: dict = field(default_factory=dict)
+
+
+class _UserChannel:
+    """Per-user event buffer and wake-up signal."""
+
+    def __init__(self, history_size: int, evicted_upto: int):
+        self.history: Deque[AlertEvent] = deque(maxlen=history_size)
+        self.signal = asyncio.Event()
+        # Highest event id no longer in the history (evicted, or from before this process)
+        self.evicted_upto = evicted_upto
+        self.listeners = 0
+
+
+class AlertBroker:
+    """Fan-out of alert events to the live connections of their owners."""
+
+    def __init__(self, history_size: int = 100):
+        self.history_size = history_size
+        # Every id this process hands out is above this one
+        self.started_after = time.time_ns() // 1000
+        self._last_id = self.started_after
+        self._channels: Dict[int, _UserChannel] = {}
+
+    def _channel(self, user_id: int) -> _UserChannel:
+        channel = self._channels.get(user_id)
+        if channel is None:
+            channel = self._channels[user_id] = _UserChannel(self.history_size, self.started_after)
+        return channel
+
+    def _next_id(self) -> int:
+        self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+        return self._last_id
+
+    def listener_count(self, user_id: Optional[int] = None) -> int:
+        """Number of connected listeners, for one user or overall."""
+        if user_id is not None:
+            channel = self._channels.get(user_id)
+            return channel.listeners if channel else 0
+        return sum(channel.listeners for channel in self._channels.values())
+
+    def publish(self, user_id: int, kind: str, data: dict) -> AlertEvent:
+        """Append an event to a user's stream and wake their listeners."""
+        channel = self._channel(user_id)
+        event = AlertEvent(self._next_id(), kind, data)
+        if len(channel.history) == channel.history.maxlen:
+            channel.evicted_upto = channel.history[0].id
+        channel.history.append(event)
+
+        signal, channel.signal = channel.signal, asyncio.Event()
+        signal.set()
+        return event
+
+    def since(self, user_id: int, last_event_id: int) -> List[AlertEvent]:
+        """Buffered events for a user newer than `last_event_id`."""
+        channel = self._channels.get(user_id)
+        if channel is None:
+            return []
+        return [event for event in channel.history if event.id > last_event_id]
+
+    async def listen(
+        self,
+        user_id: int,
+        last_event_id: Optional[int] = None,
+        keepalive: float = 15.0
+    ) -> AsyncIterator[Optional[AlertEvent]]:
+        """
+        Yield a user's events as they are published.
+
+        Buffered events newer than `last_event_id` are replayed first. A
+        resync event comes first when events after `last_event_id` may be
+        missing: they left the buffer, were published before this process
+        started, or the id was never issued here. `None` is yielded every
+        `keepalive` seconds of silence so the caller can write a heartbeat
+        and notice dropped connections.
+        """
+        channel = self._channel(user_id)
+        channel.listeners += 1
+        try:
+            if last_event_id is None:
+                last_event_id = self._last_id
+            elif last_event_id > self._last_id:
+                last_event_id = self._last_id
+                yield AlertEvent(last_event_id, RESYNC)
+            elif last_event_id < channel.evicted_upto:
+                yield AlertEvent(channel.evicted_upto, RESYNC)
+
+            while True:
+                # Grab the signal before reading the buffer so no publish is missed
+                signal = channel.signal
+                events = self.since(user_id, last_event_id)
+                if events:
+                    for event in events:
+                        last_event_id = event.id
+                        yield event
+                    continue
+                try:
+                    await asyncio.wait_for(signal.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            channel.listeners -= 1
+            if not channel.listeners and not channel.history:
+                self._channels.pop(user_id, None)
+
+
+# Global broker instance
+alert_broker = AlertBroker(history_size=settings.alert_stream_history_size)
+
+
+def _risk_alert_snapshot(session: Session, alert: RiskAlert):
+    if alert not in session.new:
+        return None
+    return alert.user_id, {
+        "id": alert.id,
+        "alert_type": alert.alert_type,
+        "severity": alert.severity,
+        "title": alert.title,
+        "message": alert.message,
+        "current_value": alert.current_value,
+        "threshold_value": alert.threshold_value,
+        "affected_assets": alert.affected_assets,
+    }
+
+
+def _publish_risk_alerts(upserted: list, deleted: list) -> None:
+    for published in upserted:
+        if published is not None:
+            user_id, data = published
+            alert_broker.publish(user_id, RISK_ALERT, data)
+
+
+register_commit_hook(RiskAlert, _publish_risk_alerts, _risk_alert_snapshot)
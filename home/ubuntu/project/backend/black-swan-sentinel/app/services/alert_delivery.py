@@ -0,0 +1,396 @@
+"""
+News alert delivery with per-frequency digest batching.
+
+New NewsAlert rows are routed to their recipients (subscribers from the
+subscription index plus holders from the holding index) and buffered per
+user under the recipient's `alert_frequency`. Each buffer is flushed in a
+bulk window: immediate alerts every few seconds, daily and weekly digests on
+a schedule. Alerts for the same article are merged and delivery goes through
+a pluggable transport. A failed send is requeued for the next window, and an
+alert is marked `is_sent` (with batched updates) only once every buffer it
+was routed to has been delivered. Buffers live in memory, so on startup
+every alert still unsent is routed again; recipients who were already
+served before a restart may receive it twice.
+"""
+
+import asyncio
+import json
+import logging
+import smtplib
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import false, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.write_queue import write_queue
+from app.models.news import NewsAlert, NewsArticle
+from app.models.user import User
+from app.services.alert_broker import NEWS_ALERT, alert_broker
+from app.services.holding_index import holding_index
+from app.services.subscription_matcher import SubscriptionEntry, subscription_matcher
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("immediate", "daily", "weekly")
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Maximum number of ids per `UPDATE ... WHERE id IN (...)` statement
+MARK_SENT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class AlertMessage:
+    """Delivery payload for a single news alert."""
+    alert_id: int
+    article_id: int
+    alert_type: str
+    severity: str
+    title: str
+    message: str
+
+
+@dataclass(frozen=True)
+class Recipient:
+    """Where and how a user receives alerts."""
+    user_id: int
+    email: Optional[str]
+    full_name: Optional[str] = None
+
+
+class AlertTransport:
+    """Base class for alert transports."""
+
+    async def send(self, recipient: Recipient, subject: str, alerts: List[AlertMessage]) -> None:
+        raise NotImplementedError
+
+
+class FileTransport(AlertTransport):
+    """Append deliveries as JSON lines to a local outbox (development stand-in)."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _write(self, line: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{datetime.now(timezone.utc):%Y-%m-%d}.ndjson"
+        with path.open("a", encoding="utf-8") as outbox:
+            outbox.write(line + "\n")
+
+    async def send(self, recipient: Recipient, subject: str, alerts: List[AlertMessage]) -> None:
+        line = json.dumps({
+            "to": recipient.email,
+            "user_id": recipient.user_id,
+            "subject": subject,
+            "alerts": [asdict(alert) for alert in alerts],
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+        })
+        await asyncio.to_thread(self._write, line)
+
+
+class SMTPTransport(AlertTransport):
+    """
+    Send digests over plain SMTP.
+
+    Pointed at a local debugging server (for example
+    `python -m aiosmtpd -n -l localhost:1025`) it doubles as a stand-in that
+    prints messages instead of delivering them.
+    """
+
+    def __init__(self, host: str, port: int, sender: str):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+    async def send(self, recipient: Recipient, subject: str, alerts: List[AlertMessage]) -> None:
+        if not recipient.email:
+            return
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient.email
+        message["Subject"] = subject
+        message.set_content("\n\n".join(
+            f"[{alert.severity.upper()}] {alert.title}\n{alert.message}" for alert in alerts
+        ))
+        await asyncio.to_thread(self._send, message)
+
+
+def create_transport() -> AlertTransport:
+    """Build the transport selected by `settings.alert_transport`."""
+    if settings.alert_transport == "smtp":
+        return SMTPTransport(settings.smtp_host, settings.smtp_port, settings.smtp_sender)
+    return FileTransport(settings.alert_outbox_dir)
+
+
+def _merge(existing: Optional[AlertMessage], alert: AlertMessage) -> AlertMessage:
+    """Keep the most severe alert for an article."""
+    if existing is None:
+        return alert
+    if SEVERITY_RANK.get(alert.severity, 0) > SEVERITY_RANK.get(existing.severity, 0):
+        return alert
+    return existing
+
+
+class AlertDeliveryEngine:
+    """Buffers alerts per user and frequency and sends them in bulk windows."""
+
+    def __init__(self, transport: Optional[AlertTransport] = None):
+        self.transport = transport or create_transport()
+        # frequency -> user_id -> article_id -> merged alert
+        self._buffers: Dict[str, Dict[int, Dict[int, AlertMessage]]] = {
+            frequency: {} for frequency in FREQUENCIES
+        }
+        # frequency -> user_id -> alert ids folded into that user's buffer (including merged-away duplicates)
+        self._alert_ids: Dict[str, Dict[int, Set[int]]] = {frequency: {} for frequency in FREQUENCIES}
+        # alert id -> number of user buffers, across frequencies, still holding it
+        self._outstanding: Dict[int, int] = {}
+
+    def pending(self, frequency: str) -> int:
+        """Number of users with buffered alerts for a frequency."""
+        return len(self._buffers[frequency])
+
+    def enqueue(self, user_id: int, alert: AlertMessage, frequency: str = "immediate") -> None:
+        """Buffer an alert for a user until the next window of its frequency."""
+        if frequency not in self._buffers:
+            frequency = "immediate"
+        user_buffer = self._buffers[frequency].setdefault(user_id, {})
+        user_buffer[alert.article_id] = _merge(user_buffer.get(alert.article_id), alert)
+        alert_ids = self._alert_ids[frequency].setdefault(user_id, set())
+        if alert.alert_id not in alert_ids:
+            alert_ids.add(alert.alert_id)
+            self._outstanding[alert.alert_id] = self._outstanding.get(alert.alert_id, 0) + 1
+
+    def _requeue(
+        self,
+        frequency: str,
+        user_id: int,
+        alerts_by_article: Dict[int, AlertMessage],
+        alert_ids: Set[int]
+    ) -> None:
+        """Put a user's undelivered buffer back for the next window of its frequency."""
+        user_buffer = self._buffers[frequency].setdefault(user_id, {})
+        for article_id, alert in alerts_by_article.items():
+            user_buffer[article_id] = _merge(user_buffer.get(article_id), alert)
+        self._alert_ids[frequency].setdefault(user_id, set()).update(alert_ids)
+
+    def _delivered(self, alert_ids: Iterable[int]) -> Set[int]:
+        """Count one buffer as delivered for each alert; returns the alerts no buffer holds any more."""
+        done = set()
+        for alert_id in alert_ids:
+            remaining = self._outstanding.get(alert_id, 0) - 1
+            if remaining > 0:
+                self._outstanding[alert_id] = remaining
+            else:
+                self._outstanding.pop(alert_id, None)
+                done.add(alert_id)
+        return done
+
+    def dispatch(
+        self,
+        alert: AlertMessage,
+        categories: Iterable[str] = (),
+        sectors: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+        assets: Iterable[str] = (),
+        impact_score: Optional[float] = None,
+        push_now: bool = True
+    ) -> Set[int]:
+        """
+        Route a new alert to subscribers and holders.
+
+        Email recipients are buffered under their alert frequency and push
+        recipients get the alert on their live stream right away, unless
+        `push_now` is off. Returns the ids of every user the alert was routed to.
+        """
+        frequencies: Dict[int, str] = {}
+        push: Set[int] = set()
+        subscribed: Set[int] = set()
+
+        def route(entry: SubscriptionEntry) -> None:
+            subscribed.add(entry.user_id)
+            if entry.push_notifications:
+                push.add(entry.user_id)
+            if not entry.email_alerts:
+                return
+            frequency = entry.alert_frequency if entry.alert_frequency in FREQUENCIES else "immediate"
+            current = frequencies.get(entry.user_id)
+            # The most frequent preference wins when a user has several subscriptions
+            if current is None or FREQUENCIES.index(frequency) < FREQUENCIES.index(current):
+                frequencies[entry.user_id] = frequency
+
+        for entry in subscription_matcher.match(categories, sectors, list(keywords) + list(assets), impact_score):
+            route(entry)
+
+        for exposure in holding_index.user_exposures(assets, sectors):
+            if exposure.user_id in subscribed:
+                continue
+            entries = subscription_matcher.user_subscriptions(exposure.user_id)
+            if entries is None:
+                # Holders who never subscribed get the subscription defaults
+                frequencies[exposure.user_id] = "immediate"
+                push.add(exposure.user_id)
+                continue
+            # Otherwise their own delivery preferences apply, even if no subscription matched
+            for entry in entries:
+                route(entry)
+
+        for user_id, frequency in frequencies.items():
+            self.enqueue(user_id, alert, frequency)
+        if push_now:
+            for user_id in push:
+                alert_broker.publish(user_id, NEWS_ALERT, asdict(alert))
+        return set(frequencies) | push
+
+    async def restore(self, db: AsyncSession) -> int:
+        """Route every active, unsent alert into the buffers again; returns the number of alerts restored."""
+        result = await db.execute(
+            select(NewsAlert, NewsArticle)
+            .outerjoin(NewsArticle, NewsArticle.id == NewsAlert.article_id)
+            .where(NewsAlert.is_sent == false(), NewsAlert.is_active == true())
+            .order_by(NewsAlert.id)
+        )
+        restored = 0
+        for alert, article in result:
+            if alert.id in self._outstanding:
+                continue
+            # Push went out when the alert was created; only email digests were lost
+            self.dispatch(**_routing(alert, article), push_now=False)
+            restored += 1
+        return restored
+
+    async def flush(self, frequency: str) -> int:
+        """
+        Send every buffered alert for a frequency; returns the number of deliveries.
+
+        Buffers whose send fails are requeued. Alerts are marked sent once no
+        buffer of any frequency still holds them, so an alert routed to both
+        immediate and digest recipients stays unsent until the digest goes out.
+        """
+        buffer = self._buffers[frequency]
+        alert_ids = self._alert_ids[frequency]
+        if not buffer:
+            return 0
+        self._buffers[frequency] = {}
+        self._alert_ids[frequency] = {}
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(User.id, User.email, User.full_name).where(User.id.in_(list(buffer)))
+            )
+            recipients = {row.id: Recipient(row.id, row.email, row.full_name) for row in result}
+
+        delivered = 0
+        sent: Set[int] = set()
+        for user_id, alerts_by_article in buffer.items():
+            user_alert_ids = alert_ids.get(user_id, set())
+            recipient = recipients.get(user_id)
+            # Users deleted since the alert was routed have nothing left to deliver
+            if recipient is not None:
+                alerts = sorted(
+                    alerts_by_article.values(),
+                    key=lambda alert: SEVERITY_RANK.get(alert.severity, 0),
+                    reverse=True
+                )
+                try:
+                    await self.transport.send(recipient, self._subject(frequency, alerts), alerts)
+                    delivered += 1
+                except Exception:
+                    logger.exception("Failed to deliver %s alerts to user %s, retrying next window", frequency, user_id)
+                    self._requeue(frequency, user_id, alerts_by_article, user_alert_ids)
+                    continue
+            sent |= self._delivered(user_alert_ids)
+
+        await self.mark_sent(sent)
+        return delivered
+
+    @staticmethod
+    def _subject(frequency: str, alerts: List[AlertMessage]) -> str:
+        if frequency == "immediate" and len(alerts) == 1:
+            return f"[{alerts[0].severity.upper()}] {alerts[0].title}"
+        label = {"immediate": "Alert", "daily": "Daily", "weekly": "Weekly"}[frequency]
+        return f"{settings.app_name} {label} digest ({len(alerts)} alerts)"
+
+    @staticmethod
+    async def mark_sent(alert_ids: Iterable[int]) -> None:
+        """Flag alerts as sent using batched UPDATE statements in one transaction."""
+        ids = sorted(alert_ids)
+        if not ids:
+            return
+
+        async def mark(db) -> None:
+            for start in range(0, len(ids), MARK_SENT_BATCH_SIZE):
+                await db.execute(
+                    update(NewsAlert)
+                    .where(NewsAlert.id.in_(ids[start:start + MARK_SENT_BATCH_SIZE]))
+                    .values(is_sent=True, sent_at=func.now())
+                )
+
+        await write_queue.submit(mark)
+
+    def schedule_jobs(self, scheduler) -> None:
+        """Register the delivery windows on an APScheduler instance."""
+        scheduler.add_job(
+            self.flush, "interval", args=["immediate"],
+            seconds=settings.alert_immediate_window_seconds,
+            id="alerts_immediate", coalesce=True, max_instances=1, replace_existing=True
+        )
+        scheduler.add_job(
+            self.flush, "cron", args=["daily"], hour=settings.digest_daily_hour,
+            id="alerts_daily_digest", coalesce=True, max_instances=1, replace_existing=True
+        )
+        scheduler.add_job(
+            self.flush, "cron", args=["weekly"], day_of_week=settings.digest_weekly_day,
+            hour=settings.digest_daily_hour,
+            id="alerts_weekly_digest", coalesce=True, max_instances=1, replace_existing=True
+        )
+
+
+# Global delivery engine
+alert_delivery = AlertDeliveryEngine()
+
+
+def _routing(alert: NewsAlert, article: Optional[NewsArticle]) -> dict:
+    """Arguments for `AlertDeliveryEngine.dispatch` describing a news alert."""
+    return {
+        "alert": AlertMessage(
+            alert_id=alert.id,
+            article_id=alert.article_id,
+            alert_type=alert.alert_type,
+            severity=alert.severity,
+            title=alert.title,
+            message=alert.message,
+        ),
+        "categories": [article.category] if article is not None and article.category else [],
+        "sectors": list(alert.affected_sectors or []) + list((article.sectors_affected if article else None) or []),
+        "keywords": list((article.keywords if article else None) or []),
+        "assets": list(alert.affected_assets or []) + list((article.assets_mentioned if article else None) or []),
+        "impact_score": article.impact_score if article is not None else None,
+    }
+
+
+def _alert_snapshot(session: Session, alert: NewsAlert):
+    # Only freshly inserted, undelivered alerts are routed
+    if alert not in session.new or alert.is_sent or alert.is_active is False:
+        return None
+    return _routing(alert, session.get(NewsArticle, alert.article_id))
+
+
+def _apply_alerts(upserted: list, deleted: list) -> None:
+    for routed in upserted:
+        if routed is not None:
+            alert_delivery.dispatch(**routed)
+
+
+register_commit_hook(NewsAlert, _apply_alerts, _alert_snapshot)
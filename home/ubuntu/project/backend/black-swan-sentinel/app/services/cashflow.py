@@ -0,0 +1,345 @@
+"""
+Vectorized cash-flow projection for burn rate, emergency fund and runway.
+
+Recurring expenses and income are aggregated in SQL per (user, frequency,
+billing slot), so each user contributes a handful of rows however many
+items or recorded occurrences they have. Every frequency/phase combination maps to one row of a
+schedule matrix (a quarterly bill booked in February lands in months 2, 5,
+8, ...), and a single matrix product expands all users into monthly
+income and expense arrays of shape (users, months). Runway, burn ratio and
+emergency-fund coverage are then computed for every user at once, and
+scenario shocks scale those arrays without expanding schedules again.
+
+NumPy is imported with this module, so the API layer imports it lazily.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+from sqlalchemy import case, extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.portfolio import FREQUENCY_TO_MONTHLY, AssetType, Expense, Holding, Income, Portfolio
+from app.services.holding_index import HOLDING_VALUE
+
+# Schedule matrix rows: daily, weekly and monthly items are due every month;
+# quarterly and yearly items have one row per phase (month offset)
+_DAILY, _WEEKLY, _MONTHLY, _QUARTERLY, _YEARLY = 0, 1, 2, 3, 6
+_SCHEDULE_ROWS = _YEARLY + 12
+
+# Burn ratio (expenses / income) at which burn rate risk starts, and where it saturates
+BURN_RATIO_SAFE = 0.5
+BURN_RATIO_CRITICAL = 1.0
+
+Factor = Union[float, np.ndarray]
+
+
+def schedule_matrix(horizon: int) -> np.ndarray:
+    """Amount multiplier per schedule row and projected month, shape (rows, horizon)."""
+    months = np.arange(horizon)
+    schedule = np.zeros((_SCHEDULE_ROWS, horizon))
+    schedule[_DAILY] = FREQUENCY_TO_MONTHLY["daily"]
+    schedule[_WEEKLY] = FREQUENCY_TO_MONTHLY["weekly"]
+    schedule[_MONTHLY] = 1.0
+    for phase in range(3):
+        schedule[_QUARTERLY + phase] = (months % 3) == phase
+    for phase in range(12):
+        schedule[_YEARLY + phase] = (months % 12) == phase
+    return schedule
+
+
+def _schedule_rows(frequencies: np.ndarray, slots: np.ndarray, start_month: int) -> np.ndarray:
+    """Schedule row of each aggregated item; unknown frequencies count as monthly."""
+    phase = (slots - start_month) % 12
+    rows = np.full(len(frequencies), _MONTHLY)
+    rows[frequencies == "daily"] = _DAILY
+    rows[frequencies == "weekly"] = _WEEKLY
+    quarterly = frequencies == "quarterly"
+    rows[quarterly] = _QUARTERLY + phase[quarterly] % 3
+    yearly = frequencies == "yearly"
+    rows[yearly] = _YEARLY + phase[yearly]
+    return rows
+
+
+@dataclass(frozen=True)
+class CashflowShock:
+    """
+    Income/expense change applied to a projection.
+
+    Factors may be scalars or per-user arrays of shape (users, 1). A
+    duration of None lasts to the end of the horizon.
+    """
+    income_factor: Factor = 1.0
+    expense_factor: Factor = 1.0
+    start_month: int = 0
+    duration_months: Optional[int] = None
+    one_off_expense: Factor = 0.0
+    # One-off cost as a multiple of each user's average monthly expenses
+    one_off_expense_months: float = 0.0
+
+
+# Default cash-flow impact per scenario type; scenario_config keys override them
+SCENARIO_SHOCKS: Dict[str, CashflowShock] = {
+    "job_loss": CashflowShock(income_factor=0.0, duration_months=6),
+    "health_emergency": CashflowShock(expense_factor=1.2, duration_months=6, one_off_expense_months=3.0),
+    "natural_disaster": CashflowShock(income_factor=0.7, duration_months=3, one_off_expense_months=2.0),
+    "inflation_surge": CashflowShock(expense_factor=1.15),
+    "interest_rate_shock": CashflowShock(expense_factor=1.08),
+    "market_crash": CashflowShock(income_factor=0.95, duration_months=12),
+    "currency_devaluation": CashflowShock(expense_factor=1.1),
+}
+
+
+def shock_for_scenario(scenario_type: str, scenario_config: Optional[dict] = None) -> CashflowShock:
+    """Cash-flow shock for a scenario, adjusted by its income/expense config keys."""
+    shock = SCENARIO_SHOCKS.get(scenario_type, CashflowShock())
+    config = scenario_config or {}
+    overrides = {}
+    if "income_loss_percent" in config:
+        overrides["income_factor"] = 1.0 - float(config["income_loss_percent"]) / 100
+    if "expense_increase_percent" in config:
+        overrides["expense_factor"] = 1.0 + float(config["expense_increase_percent"]) / 100
+    if "one_off_expense" in config:
+        overrides["one_off_expense"] = float(config["one_off_expense"])
+    for key in ("start_month", "duration_months"):
+        if key in config:
+            overrides[key] = int(config[key]) if config[key] is not None else None
+    return replace(shock, **overrides)
+
+
+@dataclass(frozen=True)
+class CashflowProjection:
+    """Monthly income and expenses for many users over a common horizon."""
+    user_ids: np.ndarray
+    income: np.ndarray
+    expenses: np.ndarray
+    liquid_assets: np.ndarray
+    start: date
+
+    @property
+    def horizon(self) -> int:
+        return self.income.shape[1]
+
+    @property
+    def net(self) -> np.ndarray:
+        return self.income - self.expenses
+
+    @property
+    def monthly_income(self) -> np.ndarray:
+        return self.income.mean(axis=1)
+
+    @property
+    def monthly_expenses(self) -> np.ndarray:
+        return self.expenses.mean(axis=1)
+
+    def index_of(self, user_id: int) -> int:
+        """Row of a user in the projection arrays."""
+        position = int(np.searchsorted(self.user_ids, user_id))
+        if position >= len(self.user_ids) or self.user_ids[position] != user_id:
+            raise KeyError(user_id)
+        return position
+
+    def burn_ratio(self) -> np.ndarray:
+        """Average expenses over average income; inf when expenses have no income against them."""
+        income, expenses = self.monthly_income, self.monthly_expenses
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(income > 0, expenses / income, np.where(expenses > 0, np.inf, 0.0))
+
+    def emergency_fund_months(self) -> np.ndarray:
+        """Months of average expenses covered by liquid assets."""
+        expenses = self.monthly_expenses
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(expenses > 0, self.liquid_assets / expenses, np.inf)
+
+    def balances(self) -> np.ndarray:
+        """Liquid balance at the end of each projected month."""
+        return self.liquid_assets[:, None] + np.cumsum(self.net, axis=1)
+
+    def cash_need(self) -> np.ndarray:
+        """Largest cumulative shortfall of income against expenses over the horizon (0 if never short)."""
+        return np.maximum(-np.cumsum(self.net, axis=1).min(axis=1), 0.0)
+
+    def runway_months(self) -> np.ndarray:
+        """Months until liquid assets run out (fractional); inf if they last the horizon."""
+        balances = self.balances()
+        short = balances < 0
+        runs_out = short.any(axis=1)
+        month = short.argmax(axis=1)
+        rows = np.arange(len(month))
+        before = np.where(month > 0, balances[rows, np.maximum(month - 1, 0)], self.liquid_assets)
+        deficit = -self.net[rows, month]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(deficit > 0, np.clip(before, 0, None) / deficit, 0.0)
+        return np.where(runs_out, month + np.minimum(fraction, 1.0), np.inf)
+
+    def burn_rate_risk(self) -> np.ndarray:
+        """0-100 score, rising from a burn ratio of BURN_RATIO_SAFE to BURN_RATIO_CRITICAL."""
+        ratio = self.burn_ratio()
+        return np.clip((ratio - BURN_RATIO_SAFE) / (BURN_RATIO_CRITICAL - BURN_RATIO_SAFE) * 100, 0.0, 100.0)
+
+    def emergency_fund_adequacy(self, target_months: Factor = 6.0) -> np.ndarray:
+        """0-100 share of the emergency fund target held in liquid assets."""
+        return np.clip(self.emergency_fund_months() / target_months * 100, 0.0, 100.0)
+
+    def apply(self, shock: CashflowShock) -> "CashflowProjection":
+        """Projection with the shock's factors applied to its window of months."""
+        months = np.arange(self.horizon)
+        end = self.horizon if shock.duration_months is None else shock.start_month + shock.duration_months
+        window = (months >= shock.start_month) & (months < end)
+
+        income = np.where(window, self.income * shock.income_factor, self.income)
+        expenses = np.where(window, self.expenses * shock.expense_factor, self.expenses)
+        if shock.start_month < self.horizon:
+            one_off = shock.one_off_expense + shock.one_off_expense_months * self.monthly_expenses[:, None]
+            expenses[:, shock.start_month] += np.broadcast_to(one_off, (len(self.user_ids), 1))[:, 0]
+        return replace(self, income=income, expenses=expenses)
+
+    def summary(self, user_id: int) -> dict:
+        """Cash-flow metrics of one user."""
+        i = self.index_of(user_id)
+        runway = float(self.runway_months()[i])
+        return {
+            "monthly_income": float(self.monthly_income[i]),
+            "monthly_expenses": float(self.monthly_expenses[i]),
+            "liquid_assets": float(self.liquid_assets[i]),
+            "burn_ratio": float(self.burn_ratio()[i]),
+            "emergency_fund_months": float(self.emergency_fund_months()[i]),
+            # Capped at the horizon: beyond it the projection says nothing
+            "cash_runway_months": min(runway, float(self.horizon)),
+        }
+
+
+def _month_start(as_of: Optional[date]) -> date:
+    as_of = as_of or date.today()
+    return as_of.replace(day=1)
+
+
+def _recurring_query(owner, frequency, when, amount, item_keys, *criteria):
+    """
+    Recurring amounts per (owner, frequency, slot).
+
+    A recurring item may be stored once or once per occurrence. Rows of the
+    same item (owner, frequency and item_keys) are summed per billing period
+    (day, week or month, by frequency), so distinct items that share a key
+    still add up, and the period totals are averaged so that repeated
+    occurrences count once. The slot is the calendar month for yearly items,
+    the month modulo 3 for quarterly items and 0 otherwise.
+    """
+    year, month = extract("year", when), extract("month", when)
+    slot = case(
+        (frequency == "yearly", month),
+        (frequency == "quarterly", month % 3),
+        else_=0,
+    )
+    period = case(
+        (frequency == "daily", (year * 100 + month) * 100 + extract("day", when)),
+        (frequency == "weekly", year * 100 + extract("week", when)),
+        else_=year * 100 + month,
+    )
+    periods = (
+        select(owner.label("owner"), frequency.label("frequency"), *item_keys, slot.label("slot"), func.sum(amount).label("amount"))
+        .where(*criteria)
+        .group_by(owner, frequency, *item_keys, slot, period)
+        .subquery()
+    )
+    item_columns = [periods.c[key.key] for key in item_keys]
+    items = (
+        select(periods.c.owner, periods.c.frequency, periods.c.slot, func.avg(periods.c.amount).label("amount"))
+        .group_by(periods.c.owner, periods.c.frequency, *item_columns, periods.c.slot)
+        .subquery()
+    )
+    return (
+        select(items.c.owner, items.c.frequency, items.c.slot, func.sum(items.c.amount))
+        .group_by(items.c.owner, items.c.frequency, items.c.slot)
+    )
+
+
+async def load_projection(
+    db: AsyncSession,
+    user_ids: Optional[Iterable[int]] = None,
+    horizon_months: Optional[int] = None,
+    as_of: Optional[date] = None,
+    portfolio_ids: Optional[Iterable[int]] = None
+) -> CashflowProjection:
+    """
+    Project recurring income and expenses for the given users (default: every user with a portfolio or income).
+
+    `portfolio_ids` restricts expenses and liquid assets to those portfolios;
+    income belongs to the user and is always counted in full.
+    """
+    horizon = horizon_months or settings.cashflow_horizon_months
+    start = _month_start(as_of)
+    user_filter = list(user_ids) if user_ids is not None else None
+
+    expense_criteria = [Portfolio.id == Expense.portfolio_id, Expense.is_recurring.is_(True)]
+    income_criteria = [Income.is_recurring.is_(True)]
+    # Cash balances plus cash-like holdings are spendable without a sale
+    cash_holdings = (
+        select(
+            Holding.portfolio_id,
+            func.sum(HOLDING_VALUE).label("value")
+        )
+        .where(Holding.asset_type == AssetType.CASH)
+        .group_by(Holding.portfolio_id)
+        .subquery()
+    )
+    liquid_query = (
+        select(Portfolio.user_id, func.sum(func.coalesce(Portfolio.cash_balance, 0.0) + func.coalesce(cash_holdings.c.value, 0.0)))
+        .outerjoin(cash_holdings, cash_holdings.c.portfolio_id == Portfolio.id)
+        .where(Portfolio.is_active.is_(True))
+        .group_by(Portfolio.user_id)
+    )
+    if user_filter is not None:
+        expense_criteria.append(Portfolio.user_id.in_(user_filter))
+        income_criteria.append(Income.user_id.in_(user_filter))
+        liquid_query = liquid_query.where(Portfolio.user_id.in_(user_filter))
+    if portfolio_ids is not None:
+        portfolio_filter = list(portfolio_ids)
+        expense_criteria.append(Portfolio.id.in_(portfolio_filter))
+        liquid_query = liquid_query.where(Portfolio.id.in_(portfolio_filter))
+
+    expense_rows = (await db.execute(_recurring_query(
+        Portfolio.user_id, Expense.frequency, Expense.expense_date, Expense.amount,
+        (Expense.portfolio_id, Expense.category, Expense.subcategory, Expense.description), *expense_criteria
+    ))).all()
+    income_rows = (await db.execute(_recurring_query(
+        Income.user_id, Income.frequency, Income.income_date, Income.amount, (Income.source, Income.description), *income_criteria
+    ))).all()
+    liquid_rows = (await db.execute(liquid_query)).all()
+
+    if user_filter is not None:
+        ids = np.unique(np.asarray(user_filter, dtype=np.int64))
+    else:
+        ids = np.unique(np.fromiter(
+            (row[0] for rows in (expense_rows, income_rows, liquid_rows) for row in rows), dtype=np.int64
+        ))
+
+    schedule = schedule_matrix(horizon)
+
+    def expand(rows) -> np.ndarray:
+        amounts = np.zeros((len(ids), _SCHEDULE_ROWS))
+        if rows:
+            owners, frequencies, slots, totals = zip(*rows)
+            np.add.at(
+                amounts,
+                (np.searchsorted(ids, np.asarray(owners, dtype=np.int64)),
+                 _schedule_rows(np.asarray(frequencies, dtype=object), np.asarray(slots, dtype=np.int64), start.month)),
+                np.asarray(totals, dtype=float),
+            )
+        return amounts @ schedule
+
+    liquid = np.zeros(len(ids))
+    if liquid_rows:
+        owners, values = zip(*liquid_rows)
+        liquid[np.searchsorted(ids, np.asarray(owners, dtype=np.int64))] = np.asarray(values, dtype=float)
+
+    return CashflowProjection(
+        user_ids=ids,
+        income=expand(income_rows),
+        expenses=expand(expense_rows),
+        liquid_assets=liquid,
+        start=start,
+    )
@@ -0,0 +1,410 @@
+"""
+Historical crisis replay for disaster simulations.
+
+A crisis is a window of daily log returns for a set of market series,
+stored as a compressed NumPy archive (`<crisis>.npz` under
+`crisis_data_dir`, written by `scripts/convert_crisis_series.py` from
+licensed index history). Series keys name what they stand for:
+
+    market               broad market index, the fallback for any holding
+    asset_type:<type>    an AssetType, e.g. asset_type:bond
+    sector:<sector>      a Holding.sector, e.g. sector:banking
+
+Each holding follows its sector series if the crisis has one, then its
+asset type series, then the market (cash holdings without a series stay
+flat). Holdings are grouped into a few buckets of (series, asset type,
+sector), so the cost of a replay depends on the number of buckets, not
+holdings. The exact historical path is one replay; block-bootstrapped
+variants resample contiguous blocks of crisis days for every iteration at
+once, keeping the volatility clustering and cross-series correlation of
+the real crash without fitting a parametric model.
+
+NumPy is imported with this module, so the API layer imports it lazily.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.portfolio import AssetType, Holding, Portfolio
+from app.services.holding_index import holding_value
+
+MARKET_SERIES = "market"
+
+# scenario_config["mode"] selecting a replay instead of the parametric simulation
+REPLAY_MODE = "replay"
+
+# Iterations simulated per array pass; bounds memory at (chunk, horizon, series)
+ITERATION_CHUNK = 2000
+
+# Loss above which a path counts as ruin (matches DisasterSimulation.probability_of_ruin)
+RUIN_LOSS = 0.9
+
+
+class CrisisDataError(ValueError):
+    """A crisis file is missing, malformed or does not cover a portfolio."""
+
+
+def sector_series(sector: str) -> str:
+    return f"sector:{str(sector).strip().lower()}"
+
+
+def asset_type_series(asset_type: AssetType) -> str:
+    return f"asset_type:{asset_type.value}"
+
+
+@dataclass(frozen=True)
+class CrisisSeries:
+    """Daily log returns of several market series over one crisis window."""
+    name: str
+    description: str
+    source: str
+    dates: np.ndarray  # datetime64[D], shape (days,)
+    keys: Tuple[str, ...]
+    returns: np.ndarray  # float32 log returns, shape (days, series)
+
+    @property
+    def days(self) -> int:
+        return self.returns.shape[0]
+
+    def column(self, key: str) -> Optional[int]:
+        try:
+            return self.keys.index(key)
+        except ValueError:
+            return None
+
+    def save(self, path: str) -> None:
+        """Write the series as a compressed `.npz` archive."""
+        np.savez_compressed(
+            path,
+            dates=self.dates.astype("datetime64[D]"),
+            keys=np.asarray(self.keys, dtype=str),
+            returns=self.returns.astype(np.float32),
+            meta=np.asarray(json.dumps({"name": self.name, "description": self.description, "source": self.source})),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CrisisSeries":
+        """Read a `.npz` archive written by `save`."""
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                meta = json.loads(str(archive["meta"]))
+                series = cls(
+                    name=meta["name"],
+                    description=meta.get("description", ""),
+                    source=meta.get("source", ""),
+                    dates=archive["dates"].astype("datetime64[D]"),
+                    keys=tuple(str(key) for key in archive["keys"]),
+                    returns=archive["returns"].astype(np.float32),
+                )
+        except (OSError, KeyError, ValueError) as exc:
+            raise CrisisDataError(f"Cannot read crisis file {path}: {exc}") from exc
+        if series.returns.shape != (len(series.dates), len(series.keys)):
+            raise CrisisDataError(f"Crisis file {path} has returns of shape {series.returns.shape}")
+        return series
+
+
+_loaded: Dict[str, Tuple[float, CrisisSeries]] = {}
+
+
+def available_crises(data_dir: Optional[str] = None) -> List[str]:
+    """Names of the crisis files in the data directory."""
+    data_dir = data_dir or settings.crisis_data_dir
+    if not os.path.isdir(data_dir):
+        return []
+    return sorted(name[:-4] for name in os.listdir(data_dir) if name.endswith(".npz"))
+
+
+def load_crisis(name: str, data_dir: Optional[str] = None) -> CrisisSeries:
+    """Load a crisis by name, cached until its file changes."""
+    if not name or os.sep in name or name.startswith("."):
+        raise CrisisDataError(f"Invalid crisis name: {name!r}")
+    path = os.path.join(data_dir or settings.crisis_data_dir, f"{name}.npz")
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        raise CrisisDataError(f"Unknown crisis: {name}") from None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != modified:
+        cached = (modified, CrisisSeries.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+@dataclass(frozen=True)
+class HoldingPosition:
+    """What a replay needs to know about one holding."""
+    symbol: str
+    asset_type: AssetType
+    sector: Optional[str]
+    value: float
+
+
+@dataclass(frozen=True)
+class Buckets:
+    """Holdings grouped by the series they follow, with their asset type and sector."""
+    columns: np.ndarray  # crisis series column per bucket; -1 stays flat
+    asset_types: Tuple[AssetType, ...]
+    sectors: Tuple[Optional[str], ...]
+    values: np.ndarray  # current value per bucket
+
+    @property
+    def total(self) -> float:
+        return float(self.values.sum())
+
+
+def map_positions(crisis: CrisisSeries, positions: Iterable[HoldingPosition]) -> Buckets:
+    """Group holdings into buckets by the crisis series each one follows."""
+    market = crisis.column(MARKET_SERIES)
+    grouped: Dict[Tuple[int, AssetType, Optional[str]], float] = {}
+    unmapped = set()
+    for position in positions:
+        column = crisis.column(sector_series(position.sector)) if position.sector else None
+        if column is None:
+            column = crisis.column(asset_type_series(position.asset_type))
+        if column is None:
+            if position.asset_type == AssetType.CASH:
+                column = -1
+            elif market is not None:
+                column = market
+            else:
+                unmapped.add(position.symbol)
+                continue
+        key = (column, position.asset_type, position.sector)
+        grouped[key] = grouped.get(key, 0.0) + position.value
+    if unmapped:
+        raise CrisisDataError(
+            f"Crisis {crisis.name} has no '{MARKET_SERIES}' series for unmatched holdings: {', '.join(sorted(unmapped))}"
+        )
+
+    keys = list(grouped)
+    return Buckets(
+        columns=np.asarray([key[0] for key in keys], dtype=np.int64),
+        asset_types=tuple(key[1] for key in keys),
+        sectors=tuple(key[2] for key in keys),
+        values=np.asarray([grouped[key] for key in keys], dtype=float),
+    )
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    """Outcome of every replayed path."""
+    crisis: str
+    buckets: Buckets
+    bucket_values: np.ndarray  # (iterations, buckets) value at the end of the horizon
+    final_values: np.ndarray  # (iterations,)
+    max_drawdown: np.ndarray  # (iterations,) fraction of the running peak
+    max_drawdown_day: np.ndarray  # (iterations,)
+    recovery_day: np.ndarray  # (iterations,) first day back at the pre-trough peak; -1 if never
+    horizon_days: int
+
+    @property
+    def initial_value(self) -> float:
+        return self.buckets.total
+
+    @property
+    def losses(self) -> np.ndarray:
+        return self.initial_value - self.final_values
+
+    @property
+    def loss_fractions(self) -> np.ndarray:
+        if self.initial_value <= 0:
+            return np.zeros_like(self.final_values)
+        return self.losses / self.initial_value
+
+    def value_at_risk(self, confidence: float) -> float:
+        """Loss not exceeded with the given confidence (e.g. 99)."""
+        return float(np.percentile(self.losses, confidence))
+
+    def _impacts(self, labels: Sequence[str]) -> Dict[str, dict]:
+        impacts: Dict[str, dict] = {}
+        mean_values = self.bucket_values.mean(axis=0)
+        for label, before, after in zip(labels, self.buckets.values, mean_values):
+            impact = impacts.setdefault(label, {"value": 0.0, "expected_value": 0.0})
+            impact["value"] += float(before)
+            impact["expected_value"] += float(after)
+        for impact in impacts.values():
+            impact["expected_loss"] = impact["value"] - impact["expected_value"]
+            impact["expected_loss_percent"] = impact["expected_loss"] / impact["value"] * 100 if impact["value"] else 0.0
+        return impacts
+
+    def asset_impacts(self) -> Dict[str, dict]:
+        """Expected loss per asset type (DamageReport.asset_impacts)."""
+        return self._impacts([asset_type.value for asset_type in self.buckets.asset_types])
+
+    def sector_impacts(self) -> Dict[str, dict]:
+        """Expected loss per sector (DamageReport.sector_impacts)."""
+        return self._impacts([sector or "unclassified" for sector in self.buckets.sectors])
+
+    def summary(self, confidence_levels: Iterable[float] = (95, 99)) -> dict:
+        """Headline metrics in the shape of DisasterSimulation's result columns."""
+        recovered = self.recovery_day[self.recovery_day >= 0]
+        return {
+            "crisis": self.crisis,
+            "iterations": len(self.final_values),
+            "horizon_days": self.horizon_days,
+            "initial_value": self.initial_value,
+            "expected_loss": float(self.losses.mean()),
+            "worst_case_loss": self.value_at_risk(99),
+            "value_at_risk": {str(level): self.value_at_risk(level) for level in confidence_levels},
+            "probability_of_ruin": float((self.loss_fractions > RUIN_LOSS).mean()),
+            "expected_max_drawdown": float(self.max_drawdown.mean()),
+            "recovery_time_days": int(np.median(recovered)) if len(recovered) else None,
+            "recovery_probability": float(len(recovered) / len(self.recovery_day)) if len(self.recovery_day) else 0.0,
+        }
+
+
+def block_bootstrap_indices(
+    days: int,
+    horizon: int,
+    iterations: int,
+    block_days: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """Day indices of `iterations` paths built from random contiguous blocks, shape (iterations, horizon)."""
+    block_days = max(1, min(block_days, days))
+    blocks = -(-horizon // block_days)
+    starts = rng.integers(0, days - block_days + 1, size=(iterations, blocks))
+    indices = starts[:, :, None] + np.arange(block_days)
+    return indices.reshape(iterations, blocks * block_days)[:, :horizon]
+
+
+def _replay_paths(crisis: CrisisSeries, buckets: Buckets, indices: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Bucket values and drawdown statistics for a batch of day-index paths."""
+    columns = np.unique(buckets.columns[buckets.columns >= 0])
+    position = np.searchsorted(columns, buckets.columns)
+    # Cumulative log return of each used series along each path: (paths, horizon, series)
+    growth = np.exp(np.cumsum(crisis.returns[:, columns][indices], axis=1, dtype=np.float32))
+    # Flat buckets (no series) get a constant growth of 1 in an extra last column
+    growth = np.concatenate([growth, np.ones(growth.shape[:2] + (1,), dtype=np.float32)], axis=2)
+    position = np.where(buckets.columns >= 0, position, len(columns))
+
+    column_values = np.bincount(position, weights=buckets.values, minlength=len(columns) + 1)
+    totals = growth @ column_values.astype(np.float32)
+    bucket_values = growth[:, -1, position] * buckets.values
+
+    initial = np.full((len(totals), 1), buckets.total, dtype=np.float32)
+    path = np.concatenate([initial, totals], axis=1)
+    peaks = np.maximum.accumulate(path, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peaks > 0, 1.0 - path / peaks, 0.0)
+    trough = drawdown.argmax(axis=1)
+    rows = np.arange(len(path))
+    recovered = (path >= peaks[rows, trough][:, None]) & (np.arange(path.shape[1]) > trough[:, None])
+    recovery = np.where(recovered.any(axis=1), recovered.argmax(axis=1), -1)
+    max_drawdown = drawdown[rows, trough]
+    # Paths that never fell below their starting value have nothing to recover from
+    recovery = np.where(max_drawdown > 0, recovery, 0)
+    return bucket_values, totals[:, -1], max_drawdown, trough, recovery
+
+
+def replay(
+    crisis: CrisisSeries,
+    buckets: Buckets,
+    iterations: int = 0,
+    horizon_days: Optional[int] = None,
+    block_days: Optional[int] = None,
+    seed: Optional[int] = None
+) -> ReplayResult:
+    """
+    Replay a crisis against bucketed holdings.
+
+    With `iterations=0` the single historical path is replayed over the whole
+    crisis window (or its first `horizon_days`); otherwise `iterations`
+    block-bootstrapped paths of `horizon_days` are simulated.
+    """
+    horizon = min(horizon_days or crisis.days, crisis.days) if iterations == 0 else (horizon_days or crisis.days)
+    if iterations == 0:
+        batches = [np.arange(horizon)[None, :]]
+    else:
+        rng = np.random.default_rng(seed)
+        block_days = block_days or settings.crisis_block_days
+        batches = (
+            block_bootstrap_indices(crisis.days, horizon, min(ITERATION_CHUNK, iterations - start), block_days, rng)
+            for start in range(0, iterations, ITERATION_CHUNK)
+        )
+
+    parts = [_replay_paths(crisis, buckets, indices) for indices in batches]
+    bucket_values, final_values, max_drawdown, drawdown_day, recovery_day = (
+        np.concatenate(column) for column in zip(*parts)
+    )
+    return ReplayResult(
+        crisis=crisis.name,
+        buckets=buckets,
+        bucket_values=bucket_values,
+        final_values=final_values.astype(float),
+        max_drawdown=max_drawdown.astype(float),
+        max_drawdown_day=drawdown_day,
+        recovery_day=recovery_day,
+        horizon_days=horizon,
+    )
+
+
+def is_replay(scenario_config: Optional[dict]) -> bool:
+    """Whether a simulation or template config asks for a crisis replay."""
+    return bool(scenario_config) and scenario_config.get("mode") == REPLAY_MODE
+
+
+async def load_positions(
+    db: AsyncSession,
+    user_id: int,
+    portfolio_id: Optional[int] = None
+) -> List[HoldingPosition]:
+    """Current holdings of a user (or one of their portfolios) for a replay."""
+    query = (
+        select(
+            Holding.symbol, Holding.asset_type, Holding.sector,
+            Holding.quantity, Holding.current_value, Holding.current_price, Holding.average_price,
+        )
+        .join(Portfolio, Portfolio.id == Holding.portfolio_id)
+        .where(Portfolio.user_id == user_id)
+    )
+    if portfolio_id is not None:
+        query = query.where(Portfolio.id == portfolio_id)
+    return [
+        HoldingPosition(
+            symbol=row.symbol,
+            asset_type=row.asset_type,
+            sector=row.sector,
+            value=holding_value(row.quantity, row.current_value, row.current_price, row.average_price),
+        )
+        for row in await db.execute(query)
+    ]
+
+
+async def replay_portfolio(
+    db: AsyncSession,
+    user_id: int,
+    scenario_config: dict,
+    portfolio_id: Optional[int] = None,
+    iterations: Optional[int] = None,
+    horizon_days: Optional[int] = None,
+    seed: Optional[int] = None
+) -> ReplayResult:
+    """
+    Run a replay described by a scenario config.
+
+    `scenario_config` names the crisis (`{"mode": "replay", "crisis": "gfc_2008"}`)
+    and may set `block_days` and `historical_only` (replay the actual path once).
+    """
+    crisis = load_crisis(scenario_config.get("crisis", ""))
+    buckets = map_positions(crisis, await load_positions(db, user_id, portfolio_id))
+    if scenario_config.get("historical_only"):
+        iterations = 0
+    elif iterations is None:
+        iterations = settings.simulation_iterations
+    return replay(
+        crisis,
+        buckets,
+        iterations=iterations,
+        horizon_days=horizon_days,
+        block_days=scenario_config.get("block_days"),
+        seed=seed,
+    )
+
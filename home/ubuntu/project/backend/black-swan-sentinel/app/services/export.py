@@ -0,0 +1,237 @@
+"""
+Streaming exports of transactions, risk assessments and damage reports.
+
+Rows are read through a server-side cursor (`AsyncSession.stream` with
+`yield_per`) in chunks of `export_chunk_size` and each chunk is encoded and
+handed to the response before the next one is fetched, so memory stays
+bounded by the chunk size however many rows an account has. Formats are
+CSV, NDJSON and Parquet (one row group per chunk; needs the optional
+`pyarrow` package).
+"""
+
+import asyncio
+import csv
+import enum
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+    PARQUET: "application/vnd.apache.parquet",
+}
+
+
+class ExportFormatError(ValueError):
+    """Raised when an export format cannot be produced."""
+
+
+def _plain(value: Any) -> Any:
+    """Value as a JSON/CSV friendly scalar."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class CSVEncoder:
+    """Encodes chunks of rows as CSV with a header line."""
+
+    def __init__(self, columns: Sequence):
+        self.names = [column.name for column in columns]
+
+    def header(self) -> bytes:
+        return self._write([self.names])
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        return self._write(
+            [
+                json.dumps(value) if isinstance(value, (dict, list)) else _plain(value)
+                for value in row
+            ]
+            for row in rows
+        )
+
+    def finish(self) -> bytes:
+        return b""
+
+    @staticmethod
+    def _write(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+class NDJSONEncoder:
+    """Encodes chunks of rows as one JSON object per line."""
+
+    def __init__(self, columns: Sequence):
+        self.names = [column.name for column in columns]
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        lines = (
+            json.dumps({name: _plain(value) for name, value in zip(self.names, row)}, default=str)
+            for row in rows
+        )
+        return "".join(line + "\n" for line in lines).encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet footers hold absolute offsets, so report the total written
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class ParquetEncoder:
+    """Encodes each chunk of rows as one Parquet row group."""
+
+    def __init__(self, columns: Sequence):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportFormatError("Parquet export requires the optional 'pyarrow' package")
+        self._pa = pa
+        self.names = [column.name for column in columns]
+        # Fixed schema from the column types, so an all-null chunk cannot change it
+        self.schema = pa.schema([(column.name, self._arrow_type(column)) for column in columns])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema)
+
+    def _arrow_type(self, column):
+        pa = self._pa
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+        return pa.string()
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        arrays = []
+        for index, field in enumerate(self.schema):
+            values = [row[index] for row in rows]
+            if self._pa.types.is_string(field.type):
+                values = [
+                    None if value is None
+                    else json.dumps(value) if isinstance(value, (dict, list))
+                    else str(_plain(value))
+                    for value in values
+                ]
+            arrays.append(self._pa.array(values, type=field.type))
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+ENCODERS = {CSV: CSVEncoder, NDJSON: NDJSONEncoder, PARQUET: ParquetEncoder}
+
+
+def create_encoder(export_format: str, columns: Sequence):
+    """Encoder for a format; raises ExportFormatError when it cannot be produced."""
+    if export_format not in ENCODERS:
+        raise ExportFormatError(f"Unsupported format '{export_format}'")
+    return ENCODERS[export_format](columns)
+
+
+async def stream_export(
+    query: Select,
+    encoder,
+    chunk_size: Optional[int] = None,
+    session_factory=ReadSessionLocal
+) -> AsyncIterator[bytes]:
+    """Yield an encoded export of `query`, fetching and encoding one chunk at a time."""
+    chunk_size = chunk_size or settings.export_chunk_size
+    rows_exported = 0
+
+    yield encoder.header()
+    # Opened here rather than taken from the request: the response outlives the request session
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            rows_exported += len(rows)
+            yield await asyncio.to_thread(encoder.encode, rows)
+    yield encoder.finish()
+
+    logger.info("Exported %d rows as %s", rows_exported, type(encoder).__name__)
+
+
+def export_response(model, export_format: str, name: str, where=(), order_by=()) -> StreamingResponse:
+    """Streaming download of every column of `model` matching `where`."""
+    columns = list(model.__table__.columns)
+    try:
+        encoder = create_encoder(export_format, columns)
+    except ExportFormatError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+    query = select(*columns).where(*where).order_by(*order_by)
+    filename = f"{name}-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    return StreamingResponse(
+        stream_export(query, encoder),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
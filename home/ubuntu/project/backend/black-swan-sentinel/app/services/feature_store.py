@@ -0,0 +1,378 @@
+"""
+Per-user financial feature store.
+
+Risk scans, simulations and playbooks all start from the same derived
+numbers: allocation weights, liquid assets, monthly burn, income stability
+and the largest exposures. They are computed in batches (one grouped query
+per source table plus the vectorized cash-flow projection), kept in an
+in-memory mirror and persisted to `user_features`, so consumers read one
+compact row per user.
+
+Commit hooks on holdings, portfolios, expenses and income mark the owning
+user dirty. Reads recompute dirty or outdated users on the spot without
+writing; a periodic job recomputes the remaining dirty users and persists
+everything recomputed since its last run. Each row carries the feature
+definition version and a per-user revision, and rows older than
+`feature_store_max_age_minutes` are treated as stale, which bounds the lag
+for changes committed by other workers.
+"""
+
+import heapq
+import logging
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.core.write_queue import write_queue
+from app.models.features import UserFeatures
+from app.models.portfolio import Expense, Holding, Income, Portfolio
+from app.models.user import User
+from app.services.holding_index import HOLDING_VALUE, holding_index
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when a feature definition changes; rows from older versions are recomputed
+FEATURE_VERSION = 2
+
+# Exposures kept per user
+TOP_EXPOSURES = 5
+
+# Non-recurring income is averaged over this window when rating income stability
+ONE_OFF_INCOME_DAYS = 365
+
+
+@dataclass(frozen=True)
+class Features:
+    """One user's features, as stored in `user_features`."""
+    user_id: int
+    feature_version: int
+    revision: int  # 0 until the row is first persisted
+    portfolio_value: float
+    cash_balance: float
+    holdings_value: float
+    liquid_assets: float
+    allocation: Dict[str, float]
+    top_holdings: Tuple[Tuple[str, float], ...]
+    top_sectors: Tuple[Tuple[str, float], ...]
+    monthly_income: float
+    monthly_expenses: float
+    burn_ratio: Optional[float]
+    emergency_fund_months: Optional[float]
+    income_stability: float
+    income_sources: int
+    computed_at: datetime
+
+    @classmethod
+    def from_row(cls, row: UserFeatures) -> "Features":
+        values = {field.name: getattr(row, field.name) for field in fields(cls)}
+        values["allocation"] = dict(row.allocation or {})
+        values["top_holdings"] = tuple(tuple(item) for item in row.top_holdings or ())
+        values["top_sectors"] = tuple(tuple(item) for item in row.top_sectors or ())
+        if values["computed_at"].tzinfo is None:
+            # SQLite drops the offset; timestamps are written in UTC
+            values["computed_at"] = values["computed_at"].replace(tzinfo=timezone.utc)
+        return cls(**values)
+
+    def as_row(self) -> dict:
+        values = asdict(self)
+        values["top_holdings"] = [list(item) for item in self.top_holdings]
+        values["top_sectors"] = [list(item) for item in self.top_sectors]
+        return values
+
+
+def _finite(value: float) -> Optional[float]:
+    return None if value == float("inf") else float(value)
+
+
+def _top(values: Dict[str, float], total: float) -> Tuple[Tuple[str, float], ...]:
+    if total <= 0:
+        return ()
+    largest = heapq.nlargest(TOP_EXPOSURES, values.items(), key=lambda item: item[1])
+    return tuple((name, value / total) for name, value in largest)
+
+
+async def compute_features(db: AsyncSession, user_ids: List[int]) -> Dict[int, Features]:
+    """Compute features for a batch of users with one grouped query per source."""
+    # NumPy comes in with the projection; keep it out of worker startup
+    from app.services.cashflow import load_projection
+
+    if not user_ids:
+        return {}
+
+    projection = await load_projection(db, user_ids)
+    totals = {
+        row.user_id: row for row in await db.execute(
+            select(
+                Portfolio.user_id,
+                func.coalesce(func.sum(Portfolio.total_value), 0.0).label("portfolio_value"),
+                func.coalesce(func.sum(Portfolio.cash_balance), 0.0).label("cash_balance"),
+            )
+            .where(Portfolio.user_id.in_(user_ids))
+            .group_by(Portfolio.user_id)
+        )
+    }
+
+    value = func.sum(HOLDING_VALUE)
+    by_asset_type: Dict[int, Dict[str, float]] = {}
+    by_symbol: Dict[int, Dict[str, float]] = {}
+    by_sector: Dict[int, Dict[str, float]] = {}
+    for column, target in ((Holding.asset_type, by_asset_type), (Holding.symbol, by_symbol), (Holding.sector, by_sector)):
+        rows = await db.execute(
+            select(Portfolio.user_id, column, value)
+            .join(Portfolio, Portfolio.id == Holding.portfolio_id)
+            .where(Portfolio.user_id.in_(user_ids), column.is_not(None))
+            .group_by(Portfolio.user_id, column)
+        )
+        for user_id, key, amount in rows:
+            key = key.value if column is Holding.asset_type else key
+            target.setdefault(user_id, {})[key] = float(amount or 0.0)
+
+    since = datetime.now(timezone.utc) - timedelta(days=ONE_OFF_INCOME_DAYS)
+    one_off_income = dict((await db.execute(
+        select(Income.user_id, func.sum(Income.amount))
+        .where(Income.user_id.in_(user_ids), Income.is_recurring.is_(False), Income.income_date >= since)
+        .group_by(Income.user_id)
+    )).all())
+    income_sources = dict((await db.execute(
+        select(Income.user_id, func.count(distinct(Income.source)))
+        .where(Income.user_id.in_(user_ids))
+        .group_by(Income.user_id)
+    )).all())
+
+    burn_ratio = projection.burn_ratio()
+    emergency_months = projection.emergency_fund_months()
+    computed_at = datetime.now(timezone.utc)
+    features = {}
+    for i, user_id in enumerate(projection.user_ids.tolist()):
+        total = totals.get(user_id)
+        allocation = by_asset_type.get(user_id, {})
+        holdings_value = sum(allocation.values())
+        recurring_income = float(projection.monthly_income[i])
+        monthly_one_off = float(one_off_income.get(user_id) or 0.0) * 30.4375 / ONE_OFF_INCOME_DAYS
+        monthly_income = recurring_income + monthly_one_off
+        features[user_id] = Features(
+            user_id=user_id,
+            feature_version=FEATURE_VERSION,
+            revision=0,
+            portfolio_value=float(total.portfolio_value) if total else 0.0,
+            cash_balance=float(total.cash_balance) if total else 0.0,
+            holdings_value=holdings_value,
+            liquid_assets=float(projection.liquid_assets[i]),
+            allocation={
+                asset_type: amount / holdings_value for asset_type, amount in allocation.items()
+            } if holdings_value > 0 else {},
+            top_holdings=_top(by_symbol.get(user_id, {}), holdings_value),
+            top_sectors=_top(by_sector.get(user_id, {}), holdings_value),
+            monthly_income=recurring_income,
+            monthly_expenses=float(projection.monthly_expenses[i]),
+            burn_ratio=_finite(burn_ratio[i]),
+            emergency_fund_months=_finite(emergency_months[i]),
+            income_stability=recurring_income / monthly_income if monthly_income > 0 else 0.0,
+            income_sources=int(income_sources.get(user_id) or 0),
+            computed_at=computed_at,
+        )
+    return features
+
+
+class FeatureStore:
+    """In-memory mirror of `user_features` with dirty tracking."""
+
+    def __init__(self, cache_size: int = 50000, max_age: Optional[timedelta] = None, batch_size: int = 500):
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._mirror: LRUCache[Features] = LRUCache(maxsize=cache_size)
+        # Users whose source rows changed since their features were computed
+        self._dirty: Set[int] = set()
+        # Features recomputed on read that the refresh job still has to persist
+        self._unsaved: Dict[int, Features] = {}
+
+    def __len__(self) -> int:
+        return len(self._mirror)
+
+    @property
+    def dirty(self) -> Set[int]:
+        return set(self._dirty)
+
+    def mark_dirty(self, user_ids: Iterable[int]) -> None:
+        """Flag users whose features no longer match their source rows."""
+        self._dirty.update(user_ids)
+
+    def forget(self, user_ids: Iterable[int]) -> None:
+        """Drop deleted users from the mirror and from pending work."""
+        for user_id in user_ids:
+            self._mirror.pop(user_id)
+            self._dirty.discard(user_id)
+            self._unsaved.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Forget every mirrored row."""
+        self._mirror.clear()
+        self._dirty.clear()
+        self._unsaved.clear()
+
+    def is_stale(self, features: Features) -> bool:
+        """Whether features are outdated by a source change, a definition change or age."""
+        if features.user_id in self._dirty or features.feature_version != FEATURE_VERSION:
+            return True
+        return self.max_age is not None and datetime.now(timezone.utc) - features.computed_at > self.max_age
+
+    async def get(self, db: AsyncSession, user_id: int) -> Features:
+        """Fresh features for one user."""
+        return (await self.get_many(db, [user_id]))[user_id]
+
+    async def get_many(self, db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, Features]:
+        """Fresh features for many users: mirror first, then stored rows, recomputing only stale users."""
+        result: Dict[int, Features] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            features = self._mirror.get(user_id)
+            if features is not None and not self.is_stale(features):
+                result[user_id] = features
+            else:
+                missing.append(user_id)
+
+        stale = []
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            stored = {
+                row.user_id: Features.from_row(row) for row in (await db.execute(
+                    select(UserFeatures).where(UserFeatures.user_id.in_(batch))
+                )).scalars()
+            }
+            for user_id in batch:
+                features = stored.get(user_id)
+                if features is not None and not self.is_stale(features):
+                    self._mirror.set(user_id, features)
+                    result[user_id] = features
+                else:
+                    stale.append(user_id)
+
+        for user_id, features in (await self._recompute(db, stale)).items():
+            self._unsaved[user_id] = features
+            result[user_id] = features
+        return result
+
+    async def _recompute(self, db: AsyncSession, user_ids: List[int]) -> Dict[int, Features]:
+        # Clear the flags first: a commit landing mid-computation marks the user dirty again
+        self._dirty.difference_update(user_ids)
+        computed: Dict[int, Features] = {}
+        for start in range(0, len(user_ids), self.batch_size):
+            computed.update(await compute_features(db, user_ids[start:start + self.batch_size]))
+        for user_id, features in computed.items():
+            self._mirror.set(user_id, features)
+        return computed
+
+    async def _persist(self, features: List[Features]) -> None:
+        for start in range(0, len(features), self.batch_size):
+            batch = features[start:start + self.batch_size]
+            revisions = await write_queue.submit(self._writer(batch))
+            for item in batch:
+                # Only stamp the revision if nothing newer was mirrored meanwhile
+                if item.user_id in revisions and self._mirror.get(item.user_id) is item:
+                    self._mirror.set(item.user_id, replace(item, revision=revisions[item.user_id]))
+
+    @staticmethod
+    def _writer(batch: List[Features]):
+        async def write(db: AsyncSession) -> Dict[int, int]:
+            # A user deleted since the computation has nothing left to describe
+            user_ids = (await db.execute(
+                select(User.id).where(User.id.in_([item.user_id for item in batch]))
+            )).scalars().all()
+            if not user_ids:
+                return {}
+            previous = dict((await db.execute(
+                select(UserFeatures.user_id, UserFeatures.revision).where(UserFeatures.user_id.in_(user_ids))
+            )).all())
+            revisions = {user_id: previous.get(user_id, 0) + 1 for user_id in user_ids}
+            await db.execute(delete(UserFeatures).where(UserFeatures.user_id.in_(user_ids)))
+            await db.execute(insert(UserFeatures), [
+                {**item.as_row(), "revision": revisions[item.user_id]} for item in batch if item.user_id in revisions
+            ])
+            return revisions
+
+        return write
+
+    async def refresh(self, user_ids: Optional[Iterable[int]] = None) -> int:
+        """Recompute and persist features (default: every user); returns the number refreshed."""
+        async with ReadSessionLocal() as db:
+            if user_ids is None:
+                user_ids = (await db.execute(select(User.id).order_by(User.id))).scalars().all()
+            computed = await self._recompute(db, list(user_ids))
+        for user_id in computed:
+            self._unsaved.pop(user_id, None)
+        await self._persist(list(computed.values()))
+        return len(computed)
+
+    async def refresh_dirty(self) -> int:
+        """Recompute dirty users and persist them with features recomputed on read."""
+        dirty = sorted(self._dirty)
+        unsaved = self._unsaved
+        self._unsaved = {}
+        computed: Dict[int, Features] = {}
+        if dirty:
+            async with ReadSessionLocal() as db:
+                computed = await self._recompute(db, dirty)
+        pending = {**unsaved, **computed}
+        try:
+            await self._persist(list(pending.values()))
+        except Exception:
+            # Retry on the next run rather than leave the stored rows behind the mirror
+            self._unsaved = {**pending, **self._unsaved}
+            raise
+        if pending:
+            logger.info("Refreshed features for %d users", len(pending))
+        return len(pending)
+
+    def schedule_jobs(self, scheduler) -> None:
+        """Register the periodic refresh of dirty users on an APScheduler instance."""
+        scheduler.add_job(
+            self.refresh_dirty, "interval",
+            seconds=settings.feature_store_refresh_interval_seconds,
+            id="feature_store_refresh", coalesce=True, max_instances=1, replace_existing=True
+        )
+
+
+# Global feature store instance
+feature_store = FeatureStore(
+    cache_size=settings.feature_store_cache_size,
+    max_age=timedelta(minutes=settings.feature_store_max_age_minutes),
+    batch_size=settings.feature_store_batch_size,
+)
+
+
+def _portfolio_owner(session: Session, portfolio_id: int) -> Optional[int]:
+    user_id = holding_index.owner_of(portfolio_id)
+    if user_id is None:
+        user_id = session.execute(select(Portfolio.user_id).where(Portfolio.id == portfolio_id)).scalar()
+    return user_id
+
+
+def _by_portfolio(session: Session, obj) -> Optional[int]:
+    return _portfolio_owner(session, obj.portfolio_id)
+
+
+def _by_user(session: Session, obj) -> Optional[int]:
+    return obj.user_id
+
+
+def _mark_owners(upserted: list, deleted: list) -> None:
+    feature_store.mark_dirty(user_id for user_id in upserted + deleted if user_id is not None)
+
+
+def _forget_users(upserted: list, deleted: list) -> None:
+    feature_store.forget(deleted)
+
+
+register_commit_hook(Holding, _mark_owners, _by_portfolio)
+register_commit_hook(Expense, _mark_owners, _by_portfolio)
+register_commit_hook(Portfolio, _mark_owners, _by_user)
+register_commit_hook(Income, _mark_owners, _by_user)
+register_commit_hook(User, _forget_users, lambda session, user: user.id)
@@ -0,0 +1,294 @@
+"""
+Reverse index from held symbols and sectors to the users exposed to them.
+
+Holdings are indexed by `Holding.symbol` and `Holding.sector` together with
+their owning user and portfolio, and portfolio/user totals are maintained
+incrementally, so the exposure of every holder of a ticker can be resolved
+without joining holdings for each alert. Commit hooks keep the index current
+for this worker's ORM writes; a periodic rebuild picks up bulk statements and
+writes made by other workers.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.news import NewsAlert, NewsArticle
+from app.models.portfolio import Holding, Portfolio
+
+
+@dataclass(frozen=True)
+class HoldingEntry:
+    """Indexed view of a single holding."""
+    holding_id: int
+    portfolio_id: int
+    user_id: int
+    symbol: str
+    sector: Optional[str]
+    value: float
+
+
+@dataclass(frozen=True)
+class Exposure:
+    """Share of a portfolio (or of a user's wealth) held in the matched assets."""
+    user_id: int
+    portfolio_id: Optional[int]
+    value: float
+    weight: float
+
+
+def _symbol_key(symbol: str) -> str:
+    return str(symbol).strip().upper()
+
+
+def _sector_key(sector: str) -> str:
+    return str(sector).strip().lower()
+
+
+def holding_value(quantity, current_value, current_price, average_price) -> float:
+    """Best available market value of a holding."""
+    if current_value is not None:
+        return float(current_value)
+    price = current_price if current_price is not None else average_price
+    return float((quantity or 0.0) * (price or 0.0))
+
+
+# `holding_value` as a SQL expression, for queries that aggregate holdings
+HOLDING_VALUE = func.coalesce(
+    Holding.current_value,
+    Holding.quantity * func.coalesce(Holding.current_price, Holding.average_price)
+)
+
+
+class HoldingIndex:
+    """Symbol/sector -> holder index with incrementally maintained totals."""
+
+    def __init__(self):
+        self._holdings: Dict[int, HoldingEntry] = {}
+        self._by_symbol: Dict[str, Set[int]] = {}
+        self._by_sector: Dict[str, Set[int]] = {}
+        self._by_portfolio: Dict[int, Set[int]] = {}
+        self._portfolio_owner: Dict[int, int] = {}
+        self._portfolio_value: Dict[int, float] = {}
+        self._user_value: Dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._holdings)
+
+    def owner_of(self, portfolio_id: int) -> Optional[int]:
+        """Return the cached owner of a portfolio, if known."""
+        return self._portfolio_owner.get(portfolio_id)
+
+    def clear(self) -> None:
+        """Drop every indexed holding."""
+        self._holdings.clear()
+        self._by_symbol.clear()
+        self._by_sector.clear()
+        self._by_portfolio.clear()
+        self._portfolio_owner.clear()
+        self._portfolio_value.clear()
+        self._user_value.clear()
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Reload the whole index from the database."""
+        owners = await db.execute(select(Portfolio.id, Portfolio.user_id))
+        holdings = await db.execute(
+            select(
+                Holding.id,
+                Holding.portfolio_id,
+                Portfolio.user_id,
+                Holding.symbol,
+                Holding.sector,
+                Holding.quantity,
+                Holding.current_value,
+                Holding.current_price,
+                Holding.average_price,
+            ).join(Portfolio, Portfolio.id == Holding.portfolio_id)
+        )
+
+        self.clear()
+        for portfolio_id, user_id in owners:
+            self.set_owner(portfolio_id, user_id)
+        for row in holdings:
+            self.add(HoldingEntry(
+                holding_id=row.id,
+                portfolio_id=row.portfolio_id,
+                user_id=row.user_id,
+                symbol=row.symbol,
+                sector=row.sector,
+                value=holding_value(row.quantity, row.current_value, row.current_price, row.average_price),
+            ))
+
+    async def refresh(self) -> None:
+        """Rebuild the index in its own session (on the primary, so it never lags the hooks)."""
+        async with AsyncSessionLocal() as db:
+            await self.rebuild(db)
+
+    def schedule_jobs(self, scheduler) -> None:
+        """Register the periodic rebuild on an APScheduler instance."""
+        scheduler.add_job(
+            self.refresh, "interval",
+            minutes=settings.index_rebuild_interval_minutes,
+            id="holding_index_rebuild", coalesce=True, max_instances=1, replace_existing=True
+        )
+
+    def set_owner(self, portfolio_id: int, user_id: int) -> None:
+        """Record the owner of a portfolio."""
+        self._portfolio_owner[portfolio_id] = user_id
+
+    def remove_portfolio(self, portfolio_id: int) -> None:
+        """Forget a portfolio and every holding indexed under it."""
+        for holding_id in list(self._by_portfolio.get(portfolio_id, ())):
+            self.remove(holding_id)
+        self._portfolio_owner.pop(portfolio_id, None)
+        self._portfolio_value.pop(portfolio_id, None)
+
+    def add(self, entry: HoldingEntry) -> None:
+        """Index a holding, replacing any previous version of it."""
+        self.remove(entry.holding_id)
+        self._holdings[entry.holding_id] = entry
+        self._by_symbol.setdefault(_symbol_key(entry.symbol), set()).add(entry.holding_id)
+        if entry.sector:
+            self._by_sector.setdefault(_sector_key(entry.sector), set()).add(entry.holding_id)
+        self._by_portfolio.setdefault(entry.portfolio_id, set()).add(entry.holding_id)
+        self._portfolio_owner.setdefault(entry.portfolio_id, entry.user_id)
+        self._portfolio_value[entry.portfolio_id] = self._portfolio_value.get(entry.portfolio_id, 0.0) + entry.value
+        self._user_value[entry.user_id] = self._user_value.get(entry.user_id, 0.0) + entry.value
+
+    def remove(self, holding_id: int) -> None:
+        """Remove a holding from the index if present."""
+        entry = self._holdings.pop(holding_id, None)
+        if entry is None:
+            return
+
+        self._discard(self._by_symbol, _symbol_key(entry.symbol), holding_id)
+        if entry.sector:
+            self._discard(self._by_sector, _sector_key(entry.sector), holding_id)
+        self._discard(self._by_portfolio, entry.portfolio_id, holding_id)
+        self._portfolio_value[entry.portfolio_id] -= entry.value
+        self._user_value[entry.user_id] -= entry.value
+
+    @staticmethod
+    def _discard(index: Dict, key, holding_id: int) -> None:
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.discard(holding_id)
+        if not ids:
+            del index[key]
+
+    def _matching(self, symbols: Iterable[str], sectors: Iterable[str]) -> Set[int]:
+        matched: Set[int] = set()
+        for symbol in symbols or ():
+            matched.update(self._by_symbol.get(_symbol_key(symbol), ()))
+        for sector in sectors or ():
+            matched.update(self._by_sector.get(_sector_key(sector), ()))
+        return matched
+
+    def portfolio_exposures(self, symbols: Iterable[str] = (), sectors: Iterable[str] = ()) -> List[Exposure]:
+        """Return per-portfolio exposure to the given symbols/sectors, largest first."""
+        values: Dict[Tuple[int, int], float] = {}
+        for holding_id in self._matching(symbols, sectors):
+            entry = self._holdings[holding_id]
+            key = (entry.user_id, entry.portfolio_id)
+            values[key] = values.get(key, 0.0) + entry.value
+
+        exposures = [
+            Exposure(user_id, portfolio_id, value, self._weight(value, self._portfolio_value.get(portfolio_id)))
+            for (user_id, portfolio_id), value in values.items()
+        ]
+        return sorted(exposures, key=lambda exposure: exposure.weight, reverse=True)
+
+    def user_exposures(self, symbols: Iterable[str] = (), sectors: Iterable[str] = ()) -> List[Exposure]:
+        """Return per-user exposure across all portfolios, largest first."""
+        values: Dict[int, float] = {}
+        for holding_id in self._matching(symbols, sectors):
+            entry = self._holdings[holding_id]
+            values[entry.user_id] = values.get(entry.user_id, 0.0) + entry.value
+
+        exposures = [
+            Exposure(user_id, None, value, self._weight(value, self._user_value.get(user_id)))
+            for user_id, value in values.items()
+        ]
+        return sorted(exposures, key=lambda exposure: exposure.weight, reverse=True)
+
+    def exposures_for_alert(self, alert: NewsAlert, article: Optional[NewsArticle] = None) -> List[Exposure]:
+        """Return the users holding the assets or sectors named by a news alert."""
+        symbols = set(alert.affected_assets or [])
+        sectors = set(alert.affected_sectors or [])
+        if article is not None:
+            symbols.update(article.assets_mentioned or [])
+            sectors.update(article.sectors_affected or [])
+        return self.user_exposures(symbols, sectors)
+
+    @staticmethod
+    def _weight(value: float, total: Optional[float]) -> float:
+        if not total or total <= 0:
+            return 0.0
+        return value / total
+
+
+# Global index instance
+holding_index = HoldingIndex()
+
+
+def _loaded_owner(session: Session, holding: Holding) -> Optional[int]:
+    """Owner of a holding's portfolio from what is already in memory; never queries."""
+    user_id = holding_index.owner_of(holding.portfolio_id)
+    if user_id is not None:
+        return user_id
+    # Reading `holding.portfolio` when it is not loaded would lazy load it
+    portfolio = holding.__dict__.get("portfolio")
+    if portfolio is None or portfolio.id != holding.portfolio_id:
+        portfolio = session.identity_map.get(identity_key(Portfolio, holding.portfolio_id))
+    return portfolio.user_id if portfolio is not None else None
+
+
+def _holding_snapshot(session: Session, holding: Holding):
+    if holding in session.deleted:
+        return holding.id, None
+
+    return holding.id, HoldingEntry(
+        holding_id=holding.id,
+        portfolio_id=holding.portfolio_id,
+        user_id=_loaded_owner(session, holding),
+        symbol=holding.symbol,
+        sector=holding.sector,
+        value=holding_value(holding.quantity, holding.current_value, holding.current_price, holding.average_price),
+    )
+
+
+def _apply_holdings(upserted: list, deleted: list) -> None:
+    for holding_id, entry in upserted:
+        if entry is not None and entry.user_id is None:
+            # Portfolios created in this commit are only known once their own hook has run
+            user_id = holding_index.owner_of(entry.portfolio_id)
+            entry = replace(entry, user_id=user_id) if user_id is not None else None
+        if entry is None:
+            holding_index.remove(holding_id)
+        else:
+            holding_index.add(entry)
+    for holding_id, _ in deleted:
+        holding_index.remove(holding_id)
+
+
+def _portfolio_snapshot(session: Session, portfolio: Portfolio):
+    return portfolio.id, portfolio.user_id
+
+
+def _apply_portfolios(upserted: list, deleted: list) -> None:
+    for portfolio_id, user_id in upserted:
+        holding_index.set_owner(portfolio_id, user_id)
+    for portfolio_id, _ in deleted:
+        holding_index.remove_portfolio(portfolio_id)
+
+
+register_commit_hook(Holding, _apply_holdings, _holding_snapshot)
+register_commit_hook(Portfolio, _apply_portfolios, _portfolio_snapshot)
@@ -0,0 +1,140 @@
+"""
+Liquidation waterfall for simulated cash needs.
+
+When a scenario leaves a user short of cash, holdings are sold in order of
+liquidity (cash first, real estate never) and each asset type realizes its
+market value less a stressed haircut. For every simulated path the solver
+works out how much of each tier is sold, how much market value is forced
+out, what liquid wealth is left and how much of the need cannot be met.
+All paths are solved together with cumulative sums over a small
+(paths, tiers) matrix, so the cost is a few array passes regardless of the
+number of iterations.
+
+NumPy is imported with this module, so the API layer imports it lazily.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.models.portfolio import AssetType
+from app.services.crisis_replay import ReplayResult
+
+# Asset types in the order they are sold, with the fraction of market value
+# lost to spreads, exit loads and fire-sale discounts in a stressed market
+LIQUIDATION_TIERS: Tuple[Tuple[AssetType, float], ...] = (
+    (AssetType.CASH, 0.0),
+    (AssetType.MUTUAL_FUND, 0.01),
+    (AssetType.ETF, 0.01),
+    (AssetType.BOND, 0.02),
+    (AssetType.EQUITY, 0.03),
+    (AssetType.COMMODITY, 0.05),
+    (AssetType.CRYPTO, 0.10),
+    (AssetType.OTHER, 0.20),
+)
+
+# Not sellable within a simulation horizon; counted as neither liquid nor available
+ILLIQUID_ASSET_TYPES = frozenset({AssetType.REAL_ESTATE})
+
+_TIER_OF = {asset_type: tier for tier, (asset_type, _) in enumerate(LIQUIDATION_TIERS)}
+_HAIRCUTS = np.asarray([haircut for _, haircut in LIQUIDATION_TIERS])
+
+Amount = Union[float, np.ndarray]
+
+
+@dataclass(frozen=True)
+class LiquidationResult:
+    """Per-path outcome of the waterfall."""
+    cash_need: np.ndarray  # (paths,)
+    sold: np.ndarray  # (paths, tiers) market value sold per tier
+    proceeds: np.ndarray  # (paths,) cash raised, after haircuts
+    forced_liquidation_amount: np.ndarray  # (paths,) market value sold outside the cash tier
+    liquid_assets_remaining: np.ndarray  # (paths,) cash and sellable holdings left at market value
+    liquidity_shortfall: np.ndarray  # (paths,) need not covered even after selling everything sellable
+
+    def sold_by_asset_type(self) -> Dict[str, float]:
+        """Mean market value sold per asset type across paths."""
+        means = self.sold.mean(axis=0)
+        return {asset_type.value: float(amount) for (asset_type, _), amount in zip(LIQUIDATION_TIERS, means) if amount > 0}
+
+    def summary(self) -> dict:
+        """Expected values for DamageReport's liquidity columns, with tail and probability figures."""
+        short = self.liquidity_shortfall > 0
+        return {
+            "liquid_assets_remaining": float(self.liquid_assets_remaining.mean()),
+            "liquidity_shortfall": float(self.liquidity_shortfall.mean()),
+            "forced_liquidation_amount": float(self.forced_liquidation_amount.mean()),
+            "liquidity_shortfall_p95": float(np.percentile(self.liquidity_shortfall, 95)),
+            "forced_liquidation_p95": float(np.percentile(self.forced_liquidation_amount, 95)),
+            "probability_of_shortfall": float(short.mean()),
+            "probability_of_forced_sale": float((self.forced_liquidation_amount > 0).mean()),
+            "sold_by_asset_type": self.sold_by_asset_type(),
+        }
+
+
+def tier_values(values: np.ndarray, asset_types: Sequence[AssetType]) -> np.ndarray:
+    """Sum (paths, positions) market values into (paths, tiers), dropping illiquid positions."""
+    tiers = np.asarray([_TIER_OF.get(asset_type, _TIER_OF[AssetType.OTHER]) for asset_type in asset_types], dtype=np.int64)
+    sellable = np.asarray([asset_type not in ILLIQUID_ASSET_TYPES for asset_type in asset_types], dtype=bool)
+    grouping = np.zeros((len(asset_types), len(LIQUIDATION_TIERS)))
+    grouping[np.arange(len(asset_types))[sellable], tiers[sellable]] = 1.0
+    return np.asarray(values, dtype=float).reshape(-1, len(asset_types)) @ grouping
+
+
+def solve(values: np.ndarray, cash_need: Amount, cash_balance: Amount = 0.0) -> LiquidationResult:
+    """
+    Run the waterfall for every path.
+
+    `values` is (paths, tiers) market value from `tier_values`; `cash_need`
+    and `cash_balance` are scalars or (paths,) arrays. The cash balance is
+    spent first, alongside cash holdings. An overdrawn balance is settled
+    from cash holdings and whatever they do not cover is added to the need.
+    """
+    values = np.array(values, dtype=float, ndmin=2)
+    paths = values.shape[0]
+    cash = values[:, 0] + np.broadcast_to(np.asarray(cash_balance, dtype=float), (paths,))
+    values[:, 0] = np.maximum(cash, 0.0)
+    need = np.broadcast_to(np.asarray(cash_need, dtype=float), (paths,)) + np.maximum(-cash, 0.0)
+
+    available = values * (1.0 - _HAIRCUTS)
+    raised_before = np.cumsum(available, axis=1) - available
+    taken = np.clip(need[:, None] - raised_before, 0.0, available)
+    sold = taken / (1.0 - _HAIRCUTS)
+
+    proceeds = taken.sum(axis=1)
+    return LiquidationResult(
+        cash_need=np.array(need),
+        sold=sold,
+        proceeds=proceeds,
+        forced_liquidation_amount=sold[:, 1:].sum(axis=1),
+        liquid_assets_remaining=(values - sold).sum(axis=1),
+        liquidity_shortfall=np.maximum(need - proceeds, 0.0),
+    )
+
+
+def liquidate_replay(result: ReplayResult, cash_need: Amount, cash_balance: Amount = 0.0) -> LiquidationResult:
+    """
+    Waterfall over the end-of-horizon positions of every replayed path.
+
+    `cash_need` usually comes from a shocked cash-flow projection
+    (`projection.apply(shock).cash_need()` for the user).
+    """
+    values = tier_values(result.bucket_values, result.buckets.asset_types)
+    return solve(values, cash_need, cash_balance)
+
+
+def damage_report_fields(result: ReplayResult, liquidation: LiquidationResult) -> dict:
+    """DamageReport column values (expected across paths) for a replay and its waterfall."""
+    summary = result.summary()
+    liquidity = liquidation.summary()
+    return {
+        "total_portfolio_loss": summary["expected_loss"],
+        "total_portfolio_loss_percent": float(result.loss_fractions.mean() * 100),
+        "asset_impacts": result.asset_impacts(),
+        "sector_impacts": result.sector_impacts(),
+        "liquid_assets_remaining": liquidity["liquid_assets_remaining"],
+        "liquidity_shortfall": liquidity["liquidity_shortfall"],
+        "forced_liquidation_amount": liquidity["forced_liquidation_amount"],
+        "estimated_recovery_time": summary["recovery_time_days"],
+    }
@@ -0,0 +1,140 @@
+"""
+Minimal LLM client used for playbook generation.
+
+Talks to any OpenAI-compatible chat completions endpoint over httpx, either
+in one shot or streamed token by token. The client is optional: when no API
+key is configured `get_llm_client()` returns None and callers fall back to
+their deterministic templates. `FakeLLMClient` streams canned tokens and is
+selected with `LLM_PROVIDER=fake` for local runs and tests.
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
+from app.core.config import settings
+
+
+class LLMError(Exception):
+    """Raised when the model cannot be reached or returns an unusable answer."""
+
+
+class LLMClient:
+    """Base class for chat completion clients."""
+
+    async def complete(self, system: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def stream(self, system: str, prompt: str) -> AsyncIterator[str]:
+        """Yield the completion in chunks; defaults to a single chunk."""
+        yield await self.complete(system, prompt)
+
+
+class OpenAIClient(LLMClient):
+    """Client for OpenAI-compatible `/chat/completions` endpoints."""
+
+    def __init__(self, api_key: str, base_url: str, model: str, timeout: float = 30.0):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+
+    def _payload(self, system: str, prompt: str, stream: bool = False) -> dict:
+        messages: List[dict] = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ]
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.2,
+            "response_format": {"type": "json_object"},
+            "stream": stream,
+        }
+
+    async def complete(self, system: str, prompt: str) -> str:
+        import httpx  # only needed once a real model is called; keeps it out of startup
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    json=self._payload(system, prompt),
+                )
+                response.raise_for_status()
+                return response.json()["choices"][0]["message"]["content"]
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as exc:
+            raise LLMError(str(exc)) from exc
+
+    async def stream(self, system: str, prompt: str) -> AsyncIterator[str]:
+        import httpx
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                async with client.stream(
+                    "POST",
+                    f"{self.base_url}/chat/completions",
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    json=self._payload(system, prompt, stream=True),
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                        if delta:
+                            yield delta
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as exc:
+            raise LLMError(str(exc)) from exc
+
+
+class FakeLLMClient(LLMClient):
+    """
+    Offline stand-in that streams a canned response in small token chunks.
+
+    The default response is a valid playbook fragment, so the full streaming
+    path can be exercised without network access.
+    """
+
+    DEFAULT_RESPONSE = json.dumps({
+        "steps": [
+            {"action": "Review exposure to this risk",
+             "description": "Check how much of the {portfolio_value} portfolio is affected and set a limit.",
+             "category": "review"},
+            {"action": "Keep a cash buffer",
+             "description": "Hold {emergency_months} months of expenses ({emergency_fund_target}) in liquid assets.",
+             "category": "liquidity"},
+        ]
+    })
+
+    def __init__(self, response: Optional[str] = None, chunk_size: int = 8, delay: float = 0.01):
+        self.response = response or self.DEFAULT_RESPONSE
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.calls = 0
+
+    async def complete(self, system: str, prompt: str) -> str:
+        self.calls += 1
+        return self.response
+
+    async def stream(self, system: str, prompt: str) -> AsyncIterator[str]:
+        self.calls += 1
+        for start in range(0, len(self.response), self.chunk_size):
+            await asyncio.sleep(self.delay)
+            yield self.response[start:start + self.chunk_size]
+
+
+def get_llm_client() -> Optional[LLMClient]:
+    """Return the configured LLM client, or None if no API key is set."""
+    if settings.llm_provider == "fake":
+        return FakeLLMClient()
+    if not settings.openai_api_key:
+        return None
+    return OpenAIClient(
+        api_key=settings.openai_api_key,
+        base_url=settings.llm_base_url,
+        model=settings.llm_model,
+        timeout=settings.llm_timeout_seconds,
+    )
@@ -0,0 +1,103 @@
+"""
+Retention job for the news_articles table.
+
+Articles older than the retention window have their full content copied into
+news_article_archive and are reduced to a search stub (id, title, source,
+classification and timestamps) in the hot table. The job works in small
+batches, each in its own short transaction, so live ingestion and reads are
+never blocked for long.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import false, insert, select, update
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.write_queue import write_queue
+from app.models.news import ArchivedNewsArticle, NewsArticle
+
+logger = logging.getLogger(__name__)
+
+# Columns copied verbatim into the archive
+_ARCHIVED_COLUMNS = (
+    "id", "title", "url", "source", "source_type", "author",
+    "content", "summary", "excerpt",
+    "category", "sectors_affected", "assets_mentioned", "keywords",
+    "sentiment", "sentiment_score", "impact_score",
+    "published_at", "created_at",
+)
+
+# Heavy columns dropped from the hot row once archived
+_STRIPPED_COLUMNS = {"content": None, "summary": None, "excerpt": None}
+
+
+async def archive_batch(cutoff: datetime, batch_size: int) -> int:
+    """Archive one batch of articles published before `cutoff`; returns the batch size."""
+    age = func.coalesce(NewsArticle.published_at, NewsArticle.created_at)
+
+    async def archive(db) -> int:
+        result = await db.execute(
+            select(NewsArticle.id)
+            .where(NewsArticle.is_archived == false(), age < cutoff)
+            .order_by(NewsArticle.id)
+            .limit(batch_size)
+        )
+        ids = list(result.scalars())
+        if not ids:
+            return 0
+
+        columns = [getattr(NewsArticle, name) for name in _ARCHIVED_COLUMNS]
+        await db.execute(
+            insert(ArchivedNewsArticle).from_select(
+                list(_ARCHIVED_COLUMNS),
+                select(*columns).where(NewsArticle.id.in_(ids))
+            )
+        )
+        await db.execute(
+            update(NewsArticle)
+            .where(NewsArticle.id.in_(ids))
+            .values(is_archived=True, **_STRIPPED_COLUMNS)
+        )
+        return len(ids)
+
+    return await write_queue.submit(archive)
+
+
+async def archive_old_articles(
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+    pause_seconds: float = 0.05
+) -> int:
+    """Archive every article older than the retention window; returns the number archived."""
+    retention_days = retention_days if retention_days is not None else settings.news_retention_days
+    batch_size = batch_size or settings.news_archive_batch_size
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = await archive_batch(cutoff, batch_size)
+        archived += count
+        batches += 1
+        if count < batch_size:
+            break
+        # Yield to live traffic between batches
+        await asyncio.sleep(pause_seconds)
+
+    if archived:
+        logger.info("Archived %d news articles older than %s", archived, cutoff.date())
+    return archived
+
+
+def schedule_jobs(scheduler) -> None:
+    """Register the periodic retention job on an APScheduler instance."""
+    scheduler.add_job(
+        archive_old_articles, "interval",
+        minutes=settings.news_archive_interval_minutes,
+        id="news_retention", coalesce=True, max_instances=1, replace_existing=True
+    )
@@ -0,0 +1,770 @@
+"""
+Template-first defense playbook generation.
+
+A playbook is assembled from strategy fragments keyed by
+(risk factor, scenario type, risk level, risk tolerance). Each fragment is a
+short list of step templates with `str.format` placeholders; it is produced
+once (from the built-in library, or by the LLM for combinations the library
+does not cover), stored in playbook_fragments and kept in an in-memory LRU.
+Rendering a playbook is then a deterministic, per-user parameterization of
+cached fragments, so only never-seen combinations pay for a model call.
+
+When a playbook does need the model, `stream_steps` emits the cached steps
+right away and then each model-generated step as soon as its JSON object is
+complete, persisting the playbook once the stream ends.
+"""
+
+import asyncio
+import json
+import logging
+import string
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.playbook import DefensePlaybook, PlaybookFragment
+from app.models.portfolio import Holding, Portfolio
+from app.models.risk import RiskAssessment
+from app.models.user import User
+from app.services.feature_store import feature_store
+from app.services.holding_index import HOLDING_VALUE
+from app.services.llm import LLMClient, LLMError, get_llm_client
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+FragmentKey = Tuple[str, str, str, str]
+
+# Pseudo risk factor for scenario-specific steps included in every playbook
+SCENARIO_FACTOR = "scenario"
+
+DEFAULT_RISK_FACTORS = ["concentration", "liquidity", "emergency_fund"]
+PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+# Assessment column backing each risk factor (emergency fund is scored as adequacy, so inverted)
+ASSESSMENT_FACTORS = {
+    "concentration": "concentration_risk",
+    "sector_concentration": "sector_concentration_risk",
+    "liquidity": "liquidity_risk",
+    "volatility": "volatility_risk",
+    "correlation": "correlation_risk",
+    "burn_rate": "burn_rate_risk",
+}
+
+# Targets implied by the user's risk tolerance
+TOLERANCE_TARGETS = {
+    "conservative": {"target_single_asset_pct": 10, "target_sector_pct": 20, "target_cash_pct": 15, "emergency_months": 9},
+    "moderate": {"target_single_asset_pct": 20, "target_sector_pct": 30, "target_cash_pct": 10, "emergency_months": 6},
+    "aggressive": {"target_single_asset_pct": 30, "target_sector_pct": 40, "target_cash_pct": 5, "emergency_months": 4},
+}
+
+# Urgency implied by the risk level
+LEVEL_URGENCY = {
+    "critical": ("critical", "immediately"),
+    "high": ("high", "within 7 days"),
+    "medium": ("medium", "within 30 days"),
+    "low": ("low", "at the next portfolio review"),
+}
+
+PLACEHOLDERS = (
+    "portfolio_value", "cash_balance", "monthly_expenses", "monthly_income",
+    "emergency_fund_target", "emergency_fund_gap", "top_holding", "top_holding_weight",
+    "top_sector", "top_sector_weight", "target_single_asset_pct", "target_sector_pct",
+    "target_cash_pct", "emergency_months",
+)
+
+# Built-in step templates per risk factor
+STEP_LIBRARY: Dict[str, List[dict]] = {
+    "concentration": [
+        {"action": "Trim the largest position",
+         "description": "{top_holding} is {top_holding_weight} of the portfolio; reduce it below {target_single_asset_pct}% and spread the proceeds across uncorrelated assets.",
+         "category": "diversification"},
+        {"action": "Set a position-size limit",
+         "description": "Cap any new single-asset purchase at {target_single_asset_pct}% of the {portfolio_value} portfolio.",
+         "category": "policy"},
+    ],
+    "sector_concentration": [
+        {"action": "Rebalance sector exposure",
+         "description": "{top_sector} makes up {top_sector_weight} of holdings; bring it under {target_sector_pct}% using broad index funds.",
+         "category": "diversification"},
+    ],
+    "liquidity": [
+        {"action": "Raise liquid reserves",
+         "description": "Keep at least {target_cash_pct}% of the portfolio in cash or liquid funds; current cash balance is {cash_balance}.",
+         "category": "liquidity"},
+        {"action": "Rank assets by liquidity",
+         "description": "List which holdings can be sold within a week without large haircuts so forced sales hit the most liquid assets first.",
+         "category": "liquidity"},
+    ],
+    "volatility": [
+        {"action": "Reduce portfolio volatility",
+         "description": "Shift part of high-volatility holdings into bonds or low-volatility funds in line with a {emergency_months}-month safety horizon.",
+         "category": "allocation"},
+    ],
+    "correlation": [
+        {"action": "Add uncorrelated assets",
+         "description": "Introduce assets such as gold or high-grade bonds that historically move independently of {top_sector}.",
+         "category": "diversification"},
+    ],
+    "burn_rate": [
+        {"action": "Cut discretionary spending",
+         "description": "Monthly expenses of {monthly_expenses} against income of {monthly_income}; trim non-essential categories until expenses stay below 80% of income.",
+         "category": "cash_flow"},
+    ],
+    "emergency_fund": [
+        {"action": "Build the emergency fund",
+         "description": "Target {emergency_months} months of expenses ({emergency_fund_target}); the remaining gap is {emergency_fund_gap}.",
+         "category": "liquidity"},
+    ],
+}
+
+# Risk factors a playbook request may name: every factor with library steps or an assessment score
+RISK_FACTORS = frozenset(STEP_LIBRARY) | frozenset(ASSESSMENT_FACTORS)
+
+SCENARIO_STEPS: Dict[str, List[dict]] = {
+    "market_crash": [
+        {"action": "Prepare a drawdown plan",
+         "description": "Decide in advance which positions to hold, hedge or add to if the market falls 30%, so no sale is made in panic.",
+         "category": "scenario"},
+    ],
+    "sector_collapse": [
+        {"action": "Hedge the dominant sector",
+         "description": "Limit downside in {top_sector} with stop-loss levels or by rotating part of it into other sectors.",
+         "category": "scenario"},
+    ],
+    "interest_rate_shock": [
+        {"action": "Shorten bond duration",
+         "description": "Move long-duration bonds into short-term or floating-rate instruments to limit losses from a rate spike.",
+         "category": "scenario"},
+    ],
+    "inflation_surge": [
+        {"action": "Add inflation protection",
+         "description": "Allocate a slice of the portfolio to inflation-linked bonds, commodities or real assets.",
+         "category": "scenario"},
+    ],
+    "currency_devaluation": [
+        {"action": "Diversify currency exposure",
+         "description": "Hold part of the portfolio in assets priced in foreign currencies or gold.",
+         "category": "scenario"},
+    ],
+    "job_loss": [
+        {"action": "Secure income runway",
+         "description": "Make sure {emergency_fund_target} of liquid savings covers {emergency_months} months of expenses without selling investments.",
+         "category": "scenario"},
+    ],
+    "health_emergency": [
+        {"action": "Review health cover",
+         "description": "Check that health insurance limits cover a major hospitalization so treatment does not force asset sales.",
+         "category": "scenario"},
+    ],
+}
+
+GENERIC_STEPS = [
+    {"action": "Review exposure",
+     "description": "Review how this risk affects the {portfolio_value} portfolio and set a limit that matches a {emergency_months}-month safety horizon.",
+     "category": "review"},
+]
+
+LLM_SYSTEM_PROMPT = (
+    "You write concise, practical personal-finance defense strategies for retail investors. "
+    "Respond with a JSON object only."
+)
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """Cached step templates for one fragment key."""
+    steps: Tuple[dict, ...]
+    source: str
+
+
+class _SafeFormatDict(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+_formatter = string.Formatter()
+
+
+def render_template(template: str, params: Dict[str, str]) -> str:
+    """Fill placeholders, leaving unknown ones untouched."""
+    try:
+        return _formatter.vformat(template, (), _SafeFormatDict(params))
+    except (ValueError, IndexError):
+        return template
+
+
+def _money(value: float) -> str:
+    return f"₹{value:,.0f}"
+
+
+def _percent(value: float) -> str:
+    return f"{value * 100:.0f}%"
+
+
+async def _portfolio_numbers(db: AsyncSession, user: User, portfolio_id: int) -> dict:
+    """Playbook numbers restricted to one portfolio, straight from the source tables."""
+    portfolio_filter = [Portfolio.user_id == user.id, Portfolio.id == portfolio_id]
+
+    totals = (await db.execute(
+        select(
+            func.coalesce(func.sum(Portfolio.total_value), 0.0),
+            func.coalesce(func.sum(Portfolio.cash_balance), 0.0),
+        ).where(*portfolio_filter)
+    )).one()
+
+    holdings_total = (await db.execute(
+        select(func.coalesce(func.sum(HOLDING_VALUE), 0.0))
+        .join(Portfolio, Portfolio.id == Holding.portfolio_id)
+        .where(*portfolio_filter)
+    )).scalar_one()
+    top_holding = (await db.execute(
+        select(Holding.symbol, HOLDING_VALUE.label("value"))
+        .join(Portfolio, Portfolio.id == Holding.portfolio_id)
+        .where(*portfolio_filter)
+        .order_by(HOLDING_VALUE.desc())
+        .limit(1)
+    )).first()
+    sector_value = func.sum(HOLDING_VALUE)
+    top_sector = (await db.execute(
+        select(Holding.sector, sector_value.label("value"))
+        .join(Portfolio, Portfolio.id == Holding.portfolio_id)
+        .where(*portfolio_filter, Holding.sector.is_not(None))
+        .group_by(Holding.sector)
+        .order_by(sector_value.desc())
+        .limit(1)
+    )).first()
+
+    # The feature store's cash-flow definition, with expenses limited to this portfolio.
+    # NumPy comes in with the projection; keep it out of worker startup
+    from app.services.cashflow import load_projection
+    projection = await load_projection(db, [user.id], portfolio_ids=[portfolio_id])
+
+    return {
+        "portfolio_value": float(totals[0]),
+        "cash_balance": float(totals[1]),
+        "monthly_expenses": float(projection.monthly_expenses[0]),
+        "monthly_income": float(projection.monthly_income[0]),
+        "top_holding": (top_holding.symbol, top_holding.value / holdings_total) if top_holding and holdings_total else None,
+        "top_sector": (top_sector.sector, top_sector.value / holdings_total) if top_sector and holdings_total else None,
+    }
+
+
+async def load_user_parameters(db: AsyncSession, user: User, portfolio_id: Optional[int] = None) -> Dict[str, str]:
+    """Compute the per-user numbers used to parameterize playbook steps."""
+    if portfolio_id is None:
+        features = await feature_store.get(db, user.id)
+        numbers = {
+            "portfolio_value": features.portfolio_value,
+            "cash_balance": features.cash_balance,
+            "monthly_expenses": features.monthly_expenses,
+            "monthly_income": features.monthly_income,
+            "top_holding": features.top_holdings[0] if features.top_holdings else None,
+            "top_sector": features.top_sectors[0] if features.top_sectors else None,
+        }
+    else:
+        numbers = await _portfolio_numbers(db, user, portfolio_id)
+
+    targets = TOLERANCE_TARGETS.get(user.risk_tolerance or "moderate", TOLERANCE_TARGETS["moderate"])
+    cash_balance = numbers["cash_balance"]
+    emergency_target = numbers["monthly_expenses"] * targets["emergency_months"]
+    top_holding, top_sector = numbers["top_holding"], numbers["top_sector"]
+
+    return {
+        "portfolio_value": _money(numbers["portfolio_value"]),
+        "cash_balance": _money(cash_balance),
+        "monthly_expenses": _money(numbers["monthly_expenses"]),
+        "monthly_income": _money(numbers["monthly_income"]),
+        "emergency_fund_target": _money(emergency_target),
+        "emergency_fund_gap": _money(max(emergency_target - cash_balance, 0.0)),
+        "top_holding": top_holding[0] if top_holding else "the largest holding",
+        "top_holding_weight": _percent(top_holding[1]) if top_holding else "n/a",
+        "top_sector": top_sector[0] if top_sector else "the largest sector",
+        "top_sector_weight": _percent(top_sector[1]) if top_sector else "n/a",
+        **{name: str(value) for name, value in targets.items()},
+    }
+
+
+async def derive_risk_profile(db: AsyncSession, user: User) -> Tuple[str, List[str]]:
+    """Risk level and top risk factors from the user's latest assessment."""
+    assessment = (await db.execute(
+        select(RiskAssessment)
+        .where(RiskAssessment.user_id == user.id)
+        .order_by(RiskAssessment.assessed_at.desc(), RiskAssessment.id.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    if assessment is None:
+        return "medium", list(DEFAULT_RISK_FACTORS)
+
+    scores = {factor: getattr(assessment, column) or 0.0 for factor, column in ASSESSMENT_FACTORS.items()}
+    scores["emergency_fund"] = 100.0 - (assessment.emergency_fund_adequacy or 0.0)
+    factors = [factor for factor, score in sorted(scores.items(), key=lambda item: item[1], reverse=True) if score >= 40.0]
+    return assessment.risk_level or "medium", factors[:4] or list(DEFAULT_RISK_FACTORS)
+
+
+def library_fragment(key: FragmentKey) -> Fragment:
+    """Build a fragment from the built-in step library."""
+    risk_factor, scenario_type, _, _ = key
+    if risk_factor == SCENARIO_FACTOR:
+        steps = SCENARIO_STEPS.get(scenario_type, [])
+    else:
+        steps = STEP_LIBRARY.get(risk_factor, GENERIC_STEPS)
+    return Fragment(tuple(steps), "template")
+
+
+def _fragment_prompt(key: FragmentKey) -> str:
+    risk_factor, scenario_type, risk_level, risk_tolerance = key
+    subject = (
+        f"preparing for a '{scenario_type}' scenario"
+        if risk_factor == SCENARIO_FACTOR
+        else f"mitigating '{risk_factor}' risk during a '{scenario_type}' scenario"
+    )
+    return (
+        f"Write 1 to 3 strategy steps for {subject}, for an investor with '{risk_tolerance}' "
+        f"risk tolerance whose current risk level is '{risk_level}'.\n"
+        "Steps must be reusable across investors: refer to personal numbers only through these "
+        f"placeholders in curly braces: {', '.join(PLACEHOLDERS)}.\n"
+        'Return {"steps": [{"action": str, "description": str, "category": str}]}.'
+    )
+
+
+def parse_llm_steps(raw: str) -> Tuple[dict, ...]:
+    """Validate model output into step templates."""
+    try:
+        data = json.loads(raw)
+    except ValueError as exc:
+        raise LLMError(f"Invalid JSON from model: {exc}") from exc
+    steps = data.get("steps") if isinstance(data, dict) else data
+    if not isinstance(steps, list):
+        raise LLMError("Model response has no steps list")
+    parsed = tuple(step for step in map(_parse_step, steps) if step is not None)
+    if not parsed:
+        raise LLMError("Model response has no usable steps")
+    return parsed
+
+
+def _parse_step(step) -> Optional[dict]:
+    if not isinstance(step, dict) or not step.get("action") or not step.get("description"):
+        return None
+    return {
+        "action": str(step["action"]),
+        "description": str(step["description"]),
+        "category": str(step.get("category") or "general"),
+    }
+
+
+class StepStreamParser:
+    """
+    Incrementally extract step objects from a streamed JSON document.
+
+    Every object that is a direct element of the first JSON array in the
+    stream (the `steps` list) is returned as soon as its closing brace
+    arrives, without waiting for the rest of the document.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._scanned = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._array_depth: Optional[int] = None
+        self._start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk and return the steps completed by it."""
+        self.text += chunk
+        steps = []
+        for position in range(self._scanned, len(self.text)):
+            char = self.text[position]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = len(self._stack) + 1
+                elif char == "{" and len(self._stack) == self._array_depth:
+                    self._start = position
+                self._stack.append(char)
+            elif char in "]}":
+                if self._stack:
+                    self._stack.pop()
+                if char == "]" and len(self._stack) + 1 == self._array_depth:
+                    # The steps array is closed; ignore anything after it
+                    self._array_depth = -1
+                elif char == "}" and self._start is not None and len(self._stack) == self._array_depth:
+                    try:
+                        step = _parse_step(json.loads(self.text[self._start:position + 1]))
+                    except ValueError:
+                        step = None
+                    if step is not None:
+                        steps.append(step)
+                    self._start = None
+        self._scanned = len(self.text)
+        return steps
+
+
+@dataclass
+class PlaybookPlan:
+    """Everything needed to render a playbook, resolved up front."""
+    user_id: int
+    scenario_type: str
+    risk_level: str
+    risk_factors: List[str]
+    keys: List[FragmentKey]
+    params: Dict[str, str]
+    portfolio_id: Optional[int] = None
+    started: float = 0.0
+
+
+def _urgency(key: FragmentKey) -> Tuple[str, str]:
+    risk_factor, _, risk_level, _ = key
+    priority, timeframe = LEVEL_URGENCY.get(risk_level, LEVEL_URGENCY["medium"])
+    if risk_factor == SCENARIO_FACTOR:
+        priority = "high" if priority == "critical" else priority
+    return priority, timeframe
+
+
+def _render_step(key: FragmentKey, template: dict, params: Dict[str, str]) -> dict:
+    priority, timeframe = _urgency(key)
+    return {
+        "action": render_template(template["action"], params),
+        "description": render_template(template["description"], params),
+        "category": template.get("category", "general"),
+        "risk_factor": key[0],
+        "priority": priority,
+        "timeframe": timeframe,
+    }
+
+
+def _generation_source(sources: Iterable[str]) -> str:
+    sources = set(sources)
+    if len(sources) == 1:
+        return sources.pop()
+    return "mixed" if sources else "template"
+
+
+async def _end_transaction(db: AsyncSession) -> None:
+    """Commit what the session has read or stored so no transaction (and no SQLite write lock) spans a model call."""
+    if db.in_transaction():
+        await db.commit()
+
+
+class PlaybookEngine:
+    """Assembles playbooks from cached, parameterized strategy fragments."""
+
+    def __init__(self, llm: Optional[LLMClient] = None, cache_size: int = 2048):
+        self.llm = llm
+        self._cache: LRUCache[Fragment] = LRUCache(maxsize=cache_size)
+        self._inflight: Dict[FragmentKey, asyncio.Future] = {}
+
+    def is_novel(self, key: FragmentKey) -> bool:
+        """Whether a key has no library coverage and would need the model."""
+        risk_factor, scenario_type, _, _ = key
+        if risk_factor == SCENARIO_FACTOR:
+            return scenario_type not in SCENARIO_STEPS
+        return risk_factor not in STEP_LIBRARY
+
+    async def _generate(self, key: FragmentKey) -> Fragment:
+        """Produce a fragment that is not cached anywhere yet."""
+        if self.llm is not None and self.is_novel(key):
+            try:
+                raw = await self.llm.complete(LLM_SYSTEM_PROMPT, _fragment_prompt(key))
+                return Fragment(parse_llm_steps(raw), "llm")
+            except LLMError:
+                logger.warning("LLM fragment generation failed for %s; using templates", key, exc_info=True)
+        return library_fragment(key)
+
+    async def _load_stored(self, db: AsyncSession, keys: List[FragmentKey]) -> Dict[FragmentKey, Fragment]:
+        if not keys:
+            return {}
+        result = await db.execute(
+            select(PlaybookFragment).where(or_(*[
+                and_(
+                    PlaybookFragment.risk_factor == risk_factor,
+                    PlaybookFragment.scenario_type == scenario_type,
+                    PlaybookFragment.risk_level == risk_level,
+                    PlaybookFragment.risk_tolerance == risk_tolerance,
+                )
+                for risk_factor, scenario_type, risk_level, risk_tolerance in keys
+            ]))
+        )
+        return {
+            (row.risk_factor, row.scenario_type, row.risk_level, row.risk_tolerance): Fragment(tuple(row.steps), row.source)
+            for row in result.scalars()
+        }
+
+    async def _store(self, db: AsyncSession, key: FragmentKey, fragment: Fragment) -> None:
+        risk_factor, scenario_type, risk_level, risk_tolerance = key
+        try:
+            async with db.begin_nested():
+                db.add(PlaybookFragment(
+                    risk_factor=risk_factor,
+                    scenario_type=scenario_type,
+                    risk_level=risk_level,
+                    risk_tolerance=risk_tolerance,
+                    steps=list(fragment.steps),
+                    source=fragment.source,
+                ))
+        except IntegrityError:
+            # Another worker stored the same key first; either copy is fine
+            pass
+
+    async def get_fragments(self, db: AsyncSession, keys: Iterable[FragmentKey]) -> Dict[FragmentKey, Fragment]:
+        """Resolve fragments from memory, then the database, generating only what is missing."""
+        keys = list(dict.fromkeys(keys))
+        fragments: Dict[FragmentKey, Fragment] = {}
+        misses = []
+        for key in keys:
+            fragment = self._cache.get(key)
+            if fragment is not None:
+                fragments[key] = fragment
+            else:
+                misses.append(key)
+
+        waiting = {key: self._inflight[key] for key in misses if key in self._inflight}
+        owned = [key for key in misses if key not in waiting]
+        if owned:
+            loop = asyncio.get_running_loop()
+            for key in owned:
+                self._inflight[key] = loop.create_future()
+            try:
+                stored = await self._load_stored(db, owned)
+                missing = [key for key in owned if key not in stored]
+                if missing:
+                    await _end_transaction(db)
+                generated = await asyncio.gather(*(self._generate(key) for key in missing))
+                for key, fragment in zip(missing, generated):
+                    await self._store(db, key, fragment)
+                    stored[key] = fragment
+                for key in owned:
+                    self._cache.set(key, stored[key])
+                    fragments[key] = stored[key]
+                    self._inflight.pop(key).set_result(stored[key])
+            except BaseException as exc:
+                for key in owned:
+                    future = self._inflight.pop(key, None)
+                    if future is not None and not future.done():
+                        future.set_exception(exc)
+                        # Mark retrieved so unawaited failures do not warn
+                        future.exception()
+                raise
+
+        if waiting:
+            await _end_transaction(db)
+        for key, future in waiting.items():
+            fragments[key] = await asyncio.shield(future)
+        return fragments
+
+    @staticmethod
+    def fragment_keys(scenario_type: str, risk_level: str, risk_tolerance: str, risk_factors: Iterable[str]) -> List[FragmentKey]:
+        """Fragment keys making up a playbook, scenario steps first."""
+        factors = [SCENARIO_FACTOR] + [factor for factor in risk_factors if factor != SCENARIO_FACTOR]
+        return [(factor, scenario_type, risk_level, risk_tolerance) for factor in factors]
+
+    @staticmethod
+    def render_steps(
+        keys: List[FragmentKey],
+        fragments: Dict[FragmentKey, Fragment],
+        params: Dict[str, str]
+    ) -> List[dict]:
+        """Parameterize fragments into an ordered, de-duplicated list of steps."""
+        steps = []
+        seen = set()
+        for key in keys:
+            for template in fragments[key].steps:
+                step = _render_step(key, template, params)
+                if step["action"] in seen:
+                    continue
+                seen.add(step["action"])
+                steps.append(step)
+
+        steps.sort(key=lambda step: PRIORITY_ORDER.get(step["priority"], len(PRIORITY_ORDER)))
+        for number, step in enumerate(steps, start=1):
+            step["step"] = number
+        return steps
+
+    async def prepare(
+        self,
+        db: AsyncSession,
+        user: User,
+        scenario_type: str,
+        risk_level: Optional[str] = None,
+        risk_factors: Optional[List[str]] = None,
+        portfolio_id: Optional[int] = None
+    ) -> PlaybookPlan:
+        """Resolve the risk profile, fragment keys and user parameters for a playbook."""
+        started = time.perf_counter()
+        if risk_level is None or not risk_factors:
+            derived_level, derived_factors = await derive_risk_profile(db, user)
+            risk_level = risk_level or derived_level
+            risk_factors = risk_factors or derived_factors
+
+        return PlaybookPlan(
+            user_id=user.id,
+            scenario_type=scenario_type,
+            risk_level=risk_level,
+            risk_factors=list(risk_factors),
+            keys=self.fragment_keys(scenario_type, risk_level, user.risk_tolerance or "moderate", risk_factors),
+            params=await load_user_parameters(db, user, portfolio_id),
+            portfolio_id=portfolio_id,
+            started=started,
+        )
+
+    @staticmethod
+    def new_playbook(plan: PlaybookPlan, status: str = "completed") -> DefensePlaybook:
+        """Create an (unsaved) playbook row for a plan."""
+        return DefensePlaybook(
+            user_id=plan.user_id,
+            portfolio_id=plan.portfolio_id,
+            title=f"{plan.scenario_type.replace('_', ' ').title()} defense playbook",
+            scenario_type=plan.scenario_type,
+            risk_level=plan.risk_level,
+            risk_factors=plan.risk_factors,
+            status=status,
+        )
+
+    async def generate(
+        self,
+        db: AsyncSession,
+        user: User,
+        scenario_type: str,
+        risk_level: Optional[str] = None,
+        risk_factors: Optional[List[str]] = None,
+        portfolio_id: Optional[int] = None
+    ) -> DefensePlaybook:
+        """Build, persist and return a playbook for a user."""
+        plan = await self.prepare(db, user, scenario_type, risk_level, risk_factors, portfolio_id)
+        fragments = await self.get_fragments(db, plan.keys)
+
+        playbook = self.new_playbook(plan)
+        playbook.strategies = self.render_steps(plan.keys, fragments, plan.params)
+        playbook.generation_source = _generation_source(
+            fragments[key].source for key in plan.keys if fragments[key].steps
+        )
+        playbook.generation_time_ms = (time.perf_counter() - plan.started) * 1000
+        playbook.completed_at = func.now()
+        db.add(playbook)
+        await db.commit()
+        await db.refresh(playbook)
+        return playbook
+
+    async def _stream_fragment(self, key: FragmentKey) -> AsyncIterator[Tuple[dict, str]]:
+        """Stream (step template, source) pairs from the model, falling back to the library on failure."""
+        parser = StepStreamParser()
+        streamed = []
+        try:
+            async for chunk in self.llm.stream(LLM_SYSTEM_PROMPT, _fragment_prompt(key)):
+                for step in parser.feed(chunk):
+                    streamed.append(step)
+                    yield step, "llm"
+            try:
+                fragment = Fragment(parse_llm_steps(parser.text), "llm")
+            except LLMError:
+                if not streamed:
+                    raise
+                fragment = Fragment(tuple(streamed), "llm")
+        except LLMError:
+            logger.warning("LLM fragment streaming failed for %s; using templates", key, exc_info=True)
+            fragment = library_fragment(key)
+            for step in fragment.steps:
+                yield step, fragment.source
+            # Leave the key uncached so the model is retried next time
+            self._inflight.pop(key).set_result(fragment)
+            return
+
+        self._cache.set(key, fragment)
+        self._inflight.pop(key).set_result(fragment)
+
+    async def stream_steps(self, db: AsyncSession, plan: PlaybookPlan, playbook_id: int) -> AsyncIterator[dict]:
+        """
+        Yield rendered steps as soon as each is available, then persist the playbook.
+
+        Steps from cached or library fragments are emitted first; fragments
+        that need the model are streamed afterwards, one step at a time.
+        """
+        needs_model = []
+        if self.llm is not None:
+            needs_model = [
+                key for key in plan.keys
+                if self.is_novel(key) and self._cache.get(key) is None and key not in self._inflight
+            ]
+            stored = await self._load_stored(db, needs_model)
+            for key, fragment in stored.items():
+                self._cache.set(key, fragment)
+            needs_model = [key for key in needs_model if key not in stored]
+
+        loop = asyncio.get_running_loop()
+        for key in needs_model:
+            self._inflight[key] = loop.create_future()
+
+        steps: List[dict] = []
+        seen = set()
+        sources = set()
+
+        def emit(key: FragmentKey, template: dict) -> Optional[dict]:
+            step = _render_step(key, template, plan.params)
+            if step["action"] in seen:
+                return None
+            seen.add(step["action"])
+            step["step"] = len(steps) + 1
+            steps.append(step)
+            return step
+
+        try:
+            ready_keys = [key for key in plan.keys if key not in needs_model]
+            fragments = await self.get_fragments(db, ready_keys)
+            await _end_transaction(db)
+            ready_keys.sort(key=lambda key: PRIORITY_ORDER.get(_urgency(key)[0], len(PRIORITY_ORDER)))
+            for key, template in ((key, template) for key in ready_keys for template in fragments[key].steps):
+                sources.add(fragments[key].source)
+                step = emit(key, template)
+                if step is not None:
+                    yield step
+
+            for key in needs_model:
+                async for template, source in self._stream_fragment(key):
+                    sources.add(source)
+                    step = emit(key, template)
+                    if step is not None:
+                        yield step
+                stored_fragment = self._cache.get(key)
+                if stored_fragment is not None:
+                    await self._store(db, key, stored_fragment)
+                    await _end_transaction(db)
+        except BaseException as exc:
+            for key in needs_model:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+                    future.exception()
+            await db.rollback()
+            playbook = await db.get(DefensePlaybook, playbook_id)
+            if playbook is not None:
+                playbook.status = "failed"
+                playbook.strategies = steps
+                await db.commit()
+            raise
+
+        playbook = await db.get(DefensePlaybook, playbook_id)
+        playbook.strategies = steps
+        playbook.status = "completed"
+        playbook.generation_source = _generation_source(sources)
+        playbook.generation_time_ms = (time.perf_counter() - plan.started) * 1000
+        playbook.completed_at = func.now()
+        await db.commit()
+
+
+# Global playbook engine
+playbook_engine = PlaybookEngine(llm=get_llm_client(), cache_size=settings.playbook_fragment_cache_size)
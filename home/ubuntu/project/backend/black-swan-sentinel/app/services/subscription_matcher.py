@@ -0,0 +1,288 @@
+"""
+In-memory inverted index over NewsSubscription rows.
+
+Each subscription is posted under every category, sector and keyword it
+follows, bucketed by its minimum impact score. Resolving the recipients of
+an alert then only touches the postings for the alert's own terms, so the
+cost grows with the number of matches rather than with the number of users.
+Commit hooks keep the index current for this worker's ORM writes; a periodic
+rebuild picks up bulk statements and writes made by other workers.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.commit_hooks import register_commit_hook
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.news import NewsAlert, NewsArticle, NewsSubscription
+
+# Width of the min_impact_score buckets (impact scores range 0-100)
+IMPACT_BUCKET_WIDTH = 10.0
+
+CATEGORY = "category"
+SECTOR = "sector"
+KEYWORD = "keyword"
+
+
+@dataclass(frozen=True)
+class SubscriptionEntry:
+    """Indexed view of a single active subscription."""
+    subscription_id: int
+    user_id: int
+    categories: FrozenSet[str]
+    sectors: FrozenSet[str]
+    keywords: FrozenSet[str]
+    min_impact_score: float
+    alert_frequency: str
+    email_alerts: bool
+    push_notifications: bool
+
+    @property
+    def is_wildcard(self) -> bool:
+        """Subscriptions without any filter receive every alert above their threshold."""
+        return not (self.categories or self.sectors or self.keywords)
+
+    def terms(self) -> Iterable[Tuple[str, str]]:
+        for category in self.categories:
+            yield CATEGORY, category
+        for sector in self.sectors:
+            yield SECTOR, sector
+        for keyword in self.keywords:
+            yield KEYWORD, keyword
+
+
+def _normalize(values: Optional[Iterable]) -> FrozenSet[str]:
+    if not values:
+        return frozenset()
+    if isinstance(values, str):
+        values = [values]
+    return frozenset(str(value).strip().lower() for value in values if value)
+
+
+def _bucket(score: float) -> int:
+    return int(max(score, 0.0) // IMPACT_BUCKET_WIDTH)
+
+
+def entry_from_subscription(subscription: NewsSubscription) -> SubscriptionEntry:
+    """Build an index entry from a NewsSubscription row."""
+    return SubscriptionEntry(
+        subscription_id=subscription.id,
+        user_id=subscription.user_id,
+        categories=_normalize(subscription.categories),
+        sectors=_normalize(subscription.sectors),
+        keywords=_normalize(subscription.keywords),
+        min_impact_score=subscription.min_impact_score if subscription.min_impact_score is not None else 50.0,
+        alert_frequency=subscription.alert_frequency or "immediate",
+        email_alerts=bool(subscription.email_alerts),
+        push_notifications=bool(subscription.push_notifications),
+    )
+
+
+class SubscriptionMatcher:
+    """Inverted index from alert terms to the subscriptions that follow them."""
+
+    def __init__(self):
+        self._entries: Dict[int, SubscriptionEntry] = {}
+        # (field, term) -> impact bucket -> subscription ids
+        self._postings: Dict[Tuple[str, str], Dict[int, Set[int]]] = {}
+        # impact bucket -> ids of subscriptions without any filter
+        self._wildcards: Dict[int, Set[int]] = {}
+        # user_id -> ids of every subscription the user has, active or not
+        self._by_user: Dict[int, Set[int]] = {}
+        self._subscriber: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, subscription_id: int) -> Optional[SubscriptionEntry]:
+        """Return the indexed entry for a subscription, if any."""
+        return self._entries.get(subscription_id)
+
+    def user_subscriptions(self, user_id: int) -> Optional[List[SubscriptionEntry]]:
+        """Return a user's active subscriptions, or None if the user has no subscription at all."""
+        ids = self._by_user.get(user_id)
+        if ids is None:
+            return None
+        return [self._entries[sid] for sid in ids if sid in self._entries]
+
+    def clear(self) -> None:
+        """Drop every indexed subscription."""
+        self._entries.clear()
+        self._postings.clear()
+        self._wildcards.clear()
+        self._by_user.clear()
+        self._subscriber.clear()
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Reload the whole index from the subscriptions in the database."""
+        result = await db.execute(select(NewsSubscription))
+        self.clear()
+        for subscription in result.scalars():
+            if subscription.is_active:
+                self.add(entry_from_subscription(subscription))
+            else:
+                self.deactivate(subscription.id, subscription.user_id)
+
+    async def refresh(self) -> None:
+        """Rebuild the index in its own session (on the primary, so it never lags the hooks)."""
+        async with AsyncSessionLocal() as db:
+            await self.rebuild(db)
+
+    def schedule_jobs(self, scheduler) -> None:
+        """Register the periodic rebuild on an APScheduler instance."""
+        scheduler.add_job(
+            self.refresh, "interval",
+            minutes=settings.index_rebuild_interval_minutes,
+            id="subscription_index_rebuild", coalesce=True, max_instances=1, replace_existing=True
+        )
+
+    def _own(self, subscription_id: int, user_id: int) -> None:
+        self._subscriber[subscription_id] = user_id
+        self._by_user.setdefault(user_id, set()).add(subscription_id)
+
+    def deactivate(self, subscription_id: int, user_id: int) -> None:
+        """Stop routing alerts to a subscription while keeping it on record for its user."""
+        self.remove(subscription_id)
+        self._own(subscription_id, user_id)
+
+    def add(self, entry: SubscriptionEntry) -> None:
+        """Index a subscription, replacing any previous version of it."""
+        self.remove(entry.subscription_id)
+        self._entries[entry.subscription_id] = entry
+        self._own(entry.subscription_id, entry.user_id)
+
+        bucket = _bucket(entry.min_impact_score)
+        if entry.is_wildcard:
+            self._wildcards.setdefault(bucket, set()).add(entry.subscription_id)
+            return
+        for term in entry.terms():
+            self._postings.setdefault(term, {}).setdefault(bucket, set()).add(entry.subscription_id)
+
+    def remove(self, subscription_id: int) -> None:
+        """Remove a subscription from the index if present."""
+        user_id = self._subscriber.pop(subscription_id, None)
+        if user_id is not None:
+            self._discard(self._by_user, user_id, subscription_id)
+        entry = self._entries.pop(subscription_id, None)
+        if entry is None:
+            return
+
+        bucket = _bucket(entry.min_impact_score)
+        if entry.is_wildcard:
+            self._discard(self._wildcards, bucket, subscription_id)
+            return
+        for term in entry.terms():
+            buckets = self._postings.get(term)
+            if buckets is None:
+                continue
+            self._discard(buckets, bucket, subscription_id)
+            if not buckets:
+                del self._postings[term]
+
+    @staticmethod
+    def _discard(buckets: Dict[int, Set[int]], bucket: int, subscription_id: int) -> None:
+        ids = buckets.get(bucket)
+        if ids is None:
+            return
+        ids.discard(subscription_id)
+        if not ids:
+            del buckets[bucket]
+
+    def _collect(self, buckets: Dict[int, Set[int]], impact_score: Optional[float], into: Set[int]) -> None:
+        if impact_score is None:
+            for ids in buckets.values():
+                into.update(ids)
+            return
+
+        top = _bucket(impact_score)
+        for bucket, ids in buckets.items():
+            if bucket < top:
+                into.update(ids)
+            elif bucket == top:
+                # Only the boundary bucket needs the exact threshold check
+                into.update(
+                    sid for sid in ids
+                    if self._entries[sid].min_impact_score <= impact_score
+                )
+
+    def match(
+        self,
+        categories: Iterable[str] = (),
+        sectors: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+        impact_score: Optional[float] = None
+    ) -> List[SubscriptionEntry]:
+        """
+        Return the subscriptions matching any of the given terms.
+
+        Alerts without an impact score are treated as passing every
+        subscription's minimum impact threshold.
+        """
+        matched: Set[int] = set()
+        for term in _alert_terms(categories, sectors, keywords):
+            buckets = self._postings.get(term)
+            if buckets:
+                self._collect(buckets, impact_score, matched)
+        self._collect(self._wildcards, impact_score, matched)
+        return [self._entries[sid] for sid in matched]
+
+    def match_alert(self, alert: NewsAlert, article: Optional[NewsArticle] = None) -> List[SubscriptionEntry]:
+        """Return the subscriptions that should receive a news alert."""
+        sectors = set(alert.affected_sectors or [])
+        keywords = set(alert.affected_assets or [])
+        categories = set()
+        impact_score = None
+        if article is not None:
+            sectors.update(article.sectors_affected or [])
+            keywords.update(article.keywords or [])
+            keywords.update(article.assets_mentioned or [])
+            if article.category:
+                categories.add(article.category)
+            impact_score = article.impact_score
+        return self.match(categories, sectors, keywords, impact_score)
+
+    def recipients(self, alert: NewsAlert, article: Optional[NewsArticle] = None) -> Set[int]:
+        """Return the ids of users subscribed to a news alert."""
+        return {entry.user_id for entry in self.match_alert(alert, article)}
+
+
+def _alert_terms(
+    categories: Iterable[str],
+    sectors: Iterable[str],
+    keywords: Iterable[str]
+) -> Iterable[Tuple[str, str]]:
+    """Normalize alert terms into index keys."""
+    for category in _normalize(categories):
+        yield CATEGORY, category
+    for sector in _normalize(sectors):
+        yield SECTOR, sector
+    for keyword in _normalize(keywords):
+        yield KEYWORD, keyword
+
+
+# Global matcher instance
+subscription_matcher = SubscriptionMatcher()
+
+
+def _snapshot(session: Session, subscription: NewsSubscription):
+    if not subscription.is_active or subscription in session.deleted:
+        return subscription.id, subscription.user_id, None
+    return subscription.id, subscription.user_id, entry_from_subscription(subscription)
+
+
+def _apply(upserted: list, deleted: list) -> None:
+    for subscription_id, user_id, entry in upserted:
+        if entry is None:
+            subscription_matcher.deactivate(subscription_id, user_id)
+        else:
+            subscription_matcher.add(entry)
+    for subscription_id, _, _ in deleted:
+        subscription_matcher.remove(subscription_id)
+
+
+register_commit_hook(NewsSubscription, _apply, _snapshot)
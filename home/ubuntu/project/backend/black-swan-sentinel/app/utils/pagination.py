@@ -0,0 +1,99 @@
+"""
+Keyset pagination and column projection helpers for list endpoints.
+
+Lists are ordered newest first by (created_at, id) and continued with an
+opaque cursor holding the last row's key. The next page is a row-value seek,
+`(created_at, id) < (:created_at, :id)`, which the database turns into an
+index range, so a deep page costs the same as the first; paged tables keep
+`created_at` NOT NULL so no row falls outside that range. SQLite keeps
+timestamps as text in more than one format (server defaults have whole
+seconds, values bound by SQLAlchemy have microseconds), so there the key is
+compared as the stored text, which is also the order SQLite sorts it in.
+`project` limits the loaded columns to those a response schema actually
+returns, which keeps heavy JSON columns out of list queries.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import String, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql import Select
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+SortKey = Union[datetime, str]
+
+
+def encode_cursor(created_at: SortKey, row_id: int) -> str:
+    """Encode a row's sort key as an opaque cursor."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by `encode_cursor` into its timestamp text and id."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        datetime.fromisoformat(created_at)
+        return created_at, int(row_id)
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def project(model, schema: Type[BaseModel]):
+    """Loader option restricting a query to the model columns a schema exposes."""
+    columns = [
+        getattr(model, name) for name in schema.model_fields
+        if name in model.__table__.columns
+    ]
+    return load_only(*columns)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> Tuple[List, Optional[str]]:
+    """
+    Return one page of `query` (newest first) and the cursor for the next page.
+
+    `model` must have a NOT NULL `created_at` and an `id` column; the next
+    cursor is None on the last page.
+    """
+    dialect = db.bind.dialect.name
+    created_at, row_id = model.created_at, model.id
+    # On SQLite compare the stored text as is; binding a datetime would render
+    # microseconds and never equal a whole-second server default
+    sort_key = type_coerce(created_at, String) if dialect == "sqlite" else created_at
+    if cursor is not None:
+        after_created_at, after_id = decode_cursor(cursor)
+        if dialect != "sqlite":
+            after_created_at = datetime.fromisoformat(after_created_at)
+        query = query.where(tuple_(sort_key, row_id) < tuple_(after_created_at, after_id))
+
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(
+        query.add_columns(sort_key.label("page_key")).order_by(created_at.desc(), row_id.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+    if len(rows) <= limit:
+        return [row[0] for row in rows], None
+
+    rows = rows[:limit]
+    last, last_created_at = rows[-1]
+    return [row[0] for row in rows], encode_cursor(last_created_at, last.id)
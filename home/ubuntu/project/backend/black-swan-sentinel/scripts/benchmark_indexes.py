@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Query benchmark for the hot-path indexes
+Builds a synthetic database, times the hot queries without and with the
+indexes added in migration 0004, and prints the query plans
+
+Usage: python scripts/benchmark_indexes.py [--scale 1.0] [--database-url sqlite:///bench.db]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+
+from app.core.database import Base
+from app.models import news, playbook, portfolio, risk, simulation, user  # noqa: F401 (register models)
+from app.models.news import NewsArticle
+from app.models.portfolio import AssetType, Holding, Portfolio, Transaction, TransactionType
+from app.models.risk import RiskAlert, RiskAssessment
+from app.models.simulation import DisasterSimulation
+from app.models.user import User
+
+# Indexes added by migration 0004
+BENCHMARKED_INDEXES = [
+    "ix_holdings_portfolio_id",
+    "ix_transactions_portfolio_id_transaction_date",
+    "ix_risk_alerts_user_id_is_active",
+    "ix_news_articles_published_at",
+    "ix_news_articles_unprocessed",
+    "ix_disaster_simulations_user_id_created_at",
+]
+
+# (name, SQL, id range key); booleans are rendered the way SQLAlchemy renders them
+# per dialect so partial index predicates can match
+QUERIES = [
+    ("holdings by portfolio",
+     "SELECT * FROM holdings WHERE portfolio_id = :id", "portfolios"),
+    ("portfolio transaction history",
+     "SELECT * FROM transactions WHERE portfolio_id = :id ORDER BY transaction_date DESC LIMIT 50", "portfolios"),
+    ("active risk alerts",
+     "SELECT * FROM risk_alerts WHERE user_id = :id AND is_active = {true}", "users"),
+    ("latest news",
+     "SELECT id, title, published_at FROM news_articles ORDER BY published_at DESC LIMIT 50", None),
+    ("unprocessed news backlog",
+     "SELECT id FROM news_articles WHERE is_processed = {false} ORDER BY created_at LIMIT 100", None),
+    ("simulation history",
+     "SELECT * FROM disaster_simulations WHERE user_id = :id ORDER BY created_at DESC LIMIT 20", "users"),
+]
+
+
+def build_dataset(engine, scale: float, seed: int = 42) -> dict:
+    """Create the schema and fill it with deterministic synthetic rows."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    counts = {
+        "users": max(10, int(500 * scale)),
+        "portfolios": max(20, int(1000 * scale)),
+        "holdings": int(50_000 * scale),
+        "transactions": int(200_000 * scale),
+        "risk_alerts": int(50_000 * scale),
+        "news_articles": int(100_000 * scale),
+        "disaster_simulations": int(20_000 * scale),
+    }
+
+    def ago(days: float) -> datetime:
+        return now - timedelta(days=days)
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x"}
+            for i in range(counts["users"])
+        ])
+        conn.execute(insert(Portfolio), [
+            {"user_id": rng.randint(1, counts["users"]), "name": f"Portfolio {i}"}
+            for i in range(counts["portfolios"])
+        ])
+        conn.execute(insert(Holding), [
+            {"portfolio_id": rng.randint(1, counts["portfolios"]), "symbol": f"SYM{i % 500}", "name": "Asset",
+             "asset_type": AssetType.EQUITY, "quantity": 10, "average_price": 100}
+            for i in range(counts["holdings"])
+        ])
+        conn.execute(insert(Transaction), [
+            {"portfolio_id": rng.randint(1, counts["portfolios"]), "transaction_type": TransactionType.BUY,
+             "amount": 1000, "transaction_date": ago(rng.uniform(0, 1500))}
+            for _ in range(counts["transactions"])
+        ])
+        conn.execute(insert(RiskAssessment), [
+            {"user_id": i + 1, "overall_risk_score": 50, "risk_level": "medium"}
+            for i in range(counts["users"])
+        ])
+        conn.execute(insert(RiskAlert), [
+            {"assessment_id": rng.randint(1, counts["users"]), "user_id": rng.randint(1, counts["users"]),
+             "alert_type": "concentration", "severity": "medium", "title": "Alert", "message": "Alert",
+             "is_active": rng.random() < 0.1}
+            for _ in range(counts["risk_alerts"])
+        ])
+        conn.execute(insert(NewsArticle), [
+            {"title": f"Headline {i}", "source": "wire", "published_at": ago(rng.uniform(0, 365)),
+             "created_at": ago(rng.uniform(0, 365)), "is_processed": rng.random() < 0.98}
+            for i in range(counts["news_articles"])
+        ])
+        conn.execute(insert(DisasterSimulation), [
+            {"user_id": rng.randint(1, counts["users"]), "name": "Sim", "scenario_type": "market_crash",
+             "scenario_config": {}, "created_at": ago(rng.uniform(0, 730))}
+            for _ in range(counts["disaster_simulations"])
+        ])
+    return counts
+
+
+def set_indexes(engine, enabled: bool) -> None:
+    """Create or drop the benchmarked indexes."""
+    indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+    with engine.begin() as conn:
+        for name in BENCHMARKED_INDEXES:
+            if enabled:
+                indexes[name].create(conn, checkfirst=True)
+            else:
+                indexes[name].drop(conn, checkfirst=True)
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+
+
+def _sql(engine, sql: str) -> str:
+    if engine.dialect.name == "sqlite":
+        return sql.format(true=1, false=0)
+    return sql.format(true="true", false="false")
+
+
+def time_queries(engine, counts: dict, repeats: int, seed: int = 7) -> dict:
+    """Median wall time in milliseconds for each query."""
+    rng = random.Random(seed)
+    timings = {}
+    with engine.connect() as conn:
+        for name, sql, key in QUERIES:
+            statement = text(_sql(engine, sql))
+            samples = []
+            for _ in range(repeats):
+                params = {"id": rng.randint(1, counts[key])} if key else {}
+                started = time.perf_counter()
+                conn.execute(statement, params).fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(samples)
+    return timings
+
+
+def query_plans(engine) -> dict:
+    """Query plans for each benchmarked query."""
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    plans = {}
+    with engine.connect() as conn:
+        for name, sql, key in QUERIES:
+            rows = conn.execute(text(explain + _sql(engine, sql)), {"id": 1} if key else {}).fetchall()
+            plans[name] = " | ".join(str(row[-1]) for row in rows)
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot-path indexes")
+    parser.add_argument("--scale", type=float, default=1.0, help="Dataset size multiplier")
+    parser.add_argument("--repeats", type=int, default=50, help="Executions per query")
+    parser.add_argument("--database-url", help="Synchronous URL of an empty database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    engine = create_engine(url)
+    try:
+        print(f"📦 Building dataset (scale={args.scale}) at {url}")
+        counts = build_dataset(engine, args.scale)
+        print("   " + ", ".join(f"{table}={count:,}" for table, count in counts.items()))
+
+        set_indexes(engine, False)
+        before = time_queries(engine, counts, args.repeats)
+        set_indexes(engine, True)
+        after = time_queries(engine, counts, args.repeats)
+        plans = query_plans(engine)
+
+        print(f"\n{'query':32} {'no index (ms)':>14} {'indexed (ms)':>13} {'speedup':>8}")
+        for name, _, _ in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:32} {before[name]:14.3f} {after[name]:13.3f} {speedup:7.1f}x")
+
+        print("\nQuery plans with indexes:")
+        for name, plan in plans.items():
+            print(f"  {name}: {plan}")
+    finally:
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
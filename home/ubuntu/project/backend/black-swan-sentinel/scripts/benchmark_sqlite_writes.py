@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Concurrent write benchmark for SQLite production mode
+Runs request-style transactions (read, then write, flush, savepoint and
+commit) concurrently with queued background writes against a temporary
+SQLite file, once with the default engine and once with
+SQLITE_PRODUCTION_MODE=true, and reports failures and wall time for each
+
+Usage: python scripts/benchmark_sqlite_writes.py [--transactions 300] [--queued 200]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("default", "production")
+
+
+async def run(transactions: int, queued: int) -> None:
+    # Settings are read at import time, so the app is imported only once the environment is set
+    sys.path.append(PROJECT_ROOT)
+    import app.main  # noqa: F401 (register models)
+    from sqlalchemy import func, select, text, update
+    from app.core.config import settings
+    from app.core.database import AsyncSessionLocal, engine, init_db
+    from app.core.write_queue import write_queue
+    from app.models.user import User
+
+    await init_db()
+    write_queue.start()
+
+    async def request(i: int) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(select(func.count(User.id)))
+            # Give other tasks a chance to start their transactions in between
+            await asyncio.sleep(0)
+            db.add(User(email=f"bench{i}@example.com", username=f"bench{i}", hashed_password="x"))
+            await db.flush()
+            async with db.begin_nested():
+                await db.execute(text("SELECT 1"))
+            await db.commit()
+
+    async def background(i: int) -> None:
+        async def work(db):
+            await db.execute(update(User).where(User.id == i + 1).values(full_name=f"Bench {i}"))
+        await write_queue.submit(work)
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(request(i) for i in range(transactions)),
+        *(background(i) for i in range(queued)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    await write_queue.stop()
+    await engine.dispose()
+
+    failures = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    locked = sum("database is locked" in str(failure) for failure in failures)
+    mode = "production" if settings.sqlite_production_mode else "default"
+    print(f"{mode:<11} {len(outcomes) - len(failures):>5} ok  {len(failures):>5} failed "
+          f"({locked} 'database is locked')  {elapsed:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent SQLite writes")
+    parser.add_argument("--transactions", type=int, default=300, help="Concurrent request-style transactions")
+    parser.add_argument("--queued", type=int, default=200, help="Concurrent write queue jobs")
+    parser.add_argument("--mode", choices=MODES, help="Run one mode in this process (default: both, one process each)")
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run(args.transactions, args.queued))
+        return
+
+    print(f"🗄️  {args.transactions} transactions and {args.queued} queued writes, all concurrent")
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}",
+                "SQLITE_PRODUCTION_MODE": str(mode == "production").lower(),
+                "DEBUG": "false",
+            }
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode,
+                 "--transactions", str(args.transactions), "--queued", str(args.queued)],
+                env=env, check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
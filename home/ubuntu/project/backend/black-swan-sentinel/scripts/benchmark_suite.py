@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the service layer and HTTP endpoints
+Builds a synthetic dataset at the requested scale, times the in-memory
+exposure scan and subscription matching, cash-flow projection, bulk import
+and streaming export, and key read endpoints under concurrent load through
+an in-process ASGI client. Results are written as JSON; with --baseline the run fails if any
+benchmark's median regressed by more than --tolerance
+
+Usage: python scripts/benchmark_suite.py [--scale 0.25] [--output results.json] [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and emit JSON results")
+    parser.add_argument("--scale", type=float, default=0.25, help="Dataset scale (1.0 = 200 users, 5,000 articles)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--holdings-per-portfolio", type=int)
+    parser.add_argument("--transactions-per-portfolio", type=int)
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per service benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per HTTP endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent in-flight HTTP requests")
+    parser.add_argument("--import-rows", type=int, default=20000, help="Rows in the bulk import file")
+    parser.add_argument("--replay-iterations", type=int, default=10000, help="Bootstrapped paths per crisis replay")
+    parser.add_argument("--only", action="append", help="Run only benchmarks whose name starts with this (repeatable)")
+    parser.add_argument("--database-url", help="Empty database to benchmark against (default: temporary SQLite)")
+    parser.add_argument("--with-response-cache", action="store_true", help="Leave the HTTP response cache enabled")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown vs baseline (0.25 = 25%%)")
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# The app binds its engine and settings at import time, so configure them first
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(_tmpdir.name, 'bench.db')}"
+# SQL echo (DEBUG in .env) would dominate every timing
+os.environ["DEBUG"] = "false"
+if not args.with_response_cache:
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["CRISIS_DATA_DIR"] = _tmpdir.name
+
+import httpx
+import numpy as np
+from sqlalchemy import select
+
+from app.core.database import ReadSessionLocal, init_db
+from app.core.security import create_access_token
+from app.main import app
+from app.models.news import NewsArticle
+from app.models.portfolio import AssetType, Transaction
+from app.services.bulk_import import import_file
+from app.services.cashflow import load_projection, shock_for_scenario
+from app.services.crisis_replay import MARKET_SERIES, CrisisSeries, asset_type_series, replay_portfolio, sector_series
+from app.services.export import CSVEncoder, stream_export
+from app.services.liquidation import liquidate_replay
+from app.services.holding_index import holding_index
+from app.services.subscription_matcher import subscription_matcher
+from scripts.synthetic_dataset import INSTRUMENTS, SECTORS, DatasetSpec, build_dataset
+
+# (benchmark name, path) loaded concurrently by randomly chosen users
+HTTP_ENDPOINTS = [
+    ("http:auth_me", "/api/v1/auth/me"),
+    ("http:news", "/api/v1/news/?limit=50"),
+    ("http:simulation_history", "/api/v1/simulation/history"),
+    ("http:playbooks", "/api/v1/playbook/"),
+]
+
+
+class BenchmarkContext:
+    """Dataset facts shared by the benchmarks."""
+
+    def __init__(self, spec: DatasetSpec, args):
+        self.spec = spec
+        self.args = args
+        self.articles: List[NewsArticle] = []
+
+
+# name -> async benchmark returning a result dict with per-sample "samples" in seconds
+BENCHMARKS: Dict[str, Callable[[BenchmarkContext], Awaitable[dict]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark; they run in registration order."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def summarize(samples: List[float]) -> dict:
+    """Latency statistics in milliseconds."""
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "samples": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(percentile(95) * 1000, 3),
+        "p99_ms": round(percentile(99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+async def _repeat(ctx: BenchmarkContext, fn: Callable[[], Awaitable]) -> List[float]:
+    samples = []
+    for _ in range(ctx.args.repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@benchmark("holding_index:rebuild")
+async def bench_holding_index_rebuild(ctx: BenchmarkContext) -> dict:
+    async def rebuild():
+        async with ReadSessionLocal() as db:
+            await holding_index.rebuild(db)
+
+    return {"samples": await _repeat(ctx, rebuild), "holdings": len(holding_index)}
+
+
+@benchmark("risk_scan:exposures")
+async def bench_exposure_scan(ctx: BenchmarkContext) -> dict:
+    # Every article against every holding: the per-article lookup behind alert fan-out
+    exposed = 0
+
+    async def scan():
+        nonlocal exposed
+        exposed = 0
+        for article in ctx.articles:
+            exposed += len(holding_index.user_exposures(article.assets_mentioned or (), article.sectors_affected or ()))
+
+    samples = await _repeat(ctx, scan)
+    return {"samples": samples, "articles": len(ctx.articles), "exposures": exposed}
+
+
+@benchmark("subscription_matcher:rebuild")
+async def bench_subscription_rebuild(ctx: BenchmarkContext) -> dict:
+    async def rebuild():
+        async with ReadSessionLocal() as db:
+            await subscription_matcher.rebuild(db)
+
+    return {"samples": await _repeat(ctx, rebuild), "subscriptions": len(subscription_matcher)}
+
+
+@benchmark("news:subscription_match")
+async def bench_subscription_match(ctx: BenchmarkContext) -> dict:
+    matched = 0
+
+    async def match():
+        nonlocal matched
+        matched = 0
+        for article in ctx.articles:
+            matched += len(subscription_matcher.match(
+                [article.category] if article.category else (),
+                article.sectors_affected or (),
+                article.assets_mentioned or (),
+                article.impact_score,
+            ))
+
+    samples = await _repeat(ctx, match)
+    return {"samples": samples, "articles": len(ctx.articles), "matches": matched}
+
+
+@benchmark("cashflow:projection")
+async def bench_cashflow_projection(ctx: BenchmarkContext) -> dict:
+    # Every user's schedules expanded, then runway under a scenario shock
+    users = 0
+
+    async def project():
+        nonlocal users
+        async with ReadSessionLocal() as db:
+            projection = await load_projection(db)
+        projection.apply(shock_for_scenario("job_loss")).runway_months()
+        users = len(projection.user_ids)
+
+    samples = await _repeat(ctx, project)
+    return {"samples": samples, "users": users}
+
+
+def _crisis_fixture(ctx: BenchmarkContext) -> str:
+    # Random-walk series shaped like a real crisis file; only the timing is meaningful
+    name = "benchmark_fixture"
+    keys = (MARKET_SERIES, asset_type_series(AssetType.BOND), *(sector_series(sector) for sector in SECTORS))
+    days = 390
+    CrisisSeries(
+        name=name,
+        description="Synthetic random walk for timing only",
+        source="synthetic",
+        dates=np.arange(days).astype("datetime64[D]"),
+        keys=keys,
+        returns=np.random.default_rng(ctx.args.seed).normal(-0.001, 0.02, (days, len(keys))).astype(np.float32),
+    ).save(os.path.join(_tmpdir.name, f"{name}.npz"))
+    return name
+
+
+async def _replay(ctx: BenchmarkContext, crisis: str):
+    async with ReadSessionLocal() as db:
+        return await replay_portfolio(
+            db, 1, {"crisis": crisis}, iterations=ctx.args.replay_iterations, horizon_days=250, seed=1
+        )
+
+
+@benchmark("simulation:crisis_replay")
+async def bench_crisis_replay(ctx: BenchmarkContext) -> dict:
+    crisis = _crisis_fixture(ctx)
+    samples = await _repeat(ctx, lambda: _replay(ctx, crisis))
+    return {"samples": samples, "iterations": ctx.args.replay_iterations, "horizon_days": 250}
+
+
+@benchmark("simulation:liquidation")
+async def bench_liquidation(ctx: BenchmarkContext) -> dict:
+    result = await _replay(ctx, _crisis_fixture(ctx))
+    async with ReadSessionLocal() as db:
+        projection = await load_projection(db, [1])
+    need = projection.apply(shock_for_scenario("job_loss")).cash_need()[0]
+    shortfall = 0.0
+
+    async def run_waterfall():
+        nonlocal shortfall
+        shortfall = float(liquidate_replay(result, need).liquidity_shortfall.mean())
+
+    samples = await _repeat(ctx, run_waterfall)
+    return {"samples": samples, "iterations": ctx.args.replay_iterations, "mean_shortfall": shortfall}
+
+
+@benchmark("export:transactions_csv")
+async def bench_export(ctx: BenchmarkContext) -> dict:
+    columns = list(Transaction.__table__.columns)
+    exported = 0
+
+    async def export():
+        nonlocal exported
+        exported = 0
+        async for chunk in stream_export(select(*columns), CSVEncoder(columns)):
+            exported += len(chunk)
+
+    samples = await _repeat(ctx, export)
+    return {"samples": samples, "bytes": exported}
+
+
+async def _http_load(ctx: BenchmarkContext, path: str) -> dict:
+    """Fire `--requests` GETs at `path` from random users, `--concurrency` at a time."""
+    rng = random.Random(ctx.spec.seed)
+    tokens = {
+        user_id: create_access_token({"sub": f"user{user_id - 1}", "user_id": user_id})
+        for user_id in range(1, ctx.spec.users + 1)
+    }
+    semaphore = asyncio.Semaphore(ctx.args.concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def call(user_id: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, headers={"Authorization": f"Bearer {tokens[user_id]}"})
+                samples.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Warm up authentication caches and lazy imports so they do not skew the first samples
+        await asyncio.gather(*(call(user_id) for user_id in tokens))
+        samples.clear()
+        errors = 0
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call(rng.randint(1, ctx.spec.users)) for _ in range(ctx.args.requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "samples": samples,
+        "errors": errors,
+        "concurrency": ctx.args.concurrency,
+        "requests_per_second": round(len(samples) / elapsed, 1),
+    }
+
+
+def _register_http(name: str, path: str) -> None:
+    @benchmark(name)
+    async def bench_http(ctx: BenchmarkContext) -> dict:
+        return await _http_load(ctx, path)
+
+
+for _name, _path in HTTP_ENDPOINTS:
+    _register_http(_name, _path)
+
+
+@benchmark("import:transactions_csv")
+async def bench_bulk_import(ctx: BenchmarkContext) -> dict:
+    # Writes rows, so it runs after the read benchmarks
+    rng = random.Random(ctx.spec.seed)
+    lines = ["transaction_type,symbol,quantity,price,amount,transaction_date"]
+    for _ in range(ctx.args.import_rows):
+        quantity, price = rng.randint(1, 100), round(rng.uniform(50, 3000), 2)
+        lines.append(
+            f"buy,{rng.choice(INSTRUMENTS)[0]},{quantity},{price},{round(quantity * price, 2)},"
+            f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        )
+    payload = "\n".join(lines).encode()
+    imported = 0
+
+    async def run_import():
+        nonlocal imported
+        report = await import_file("transactions", io.BytesIO(payload), "csv", portfolio_id=1, user_id=1)
+        imported = report.rows_imported
+
+    samples = await _repeat(ctx, run_import)
+    return {"samples": samples, "rows": ctx.args.import_rows, "rows_imported": imported}
+
+
+async def run_suite(args) -> dict:
+    spec = DatasetSpec.scaled(
+        args.scale, args.seed,
+        holdings_per_portfolio=args.holdings_per_portfolio,
+        transactions_per_portfolio=args.transactions_per_portfolio,
+    )
+    await init_db()
+    started = time.perf_counter()
+    counts = await build_dataset(spec)
+    print(f"📦 Dataset built in {time.perf_counter() - started:.1f}s: {counts}", file=sys.stderr)
+
+    ctx = BenchmarkContext(spec, args)
+    async with ReadSessionLocal() as db:
+        ctx.articles = list((await db.execute(select(NewsArticle))).scalars())
+        # The scans read the in-memory indexes, which the app builds at startup
+        await holding_index.rebuild(db)
+        await subscription_matcher.rebuild(db)
+
+    results: Dict[str, dict] = {}
+    for name, fn in BENCHMARKS.items():
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        gc.collect()
+        result = await fn(ctx)
+        samples = result.pop("samples")
+        results[name] = {**summarize(samples), **result}
+        print(f"⏱️  {name:32} p50 {results[name]['p50_ms']:>10.3f} ms  p95 {results[name]['p95_ms']:>10.3f} ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DATABASE_URL"].split("://", 1)[0],
+            "response_cache": args.with_response_cache,
+            "dataset": asdict(spec),
+            "rows": counts,
+            "repeat": args.repeat,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Benchmarks whose median slowed down by more than `tolerance` vs the baseline."""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("p50_ms"):
+            continue
+        ratio = current["p50_ms"] / previous["p50_ms"]
+        current["baseline_p50_ms"] = previous["p50_ms"]
+        current["change"] = round(ratio - 1, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: p50 {previous['p50_ms']} ms -> {current['p50_ms']} ms ({ratio - 1:+.0%})")
+    return regressions
+
+
+def main():
+    # Keep per-chunk import/export logging out of the timings and the output
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        results = asyncio.run(run_suite(args))
+    finally:
+        _tmpdir.cleanup()
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for regression in regressions:
+        print(f"❌ {regression}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Crisis series converter
+Turns a wide CSV of daily index history (a date column plus one column per
+index, prices or returns) into the compact `.npz` file read by crisis
+replay. Columns are renamed to replay series keys with --map, e.g.
+--map NIFTY50=market --map "NIFTY BANK=sector:banking". Use index history
+from a source you are licensed to use and record it with --source.
+
+Usage: python scripts/convert_crisis_series.py history.csv --name gfc_2008 --start 2008-01-01 --end 2009-06-30 --source "NSE index history" --map NIFTY50=market
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.crisis_replay import MARKET_SERIES, CrisisSeries
+
+SERIES_KEY = re.compile(r"^(market|asset_type:[a-z_]+|sector:.+)$")
+
+
+def parse_mapping(items):
+    mapping = {}
+    for item in items:
+        column, _, key = item.partition("=")
+        key = key.strip().lower()
+        if not column or not SERIES_KEY.match(key):
+            raise SystemExit(f"Invalid --map {item!r}: expected COLUMN=market|asset_type:<type>|sector:<sector>")
+        mapping[column.strip()] = key
+    return mapping
+
+
+def to_log_returns(frame: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """Daily log returns from prices, or from simple/log returns."""
+    if kind == "prices":
+        # Carry the last close over days a single index did not trade
+        prices = frame.ffill()
+        returns = np.log(prices / prices.shift(1)).iloc[1:]
+    elif kind == "returns":
+        returns = np.log1p(frame)
+    else:
+        returns = frame
+    # Before an index's first quote it contributes no move
+    return returns.fillna(0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert index history to a crisis replay file")
+    parser.add_argument("input", help="CSV with a date column and one column per index")
+    parser.add_argument("--name", required=True, help="Crisis name, used as the file name")
+    parser.add_argument("--description", default="", help="What happened in this window")
+    parser.add_argument("--source", required=True, help="Where the history comes from")
+    parser.add_argument("--map", action="append", default=[], help="COLUMN=series key; repeatable")
+    parser.add_argument("--date-column", default="date", help="Name of the date column")
+    parser.add_argument("--kind", choices=["prices", "returns", "log_returns"], default="prices",
+                        help="What the value columns hold")
+    parser.add_argument("--start", help="First date of the crisis window (inclusive)")
+    parser.add_argument("--end", help="Last date of the crisis window (inclusive)")
+    parser.add_argument("--output-dir", default=settings.crisis_data_dir, help="Directory for the .npz file")
+    args = parser.parse_args()
+
+    if not re.match(r"^[a-z0-9_]+$", args.name):
+        raise SystemExit("--name must be lowercase letters, digits and underscores")
+    mapping = parse_mapping(args.map)
+    if not mapping:
+        raise SystemExit("Map at least one column with --map")
+
+    frame = pd.read_csv(args.input, parse_dates=[args.date_column])
+    missing = sorted(set(mapping) - set(frame.columns))
+    if missing:
+        raise SystemExit(f"Columns not in {args.input}: {', '.join(missing)}")
+    frame = frame.set_index(args.date_column).sort_index()[list(mapping)].apply(pd.to_numeric, errors="coerce")
+
+    returns = to_log_returns(frame, args.kind)
+    returns = returns.loc[args.start:args.end]
+    if returns.empty:
+        raise SystemExit("No rows in the selected window")
+    if MARKET_SERIES not in mapping.values():
+        print(f"⚠️  No '{MARKET_SERIES}' series: holdings without a sector or asset type series cannot be replayed")
+
+    series = CrisisSeries(
+        name=args.name,
+        description=args.description,
+        source=args.source,
+        dates=returns.index.values.astype("datetime64[D]"),
+        keys=tuple(mapping[column] for column in returns.columns),
+        returns=returns.to_numpy(dtype=np.float32),
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"{args.name}.npz")
+    series.save(path)
+
+    cumulative = np.expm1(series.returns.sum(axis=0))
+    print(f"✅ {path}: {series.days} days from {series.dates[0]} to {series.dates[-1]}")
+    for key, change in zip(series.keys, cumulative):
+        print(f"   {key:<32} {change * 100:+7.1f}% over the window")
+
+
+if __name__ == "__main__":
+    main()
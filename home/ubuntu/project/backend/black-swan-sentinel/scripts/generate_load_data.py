@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+High-volume synthetic data generator for load testing
+Fills an empty database with production-scale data generated column-wise
+with NumPy: users with years of monthly income and expenses, portfolios
+whose holding counts follow a power law over a Zipf-weighted instrument
+universe, per-holding transaction histories and a daily news flow. Output
+is fully determined by --seed and --end-date. Rows are written with COPY on
+PostgreSQL and raw executemany on SQLite, bypassing the ORM
+
+Usage: python scripts/generate_load_data.py [--scale 1.0] [--years 5] [--seed 42]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timezone
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Boolean, Float, JSON, Table, func, select, text
+
+from app.core.database import engine, init_db
+from app.core.security import get_password_hash
+from app.models.news import NewsArticle, NewsSubscription
+from app.models.portfolio import AssetType, Expense, Holding, Income, Portfolio, Transaction
+from app.models.user import User
+from scripts.synthetic_dataset import CATEGORIES, EXPENSE_CATEGORIES, INSTRUMENTS, SECTORS
+
+# Users generated together; fixed so the data does not depend on write batching
+USER_BLOCK = 2000
+# Days of news generated together
+NEWS_BLOCK_DAYS = 30
+# Rows per COPY / executemany call
+WRITE_CHUNK = 50000
+
+DAY = np.timedelta64(1, "D")
+# Asset type mix of the generated (non-named) instruments
+ASSET_TYPE_MIX = [
+    (AssetType.EQUITY, 0.74), (AssetType.MUTUAL_FUND, 0.1), (AssetType.ETF, 0.07),
+    (AssetType.BOND, 0.05), (AssetType.REAL_ESTATE, 0.02), (AssetType.COMMODITY, 0.02),
+]
+NEWS_EVENTS = ["earnings beat", "earnings miss", "rate decision", "regulatory probe", "supply shock",
+               "downgrade", "upgrade", "merger talks", "default fears", "policy reform"]
+
+
+@dataclass
+class LoadSpec:
+    """Size and shape of a load-test dataset."""
+    users: int = 20000
+    years: int = 5
+    instruments: int = 2000
+    max_holdings: int = 150
+    articles_per_day: int = 200
+    seed: int = 42
+    end_date: str = date.today().isoformat()
+
+    @property
+    def months(self) -> int:
+        return self.years * 12
+
+
+class Universe(NamedTuple):
+    """Instruments holdings are drawn from, most popular first."""
+    symbols: np.ndarray
+    names: np.ndarray
+    asset_types: np.ndarray
+    sectors: np.ndarray
+    prices: np.ndarray
+    popularity: np.ndarray
+
+
+def build_universe(spec: LoadSpec) -> Universe:
+    """The named instruments from synthetic_dataset plus generated ones, Zipf-weighted."""
+    rng = np.random.default_rng([spec.seed, 0])
+    extra = max(spec.instruments - len(INSTRUMENTS), 0)
+    types, weights = zip(*ASSET_TYPE_MIX)
+    extra_types = rng.choice([asset_type.name for asset_type in types], extra, p=weights)
+    extra_sectors = rng.choice(SECTORS[:-2], extra)
+
+    symbols = [symbol for symbol, _, _, _ in INSTRUMENTS] + [
+        f"{sector[:3].upper()}{i:04d}" for i, sector in enumerate(extra_sectors)
+    ]
+    names = [name for _, name, _, _ in INSTRUMENTS] + [f"{sector} Co {i}" for i, sector in enumerate(extra_sectors)]
+    asset_types = [asset_type.name for _, _, asset_type, _ in INSTRUMENTS] + list(extra_types)
+    sectors = [sector for _, _, _, sector in INSTRUMENTS] + list(extra_sectors)
+
+    count = len(symbols)
+    popularity = 1.0 / np.arange(1, count + 1) ** 1.1
+    return Universe(
+        symbols=np.array(symbols, dtype=object),
+        names=np.array(names, dtype=object),
+        asset_types=np.array(asset_types, dtype=object),
+        sectors=np.array(sectors, dtype=object),
+        prices=np.round(rng.lognormal(np.log(500), 1.0, count), 2),
+        popularity=popularity / popularity.sum(),
+    )
+
+
+# (table, {column: values}); values are NumPy arrays or lists, one entry per row
+Chunk = Tuple[Table, Dict[str, Sequence]]
+
+
+class Generator:
+    """Yields FK-ordered column chunks for every table."""
+
+    def __init__(self, spec: LoadSpec):
+        self.spec = spec
+        self.universe = build_universe(spec)
+        self.end = np.datetime64(spec.end_date, "us")
+        self.start = self.end - np.timedelta64(spec.years * 365, "D")
+        self.password = get_password_hash("password123")
+        self.next_portfolio_id = 1
+        self.next_holding_id = 1
+        self.next_article = 1
+
+    def _dates(self, rng, count: int, start=None) -> np.ndarray:
+        """Uniform timestamps in [start, end)."""
+        start = self.start if start is None else start
+        span = (self.end - start).astype("int64")
+        return start + rng.integers(0, span, count).astype("timedelta64[us]")
+
+    def _month_starts(self) -> np.ndarray:
+        first = self.start.astype("datetime64[M]")
+        return (first + np.arange(self.spec.months)).astype("datetime64[us]")
+
+    def chunks(self) -> Iterator[Chunk]:
+        for block, first_user in enumerate(range(1, self.spec.users + 1, USER_BLOCK)):
+            rng = np.random.default_rng([self.spec.seed, 1, block])
+            user_ids = np.arange(first_user, min(first_user + USER_BLOCK, self.spec.users + 1))
+            yield from self._user_block(rng, user_ids)
+        for block, first_day in enumerate(range(0, self.spec.years * 365, NEWS_BLOCK_DAYS)):
+            rng = np.random.default_rng([self.spec.seed, 2, block])
+            yield from self._news_block(rng, first_day, min(first_day + NEWS_BLOCK_DAYS, self.spec.years * 365))
+
+    def _user_block(self, rng, user_ids: np.ndarray) -> Iterator[Chunk]:
+        n = len(user_ids)
+        names = [f"user{user_id}" for user_id in user_ids]
+        yield User.__table__, {
+            "id": user_ids,
+            "email": [f"{name}@example.com" for name in names],
+            "username": names,
+            "hashed_password": [self.password] * n,
+            "full_name": [f"Load User {user_id}" for user_id in user_ids],
+            "is_admin": user_ids == 1,
+            "risk_tolerance": rng.choice(["conservative", "moderate", "aggressive"], n, p=[0.3, 0.5, 0.2]),
+            "created_at": self.start - rng.integers(0, 3 * 365, n) * DAY,
+        }
+
+        yield from self._income(rng, user_ids)
+
+        subscribed = user_ids[rng.random(n) < 0.6]
+        yield NewsSubscription.__table__, {
+            "user_id": subscribed,
+            "categories": [[str(c)] for c in rng.choice(CATEGORIES, len(subscribed))],
+            "sectors": [list(rng.choice(SECTORS, 3, replace=False)) for _ in subscribed],
+            "keywords": [[str(s)] for s in rng.choice(self.universe.symbols[:50], len(subscribed))],
+            "min_impact_score": rng.choice([0.0, 25.0, 50.0, 75.0], len(subscribed)),
+        }
+
+        # Most users have one portfolio, a few have several
+        per_user = rng.choice([1, 2, 3], n, p=[0.6, 0.3, 0.1])
+        portfolio_owner = np.repeat(user_ids, per_user)
+        portfolio_ids = np.arange(self.next_portfolio_id, self.next_portfolio_id + len(portfolio_owner))
+        self.next_portfolio_id += len(portfolio_ids)
+
+        holdings = self._holdings(rng, portfolio_ids)
+        totals = np.bincount(holdings["portfolio_id"] - portfolio_ids[0], weights=holdings["current_value"],
+                             minlength=len(portfolio_ids))
+        cash = np.round(rng.lognormal(np.log(20000), 1.2, len(portfolio_ids)), 2)
+        yield Portfolio.__table__, {
+            "id": portfolio_ids,
+            "user_id": portfolio_owner,
+            "name": [f"Portfolio {i}" for i in portfolio_ids],
+            "total_value": np.round(totals + cash, 2),
+            "cash_balance": cash,
+        }
+        yield Holding.__table__, holdings
+        yield from self._transactions(rng, holdings)
+
+        # Household expenses are booked against each user's first portfolio
+        first_portfolio = portfolio_ids[np.concatenate(([0], np.cumsum(per_user)[:-1]))]
+        yield from self._expenses(rng, first_portfolio)
+
+    def _income(self, rng, user_ids: np.ndarray) -> Iterator[Chunk]:
+        n, months = len(user_ids), self.spec.months
+        month_starts = self._month_starts()
+        # Monthly salary growing ~6% a year, paid in the first days of the month
+        salary = rng.lognormal(np.log(80000), 0.6, n)
+        growth = 1.06 ** (np.arange(months) / 12)
+        yield Income.__table__, {
+            "user_id": np.repeat(user_ids, months),
+            "source": ["Salary"] * (n * months),
+            "amount": np.round(np.outer(salary, growth).ravel(), 2),
+            "is_recurring": np.ones(n * months, dtype=bool),
+            "frequency": ["monthly"] * (n * months),
+            "income_date": np.tile(month_starts, n) + rng.integers(0, 5, n * months) * DAY,
+        }
+
+        # A quarter of users also earn irregular freelance income
+        side = user_ids[rng.random(n) < 0.25]
+        mask = rng.random((len(side), months)) < 0.3
+        owners, month_index = np.nonzero(mask)
+        yield Income.__table__, {
+            "user_id": side[owners],
+            "source": ["Freelance"] * len(owners),
+            "amount": np.round(rng.lognormal(np.log(25000), 0.8, len(owners)), 2),
+            "is_recurring": np.zeros(len(owners), dtype=bool),
+            "frequency": [None] * len(owners),
+            "income_date": month_starts[month_index] + rng.integers(0, 28, len(owners)) * DAY,
+        }
+
+    def _holdings(self, rng, portfolio_ids: np.ndarray) -> Dict[str, np.ndarray]:
+        # Pareto-distributed holding counts: most portfolios hold a handful, a few hold very many
+        counts = np.minimum(1 + np.floor(rng.pareto(1.5, len(portfolio_ids)) * 4), self.spec.max_holdings).astype(int)
+        owner = np.repeat(np.arange(len(portfolio_ids)), counts)
+        instrument = rng.choice(len(self.universe.symbols), len(owner), p=self.universe.popularity)
+        # Drop repeat draws of the same instrument within a portfolio
+        _, keep = np.unique(owner * len(self.universe.symbols) + instrument, return_index=True)
+        owner, instrument = owner[keep], instrument[keep]
+        count = len(owner)
+
+        current_price = self.universe.prices[instrument]
+        average_price = np.round(current_price * rng.lognormal(0, 0.25, count), 2)
+        quantity = np.ceil(rng.lognormal(np.log(50000), 1.0, count) / average_price)
+        current_value = np.round(quantity * current_price, 2)
+        gain = np.round(quantity * (current_price - average_price), 2)
+
+        ids = np.arange(self.next_holding_id, self.next_holding_id + count)
+        self.next_holding_id += count
+        return {
+            "id": ids,
+            "portfolio_id": portfolio_ids[owner],
+            "symbol": self.universe.symbols[instrument],
+            "name": self.universe.names[instrument],
+            "asset_type": self.universe.asset_types[instrument],
+            "sector": self.universe.sectors[instrument],
+            "quantity": quantity,
+            "average_price": average_price,
+            "current_price": current_price,
+            "current_value": current_value,
+            "unrealized_gain_loss": gain,
+            "unrealized_gain_loss_percent": np.round(gain / (quantity * average_price) * 100, 2),
+            "last_price_update": np.full(count, self.end),
+        }
+
+    def _transactions(self, rng, holdings: Dict[str, np.ndarray]) -> Iterator[Chunk]:
+        # Each holding trades at its own rate (~1.5 a year on average) over the whole history
+        rate = rng.lognormal(np.log(1.5), 0.7, len(holdings["id"])) * self.spec.years
+        counts = 1 + rng.poisson(rate)
+        holding = np.repeat(np.arange(len(counts)), counts)
+        count = len(holding)
+
+        kind = rng.choice(["BUY", "SELL", "DIVIDEND"], count, p=[0.55, 0.3, 0.15])
+        trade_date = self._dates(rng, count)
+        # Prices drift back ~10% a year from today's price, with noise
+        years_ago = (self.end - trade_date).astype("int64") / (365 * 86400e6)
+        price = np.round(holdings["current_price"][holding] * 0.9 ** years_ago * rng.lognormal(0, 0.1, count), 2)
+        quantity = np.ceil(holdings["quantity"][holding] * rng.uniform(0.05, 0.5, count))
+        amount = np.round(quantity * price, 2)
+
+        dividend = kind == "DIVIDEND"
+        amount[dividend] = np.round(amount[dividend] * 0.02, 2)
+        quantity[dividend] = np.nan
+        price[dividend] = np.nan
+
+        yield Transaction.__table__, {
+            "portfolio_id": holdings["portfolio_id"][holding],
+            "transaction_type": kind,
+            "symbol": holdings["symbol"][holding],
+            "quantity": quantity,
+            "price": price,
+            "amount": amount,
+            "transaction_date": trade_date,
+        }
+
+    def _expenses(self, rng, portfolio_ids: np.ndarray) -> Iterator[Chunk]:
+        n, months = len(portfolio_ids), self.spec.months
+        month_starts = self._month_starts()
+        categories = np.array(EXPENSE_CATEGORIES, dtype=object)
+
+        # Two to four recurring monthly bills per household
+        bills = rng.integers(2, 5, n)
+        bill_owner = np.repeat(np.arange(n), bills)
+        bill_category = rng.integers(0, len(categories), len(bill_owner))
+        bill_amount = rng.lognormal(np.log(8000), 0.9, len(bill_owner))
+        rows = len(bill_owner) * months
+        yield Expense.__table__, {
+            "portfolio_id": np.repeat(portfolio_ids[bill_owner], months),
+            "category": np.repeat(categories[bill_category], months),
+            "amount": np.round(np.repeat(bill_amount, months) * rng.lognormal(0, 0.05, rows), 2),
+            "is_recurring": np.ones(rows, dtype=bool),
+            "frequency": ["monthly"] * rows,
+            "expense_date": np.tile(month_starts, len(bill_owner)) + rng.integers(0, 28, rows) * DAY,
+        }
+
+        # Irregular one-off spending, about one every other month
+        one_off = rng.poisson(0.5 * months, n)
+        owner = np.repeat(np.arange(n), one_off)
+        yield Expense.__table__, {
+            "portfolio_id": portfolio_ids[owner],
+            "category": categories[rng.integers(0, len(categories), len(owner))],
+            "amount": np.round(rng.lognormal(np.log(6000), 1.2, len(owner)), 2),
+            "is_recurring": np.zeros(len(owner), dtype=bool),
+            "frequency": [None] * len(owner),
+            "expense_date": self._dates(rng, len(owner)),
+        }
+
+    def _news_block(self, rng, first_day: int, last_day: int) -> Iterator[Chunk]:
+        days = last_day - first_day
+        per_day = rng.poisson(self.spec.articles_per_day, days)
+        count = int(per_day.sum())
+        day = np.repeat(np.arange(first_day, last_day), per_day)
+        published = (
+            self.start + day * DAY
+            + rng.integers(0, 86400 * 10**6, count).astype("timedelta64[us]")
+        )
+        order = np.argsort(published, kind="stable")
+        published = published[order]
+
+        # Heavy-tailed impact: most stories are noise, a few move markets
+        impact = np.round(100 * rng.beta(1.2, 6, count), 1)
+        sentiment_score = np.round(np.clip(rng.normal(0, 0.4, count), -1, 1), 2)
+        sentiment = np.where(sentiment_score > 0.15, "positive", np.where(sentiment_score < -0.15, "negative", "neutral"))
+        sector = rng.choice(SECTORS, count)
+        event = rng.choice(NEWS_EVENTS, count)
+        mentions = rng.integers(0, 4, count)
+        mentioned = rng.choice(len(self.universe.symbols), (count, 3), p=self.universe.popularity)
+        ids = np.arange(self.next_article, self.next_article + count)
+        self.next_article += count
+
+        yield NewsArticle.__table__, {
+            "title": [f"{s}: {e}" for s, e in zip(sector, event)],
+            "url": [f"https://news.example.com/{i}" for i in ids],
+            "source": rng.choice(["Reuters", "Bloomberg", "Mint", "Economic Times", "Business Standard"], count),
+            "category": rng.choice(CATEGORIES, count),
+            "sectors_affected": [
+                sorted({str(s)} | {str(self.universe.sectors[i]) for i in row[:k]})
+                for s, row, k in zip(sector, mentioned, mentions)
+            ],
+            "assets_mentioned": [[str(self.universe.symbols[i]) for i in row[:k]] for row, k in zip(mentioned, mentions)],
+            "keywords": [[str(e)] for e in event],
+            "sentiment": sentiment,
+            "sentiment_score": sentiment_score,
+            "impact_score": impact,
+            "is_processed": published < self.end - DAY,
+            "published_at": published,
+            "scraped_at": published + rng.integers(1, 600, count).astype("timedelta64[s]"),
+            "created_at": published + rng.integers(1, 600, count).astype("timedelta64[s]"),
+        }
+
+
+class BulkWriter:
+    """Writes column chunks with COPY (PostgreSQL), raw executemany (SQLite) or Core inserts."""
+
+    def __init__(self, connection, dialect: str):
+        self.connection = connection
+        self.dialect = dialect
+        self.driver = None
+        self.rows: Dict[str, int] = {}
+
+    async def __aenter__(self):
+        if self.dialect in ("postgresql", "sqlite"):
+            raw = await self.connection.get_raw_connection()
+            self.driver = raw.driver_connection
+        if self.dialect == "sqlite":
+            # Durability is pointless for a throwaway load; the final commit still lands on disk
+            await self.driver.execute("PRAGMA synchronous = OFF")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.dialect == "sqlite":
+            await self.driver.commit()
+        elif self.dialect != "postgresql":
+            await self.connection.commit()
+
+    def _convert(self, table: Table, name: str, values) -> list:
+        column_type = table.c[name].type
+        if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+            values = values.astype("datetime64[us]")
+            if self.dialect == "sqlite":
+                # SQLAlchemy's SQLite DateTime storage format
+                return [value.replace("T", " ") for value in np.datetime_as_string(values, unit="us").tolist()]
+            return [value.replace(tzinfo=timezone.utc) for value in values.tolist()]
+        if isinstance(column_type, JSON):
+            return [json.dumps(value) for value in values]
+        if isinstance(values, np.ndarray) and values.dtype.kind == "f" and isinstance(column_type, Float):
+            if np.isnan(values).any():
+                return [None if value != value else value for value in values.tolist()]
+        if isinstance(values, np.ndarray) and isinstance(column_type, Boolean):
+            return values.astype(bool).tolist()
+        return values.tolist() if isinstance(values, np.ndarray) else list(values)
+
+    def _with_defaults(self, table: Table, columns: Dict[str, list], count: int) -> Dict[str, list]:
+        # Raw writes skip SQLAlchemy's Python-side defaults, so apply the scalar ones here
+        for column in table.c:
+            if column.name not in columns and column.default is not None and column.default.is_scalar:
+                columns[column.name] = [column.default.arg] * count
+        return columns
+
+    async def write(self, table: Table, data: Dict[str, Sequence]) -> None:
+        count = len(next(iter(data.values())))
+        if not count:
+            return
+        columns = self._with_defaults(table, {name: self._convert(table, name, values) for name, values in data.items()}, count)
+        names = list(columns)
+        rows = list(zip(*(columns[name] for name in names)))
+
+        for start in range(0, count, WRITE_CHUNK):
+            chunk = rows[start:start + WRITE_CHUNK]
+            if self.dialect == "postgresql":
+                await self.driver.copy_records_to_table(table.name, records=chunk, columns=names)
+            elif self.dialect == "sqlite":
+                placeholders = ", ".join("?" for _ in names)
+                await self.driver.executemany(
+                    f"INSERT INTO {table.name} ({', '.join(names)}) VALUES ({placeholders})", chunk
+                )
+            else:
+                await self.connection.execute(table.insert(), [dict(zip(names, row)) for row in chunk])
+        self.rows[table.name] = self.rows.get(table.name, 0) + count
+
+
+async def reset_sequences(connection, tables: List[Table]) -> None:
+    """Explicit ids bypass PostgreSQL sequences; move them past the loaded rows."""
+    for table in tables:
+        await connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+    await connection.commit()
+
+
+async def generate(spec: LoadSpec) -> Dict[str, int]:
+    """Load the dataset into the configured (empty) database; returns rows per table."""
+    await init_db()
+    dialect = engine.dialect.name
+    async with engine.connect() as connection:
+        if await connection.scalar(select(func.count()).select_from(User.__table__)):
+            raise RuntimeError("Load data needs an empty database (users table has rows)")
+        await connection.commit()
+
+        generator = Generator(spec)
+        started = time.perf_counter()
+        async with BulkWriter(connection, dialect) as writer:
+            for table, data in generator.chunks():
+                await writer.write(table, data)
+                total = sum(writer.rows.values())
+                print(f"\r   {total:,} rows ({total / (time.perf_counter() - started):,.0f} rows/s)", end="", flush=True)
+        print()
+
+        if dialect == "postgresql":
+            await reset_sequences(connection, [User.__table__, Portfolio.__table__, Holding.__table__])
+    return writer.rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load a production-scale synthetic dataset into the configured database")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for users and daily news volume")
+    parser.add_argument("--users", type=int, help="Number of users (overrides --scale)")
+    parser.add_argument("--years", type=int, default=5, help="Years of transactions, income, expenses and news")
+    parser.add_argument("--articles-per-day", type=int, help="Mean news articles per day (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", default=date.today().isoformat(), help="Last day of history (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    defaults = LoadSpec()
+    spec = LoadSpec(
+        users=args.users or max(1, int(defaults.users * args.scale)),
+        years=args.years,
+        articles_per_day=args.articles_per_day or max(1, int(defaults.articles_per_day * args.scale)),
+        seed=args.seed,
+        end_date=args.end_date,
+    )
+    print(f"📦 Generating load data into {engine.dialect.name}: {asdict(spec)}")
+    started = time.perf_counter()
+    rows = await generate(spec)
+    for table, count in rows.items():
+        print(f"   {table:20} {count:>12,}")
+    elapsed = time.perf_counter() - started
+    print(f"✅ {sum(rows.values()):,} rows in {elapsed:.1f}s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Startup profile for the API worker
+Imports the application in a fresh interpreter under `-X importtime`,
+reports the slowest modules and packages, times the lifespan startup, and
+fails if a heavy numeric library is imported at boot or startup exceeds
+the budget
+
+Usage: python scripts/profile_startup.py [--top 25] [--budget-ms 1000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only loaded on first use by the endpoints and engines that need them
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "pyarrow")
+
+# Runs in the child interpreter: wall-clock import and lifespan startup
+_MEASURE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(boot())
+print(json.dumps({"import_ms": (imported - started) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+"""
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT}
+    # SQL echo would be timed along with startup
+    env.setdefault("DEBUG", "false")
+    return subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every `-X importtime` line."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API worker startup")
+    parser.add_argument("--top", type=int, default=25, help="Modules and packages to list")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Fail if import + startup exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    profiled = _run(["-X", "importtime", "-c", "import app.main"])
+    if profiled.returncode != 0:
+        sys.exit(profiled.stderr)
+    modules = parse_importtime(profiled.stderr)
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    heavy = sorted({name.split(".")[0] for name, _, _ in modules if name.split(".")[0] in HEAVY_MODULES})
+
+    measured = _run(["-c", _MEASURE])
+    if measured.returncode != 0:
+        sys.exit(measured.stderr)
+    timings = json.loads(measured.stdout.strip().splitlines()[-1])
+    total_ms = timings["import_ms"] + timings["lifespan_ms"]
+
+    report = {
+        "import_ms": round(timings["import_ms"], 1),
+        "lifespan_ms": round(timings["lifespan_ms"], 1),
+        "total_ms": round(total_ms, 1),
+        "modules_imported": len(modules),
+        "heavy_modules": heavy,
+        "slowest_modules": [
+            {"module": name, "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+            for name, self_us, cumulative_us in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]
+        ],
+        "packages": [
+            {"package": name, "self_ms": self_us / 1000}
+            for name, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:args.top]
+        ],
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"🚀 import app.main {report['import_ms']:.0f} ms + lifespan {report['lifespan_ms']:.0f} ms "
+              f"= {report['total_ms']:.0f} ms ({report['modules_imported']} modules)")
+        print("\nSlowest modules (cumulative):")
+        for module in report["slowest_modules"]:
+            print(f"   {module['cumulative_ms']:>8.1f} ms  {module['self_ms']:>8.1f} ms self  {module['module']}")
+        print("\nPackages (self time):")
+        for package in report["packages"]:
+            print(f"   {package['self_ms']:>8.1f} ms  {package['package']}")
+
+    failed = False
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}", file=sys.stderr)
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ Startup took {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
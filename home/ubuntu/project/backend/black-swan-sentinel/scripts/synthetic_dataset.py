@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset builder for benchmarks and load tests
+Generalizes seed_data.py: fills an empty database with a deterministic,
+configurable number of users, portfolios, holdings, transactions, news
+articles, subscriptions and simulations using chunked bulk inserts
+
+Usage: python scripts/synthetic_dataset.py [--scale 1.0] [--seed 42]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import AsyncSessionLocal, init_db
+from app.core.security import get_password_hash
+from app.models.news import NewsArticle, NewsSubscription
+from app.models.portfolio import AssetType, Expense, Holding, Income, Portfolio, Transaction, TransactionType
+from app.models.simulation import DisasterSimulation
+from app.models.user import User
+
+# Rows per INSERT statement
+CHUNK_SIZE = 5000
+
+SECTORS = [
+    "Banking", "IT", "Energy", "Pharma", "FMCG", "Auto", "Metals",
+    "Telecom", "Infrastructure", "Real Estate", "Diversified", "Government",
+]
+# (symbol, name, asset type, sector)
+INSTRUMENTS = [
+    ("NIFTY50", "Nifty 50 Index Fund", AssetType.ETF, "Diversified"),
+    ("HDFCBANK", "HDFC Bank Ltd", AssetType.EQUITY, "Banking"),
+    ("ICICIBANK", "ICICI Bank Ltd", AssetType.EQUITY, "Banking"),
+    ("SBIN", "State Bank of India", AssetType.EQUITY, "Banking"),
+    ("TCS", "Tata Consultancy Services", AssetType.EQUITY, "IT"),
+    ("INFY", "Infosys Ltd", AssetType.EQUITY, "IT"),
+    ("WIPRO", "Wipro Ltd", AssetType.EQUITY, "IT"),
+    ("RELIANCE", "Reliance Industries Ltd", AssetType.EQUITY, "Energy"),
+    ("ONGC", "Oil and Natural Gas Corp", AssetType.EQUITY, "Energy"),
+    ("SUNPHARMA", "Sun Pharmaceutical", AssetType.EQUITY, "Pharma"),
+    ("HINDUNILVR", "Hindustan Unilever", AssetType.EQUITY, "FMCG"),
+    ("ITC", "ITC Ltd", AssetType.EQUITY, "FMCG"),
+    ("TATAMOTORS", "Tata Motors", AssetType.EQUITY, "Auto"),
+    ("MARUTI", "Maruti Suzuki", AssetType.EQUITY, "Auto"),
+    ("TATASTEEL", "Tata Steel", AssetType.EQUITY, "Metals"),
+    ("BHARTIARTL", "Bharti Airtel", AssetType.EQUITY, "Telecom"),
+    ("LT", "Larsen & Toubro", AssetType.EQUITY, "Infrastructure"),
+    ("DLF", "DLF Ltd", AssetType.REAL_ESTATE, "Real Estate"),
+    ("GSEC2033", "GOI 7.26% 2033", AssetType.BOND, "Government"),
+    ("LIQUIDBEES", "Nippon Liquid ETF", AssetType.CASH, "Diversified"),
+    ("GOLDBEES", "Nippon Gold ETF", AssetType.COMMODITY, "Diversified"),
+    ("PPFAS", "Parag Parikh Flexi Cap", AssetType.MUTUAL_FUND, "Diversified"),
+    ("BTC", "Bitcoin", AssetType.CRYPTO, "Diversified"),
+]
+CATEGORIES = ["market", "policy", "sector", "global", "commodity"]
+EXPENSE_CATEGORIES = ["housing", "food", "transport", "utilities", "insurance", "education", "health"]
+
+
+@dataclass
+class DatasetSpec:
+    """Row counts for a synthetic dataset."""
+    users: int = 200
+    portfolios_per_user: int = 2
+    holdings_per_portfolio: int = 15
+    transactions_per_portfolio: int = 100
+    expenses_per_user: int = 24
+    articles: int = 5000
+    subscriptions_per_user: int = 1
+    simulations_per_user: int = 3
+    seed: int = 42
+
+    @classmethod
+    def scaled(cls, scale: float = 1.0, seed: int = 42, **overrides) -> "DatasetSpec":
+        """Default spec with user and article counts multiplied by `scale`."""
+        spec = cls(seed=seed)
+        spec.users = max(1, int(spec.users * scale))
+        spec.articles = max(1, int(spec.articles * scale))
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(spec, name, value)
+        return spec
+
+    @property
+    def portfolios(self) -> int:
+        return self.users * self.portfolios_per_user
+
+
+def _chunks(rows: Iterable[dict], size: int = CHUNK_SIZE) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_rows(spec: DatasetSpec, now: datetime) -> Dict[type, Iterator[dict]]:
+    """
+    Row generators per model, in insert order.
+
+    Ids are implied by insert order (the database must be empty), so child
+    rows can reference parents without reading them back.
+    """
+    rng = random.Random(spec.seed)
+    password = get_password_hash("password123")
+
+    def ago(days: float) -> datetime:
+        return now - timedelta(days=days)
+
+    def users():
+        for i in range(spec.users):
+            yield {
+                "email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": password,
+                "full_name": f"User {i}", "is_admin": i == 0,
+                "risk_tolerance": rng.choice(["conservative", "moderate", "aggressive"]),
+            }
+
+    def portfolios():
+        for i in range(spec.portfolios):
+            yield {
+                "user_id": i // spec.portfolios_per_user + 1, "name": f"Portfolio {i}",
+                "cash_balance": round(rng.uniform(0, 50_000), 2),
+            }
+
+    def holdings():
+        for portfolio_id in range(1, spec.portfolios + 1):
+            for symbol, name, asset_type, sector in rng.sample(INSTRUMENTS, min(spec.holdings_per_portfolio, len(INSTRUMENTS))):
+                quantity = rng.randint(1, 500)
+                average_price = round(rng.uniform(50, 3000), 2)
+                current_price = round(average_price * rng.uniform(0.6, 1.6), 2)
+                yield {
+                    "portfolio_id": portfolio_id, "symbol": symbol, "name": name, "asset_type": asset_type,
+                    "sector": sector, "quantity": quantity, "average_price": average_price,
+                    "current_price": current_price, "current_value": round(quantity * current_price, 2),
+                }
+
+    def transactions():
+        for portfolio_id in range(1, spec.portfolios + 1):
+            for _ in range(spec.transactions_per_portfolio):
+                symbol = rng.choice(INSTRUMENTS)[0]
+                quantity = rng.randint(1, 100)
+                price = round(rng.uniform(50, 3000), 2)
+                yield {
+                    "portfolio_id": portfolio_id,
+                    "transaction_type": rng.choice([TransactionType.BUY, TransactionType.SELL, TransactionType.DIVIDEND]),
+                    "symbol": symbol, "quantity": quantity, "price": price, "amount": round(quantity * price, 2),
+                    "transaction_date": ago(rng.uniform(0, 1500)),
+                }
+
+    def expenses():
+        for user in range(spec.users):
+            portfolio_id = user * spec.portfolios_per_user + 1
+            for month in range(spec.expenses_per_user):
+                yield {
+                    "portfolio_id": portfolio_id, "category": rng.choice(EXPENSE_CATEGORIES),
+                    "amount": round(rng.uniform(500, 60_000), 2), "expense_date": ago(30 * month),
+                    "is_recurring": rng.random() < 0.5, "frequency": "monthly",
+                }
+
+    def income():
+        for user_id in range(1, spec.users + 1):
+            yield {
+                "user_id": user_id, "source": "Salary", "amount": round(rng.uniform(40_000, 400_000), 2),
+                "income_date": ago(1), "is_recurring": True, "frequency": "monthly",
+            }
+
+    def articles():
+        for i in range(spec.articles):
+            mentioned = rng.sample(INSTRUMENTS, rng.randint(0, 3))
+            yield {
+                "title": f"Headline {i}", "source": rng.choice(["Reuters", "Bloomberg", "Mint", "ET"]),
+                "url": f"https://news.example.com/{i}", "category": rng.choice(CATEGORIES),
+                "sectors_affected": sorted({sector for _, _, _, sector in mentioned} | set(rng.sample(SECTORS, rng.randint(0, 2)))),
+                "assets_mentioned": [symbol for symbol, _, _, _ in mentioned],
+                "keywords": rng.sample(["rate hike", "inflation", "earnings", "default", "regulation", "war"], 2),
+                "sentiment": rng.choice(["positive", "negative", "neutral"]),
+                "impact_score": round(rng.uniform(0, 100), 1),
+                "published_at": ago(rng.uniform(0, 120)), "created_at": ago(rng.uniform(0, 120)),
+                "is_processed": rng.random() < 0.95,
+            }
+
+    def subscriptions():
+        for user_id in range(1, spec.users + 1):
+            for _ in range(spec.subscriptions_per_user):
+                yield {
+                    "user_id": user_id, "sectors": rng.sample(SECTORS, 3), "categories": rng.sample(CATEGORIES, 1),
+                    "keywords": [rng.choice(INSTRUMENTS)[0]], "min_impact_score": rng.choice([0, 25, 50, 75]),
+                }
+
+    def simulations():
+        for user in range(spec.users):
+            for i in range(spec.simulations_per_user):
+                yield {
+                    "user_id": user + 1, "portfolio_id": user * spec.portfolios_per_user + 1,
+                    "name": f"Simulation {i}", "scenario_type": "market_crash",
+                    "scenario_config": {"market_drop_percent": rng.choice([20, 30, 40])},
+                    "created_at": ago(rng.uniform(0, 365)),
+                }
+
+    return {
+        User: users(),
+        Portfolio: portfolios(),
+        Holding: holdings(),
+        Transaction: transactions(),
+        Expense: expenses(),
+        Income: income(),
+        NewsArticle: articles(),
+        NewsSubscription: subscriptions(),
+        DisasterSimulation: simulations(),
+    }
+
+
+async def build_dataset(spec: DatasetSpec, session_factory=AsyncSessionLocal) -> Dict[str, int]:
+    """Fill an empty database with the dataset; returns rows inserted per table."""
+    async with session_factory() as db:
+        existing = await db.scalar(select(func.count()).select_from(User))
+        if existing:
+            raise RuntimeError("Synthetic datasets need an empty database (users table has rows)")
+
+        counts: Dict[str, int] = {}
+        for model, rows in generate_rows(spec, datetime.utcnow()).items():
+            counts[model.__tablename__] = 0
+            for chunk in _chunks(rows):
+                await db.execute(insert(model), chunk)
+                counts[model.__tablename__] += len(chunk)
+        await db.commit()
+    return counts
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fill the configured database with synthetic data")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for users and articles")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--holdings-per-portfolio", type=int)
+    parser.add_argument("--transactions-per-portfolio", type=int)
+    args = parser.parse_args()
+
+    spec = DatasetSpec.scaled(
+        args.scale, args.seed,
+        holdings_per_portfolio=args.holdings_per_portfolio,
+        transactions_per_portfolio=args.transactions_per_portfolio,
+    )
+    print(f"📦 Building synthetic dataset: {asdict(spec)}")
+    await init_db()
+    started = time.perf_counter()
+    counts = await build_dataset(spec)
+    print("   " + ", ".join(f"{table}={count:,}" for table, count in counts.items()))
+    print(f"✅ Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
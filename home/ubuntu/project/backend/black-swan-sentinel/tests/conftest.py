@@ -0,0 +1,36 @@
+"""
+Shared fixtures. The app reads its settings at import time, so the test
+database is configured here before anything under `app` is imported.
+"""
+
+import asyncio
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="black-swan-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["DEBUG"] = "false"
+
+import pytest
+import pytest_asyncio
+
+import app.main  # noqa: F401,E402  registers every model with the mappers
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One loop for the whole run, so pooled connections stay on the loop that opened them."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture
+async def db():
+    """A session on a freshly created schema."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        yield session
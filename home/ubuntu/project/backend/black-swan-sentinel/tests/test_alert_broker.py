@@ -0,0 +1,87 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.deps import get_current_user, get_streaming_user
+from app.core.security import create_access_token, create_stream_ticket
+from app.models.user import User
+from app.services.alert_broker import NEWS_ALERT, RESYNC, AlertBroker
+
+
+async def _take(stream, count):
+    return [await stream.__anext__() for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_ids_keep_increasing_across_broker_instances():
+    first = AlertBroker().publish(1, NEWS_ALERT, {})
+    second = AlertBroker().publish(1, NEWS_ALERT, {})
+    assert second.id > first.id
+
+
+@pytest.mark.asyncio
+async def test_id_from_the_future_gets_a_resync():
+    broker = AlertBroker()
+    stream = broker.listen(1, broker.started_after + 10**9, keepalive=0.01)
+    resync = await stream.__anext__()
+    assert resync.kind == RESYNC
+
+    event = broker.publish(1, NEWS_ALERT, {"n": 1})
+    assert (await _take(stream, 1))[0] == event
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_id_from_before_start_gets_a_resync_then_the_buffer():
+    broker = AlertBroker()
+    event = broker.publish(1, NEWS_ALERT, {"n": 1})
+    stream = broker.listen(1, broker.started_after - 1, keepalive=0.01)
+    resync, replayed = await _take(stream, 2)
+    assert resync.kind == RESYNC
+    assert replayed == event
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_known_id_resumes_without_resync():
+    broker = AlertBroker()
+    first = broker.publish(1, NEWS_ALERT, {"n": 1})
+    second = broker.publish(1, NEWS_ALERT, {"n": 2})
+    stream = broker.listen(1, first.id, keepalive=0.01)
+    assert (await _take(stream, 1))[0] == second
+    await stream.aclose()
+
+
+async def _user(db):
+    user = User(email="stream@example.com", username="stream", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+def _claims(user):
+    return {"sub": user.username, "user_id": user.id}
+
+
+@pytest.mark.asyncio
+async def test_stream_ticket_opens_the_stream(db):
+    user = await _user(db)
+    streaming_user = await get_streaming_user(credentials=None, ticket=create_stream_ticket(_claims(user)))
+    assert streaming_user.id == user.id
+
+
+@pytest.mark.asyncio
+async def test_access_token_in_the_url_is_rejected(db):
+    user = await _user(db)
+    with pytest.raises(HTTPException) as error:
+        await get_streaming_user(credentials=None, ticket=create_access_token(_claims(user)))
+    assert error.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_stream_ticket_is_not_an_access_token(db):
+    user = await _user(db)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_stream_ticket(_claims(user)))
+    with pytest.raises(HTTPException) as error:
+        await get_current_user(credentials, db)
+    assert error.value.status_code == 401
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.news import NewsAlert, NewsArticle
+from app.models.user import User
+from app.services.alert_delivery import AlertDeliveryEngine, AlertMessage, AlertTransport
+from app.services.holding_index import HoldingEntry, holding_index
+from app.services.subscription_matcher import SubscriptionEntry, subscription_matcher
+
+
+class FlakyTransport(AlertTransport):
+    """Records deliveries and fails for the users in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    async def send(self, recipient, subject, alerts):
+        if recipient.user_id in self.failing:
+            raise ConnectionError("transport down")
+        self.sent.append((recipient.user_id, [alert.alert_id for alert in alerts]))
+
+
+async def _alert(db):
+    users = [User(email=f"d{i}@example.com", username=f"d{i}", hashed_password="x") for i in range(2)]
+    article = NewsArticle(title="Rate shock", source="wire")
+    db.add_all([*users, article])
+    await db.flush()
+    alert = NewsAlert(article_id=article.id, alert_type="market_crash", severity="high",
+                      title="Rate shock", message="Rates up")
+    db.add(alert)
+    await db.commit()
+    message = AlertMessage(alert.id, article.id, alert.alert_type, alert.severity, alert.title, alert.message)
+    return [user.id for user in users], message
+
+
+async def _is_sent(db, alert_id):
+    db.expire_all()
+    return (await db.execute(select(NewsAlert.is_sent).where(NewsAlert.id == alert_id))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_alert_stays_unsent_until_every_frequency_delivers(db):
+    (immediate_user, daily_user), message = await _alert(db)
+    engine = AlertDeliveryEngine(transport=FlakyTransport())
+    engine.enqueue(immediate_user, message, "immediate")
+    engine.enqueue(daily_user, message, "daily")
+
+    assert await engine.flush("immediate") == 1
+    assert not await _is_sent(db, message.alert_id)
+
+    assert await engine.flush("daily") == 1
+    assert await _is_sent(db, message.alert_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_requeued_and_not_marked(db):
+    (first, second), message = await _alert(db)
+    transport = FlakyTransport(failing={second})
+    engine = AlertDeliveryEngine(transport=transport)
+    engine.enqueue(first, message)
+    engine.enqueue(second, message)
+
+    assert await engine.flush("immediate") == 1
+    assert engine.pending("immediate") == 1
+    assert not await _is_sent(db, message.alert_id)
+
+    transport.failing.clear()
+    assert await engine.flush("immediate") == 1
+    assert transport.sent == [(first, [message.alert_id]), (second, [message.alert_id])]
+    assert await _is_sent(db, message.alert_id)
+
+
+
+def test_holders_keep_their_own_preferences():
+    matcher, index = subscription_matcher, holding_index
+    matcher.clear()
+    index.clear()
+    # 1 never subscribed, 2 follows another sector weekly without push, 3 paused its only subscription
+    matcher.add(SubscriptionEntry(10, 2, frozenset(), frozenset({"energy"}), frozenset(), 0.0, "weekly", True, False))
+    matcher.deactivate(11, 3)
+    for user_id in (1, 2, 3):
+        index.add(HoldingEntry(user_id, user_id, user_id, "ACME", "tech", 100.0))
+    engine = AlertDeliveryEngine(transport=FlakyTransport())
+    message = AlertMessage(1, 1, "market_crash", "high", "ACME falls", "Down 30%")
+
+    try:
+        recipients = engine.dispatch(message, assets=["ACME"])
+    finally:
+        matcher.clear()
+        index.clear()
+
+    assert recipients == {1, 2}
+    assert engine.pending("immediate") == 1 and 1 in engine._buffers["immediate"]
+    assert engine.pending("weekly") == 1 and 2 in engine._buffers["weekly"]
+
+
+@pytest.mark.asyncio
+async def test_unsent_alerts_are_restored_after_a_restart(db):
+    (user_id, _), message = await _alert(db)
+    subscription_matcher.clear()
+    subscription_matcher.add(SubscriptionEntry(1, user_id, frozenset(), frozenset(), frozenset(), 0.0, "daily", True, False))
+    engine = AlertDeliveryEngine(transport=FlakyTransport())
+
+    try:
+        assert await engine.restore(db) == 1
+        assert engine.pending("daily") == 1
+        assert await engine.flush("daily") == 1
+        assert await _is_sent(db, message.alert_id)
+        assert await engine.restore(db) == 0
+    finally:
+        subscription_matcher.clear()
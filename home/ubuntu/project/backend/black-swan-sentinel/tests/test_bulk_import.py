@@ -0,0 +1,51 @@
+import io
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.portfolio import Expense, Portfolio
+from app.models.user import User
+from app.services.bulk_import import CSV, ImportFileError, import_file
+from app.services.feature_store import feature_store
+
+
+async def _portfolio(db):
+    user = User(email="import@example.com", username="import", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    portfolio = Portfolio(user_id=user.id, name="Main")
+    db.add(portfolio)
+    await db.commit()
+    return portfolio
+
+
+def _csv(rows: int, bad_row: int = None) -> io.BytesIO:
+    lines = [b"category,amount,expense_date,description"]
+    for i in range(rows):
+        description = b"caf\xe9" if i == bad_row else f"item {i}".encode()
+        lines.append(b"food,%d,2024-01-01,%s" % (i + 1, description))
+    return io.BytesIO(b"\n".join(lines) + b"\n")
+
+
+@pytest.mark.asyncio
+async def test_unreadable_tail_reports_committed_rows(db):
+    portfolio = await _portfolio(db)
+    feature_store.clear()
+
+    report = await import_file("expenses", _csv(50_000, bad_row=45_000), CSV, portfolio.id, portfolio.user_id, chunk_size=1000)
+
+    stored = (await db.execute(select(func.count(Expense.id)))).scalar_one()
+    assert report.error is not None
+    assert 0 < report.rows_imported < 50_000
+    assert report.rows_imported == stored
+    assert portfolio.user_id in feature_store.dirty
+
+
+@pytest.mark.asyncio
+async def test_unreadable_file_is_rejected_before_importing(db):
+    portfolio = await _portfolio(db)
+
+    with pytest.raises(ImportFileError):
+        await import_file("expenses", io.BytesIO(b"category,amount,expense_date\n\xff\xfe,1,2024-01-01\n"), CSV, portfolio.id, portfolio.user_id)
+
+    assert (await db.execute(select(func.count(Expense.id)))).scalar_one() == 0
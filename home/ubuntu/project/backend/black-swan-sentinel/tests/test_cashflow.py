@@ -0,0 +1,62 @@
+from datetime import date, datetime
+
+import pytest
+import pytest_asyncio
+
+from app.models.portfolio import Expense, Income, Portfolio
+from app.models.user import User
+from app.services.cashflow import load_projection
+
+AS_OF = date(2025, 1, 15)
+
+
+@pytest_asyncio.fixture
+async def portfolio(db):
+    user = User(email="cash@example.com", username="cash", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    portfolio = Portfolio(user_id=user.id, name="Main", cash_balance=10000.0)
+    db.add(portfolio)
+    await db.commit()
+    return portfolio
+
+
+def _expense(portfolio, amount, when, description=None, category="utilities", frequency="monthly"):
+    return Expense(
+        portfolio_id=portfolio.id, category=category, amount=amount, description=description,
+        is_recurring=True, frequency=frequency, expense_date=when,
+    )
+
+
+@pytest.mark.asyncio
+async def test_distinct_items_in_one_category_add_up(db, portfolio):
+    db.add_all([
+        _expense(portfolio, 3000.0, datetime(2024, 12, 1), "electricity"),
+        _expense(portfolio, 1000.0, datetime(2024, 12, 1), "water"),
+        # Same category and no description: still two bills in the same month
+        _expense(portfolio, 500.0, datetime(2024, 12, 5)),
+        _expense(portfolio, 250.0, datetime(2024, 12, 5)),
+    ])
+    await db.commit()
+
+    projection = await load_projection(db, [portfolio.user_id], horizon_months=12, as_of=AS_OF)
+
+    assert projection.monthly_expenses[0] == pytest.approx(4750.0)
+
+
+@pytest.mark.asyncio
+async def test_recorded_occurrences_count_once(db, portfolio):
+    db.add_all(_expense(portfolio, 20000.0, datetime(2024, month, 1), "rent", "housing") for month in range(1, 13))
+    db.add_all(_expense(portfolio, 12000.0, datetime(year, 3, 1), "insurance", "insurance", "yearly") for year in (2023, 2024))
+    db.add_all(
+        Income(user_id=portfolio.user_id, source="salary", amount=50000.0, frequency="monthly", income_date=datetime(2024, month, 28))
+        for month in range(7, 13)
+    )
+    await db.commit()
+
+    projection = await load_projection(db, [portfolio.user_id], horizon_months=12, as_of=AS_OF)
+
+    assert projection.monthly_expenses[0] == pytest.approx(20000.0 + 12000.0 / 12)
+    assert projection.monthly_income[0] == pytest.approx(50000.0)
+    # The yearly premium falls in March, the third projected month from January
+    assert projection.expenses[0, 2] == pytest.approx(32000.0)
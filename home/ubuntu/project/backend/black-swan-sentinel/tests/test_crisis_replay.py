@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.models.portfolio import AssetType
+from app.services.crisis_replay import (
+    CrisisDataError,
+    CrisisSeries,
+    HoldingPosition,
+    block_bootstrap_indices,
+    map_positions,
+    replay,
+)
+
+
+def _crisis(keys, days=5, daily_return=0.0):
+    return CrisisSeries(
+        name="test_crash",
+        description="",
+        source="synthetic",
+        dates=np.arange(days).astype("datetime64[D]"),
+        keys=tuple(keys),
+        returns=np.full((days, len(keys)), daily_return, dtype=np.float32),
+    )
+
+
+def _buckets_by_symbol(crisis, positions):
+    """Series key each position was bucketed under (None for flat cash)."""
+    buckets = map_positions(crisis, positions)
+    keyed = {}
+    for column, asset_type, sector in zip(buckets.columns, buckets.asset_types, buckets.sectors):
+        for position in positions:
+            if (position.asset_type, position.sector) == (asset_type, sector):
+                keyed[position.symbol] = crisis.keys[column] if column >= 0 else None
+    return keyed
+
+
+def test_block_bootstrap_paths_are_contiguous_blocks():
+    indices = block_bootstrap_indices(days=30, horizon=23, iterations=50, block_days=5, rng=np.random.default_rng(7))
+
+    assert indices.shape == (50, 23)
+    assert indices.min() >= 0 and indices.max() < 30
+    # Within each 5-day block the days are consecutive
+    blocks = indices[:, :20].reshape(50, 4, 5)
+    assert (np.diff(blocks, axis=2) == 1).all()
+
+
+def test_block_bootstrap_clamps_blocks_longer_than_the_crisis():
+    indices = block_bootstrap_indices(days=3, horizon=7, iterations=4, block_days=10, rng=np.random.default_rng(0))
+
+    assert indices.shape == (4, 7)
+    assert (indices[:, :3] == np.arange(3)).all()
+
+
+def test_positions_follow_sector_then_asset_type_then_market():
+    crisis = _crisis(["market", "asset_type:bond", "sector:banking"])
+    positions = [
+        HoldingPosition("BANK", AssetType.EQUITY, "Banking", 100.0),
+        HoldingPosition("GILT", AssetType.BOND, "government", 100.0),
+        HoldingPosition("TECH", AssetType.EQUITY, "technology", 100.0),
+        HoldingPosition("CASH", AssetType.CASH, None, 100.0),
+    ]
+
+    assert _buckets_by_symbol(crisis, positions) == {
+        "BANK": "sector:banking",
+        "GILT": "asset_type:bond",
+        "TECH": "market",
+        "CASH": None,
+    }
+
+
+def test_unmatched_positions_without_a_market_series_fail():
+    crisis = _crisis(["sector:banking"])
+
+    with pytest.raises(CrisisDataError, match="TECH"):
+        map_positions(crisis, [HoldingPosition("TECH", AssetType.EQUITY, "technology", 100.0)])
+
+
+def test_historical_replay_compounds_daily_returns():
+    crisis = _crisis(["market"], days=4, daily_return=np.log(0.9))
+    buckets = map_positions(crisis, [
+        HoldingPosition("IDX", AssetType.EQUITY, None, 1000.0),
+        HoldingPosition("CASH", AssetType.CASH, None, 500.0),
+    ])
+
+    result = replay(crisis, buckets)
+
+    assert result.final_values == pytest.approx([1000.0 * 0.9 ** 4 + 500.0], rel=1e-5)
+    assert result.max_drawdown[0] == pytest.approx(1.0 - result.final_values[0] / 1500.0, rel=1e-5)
+    assert result.recovery_day[0] == -1
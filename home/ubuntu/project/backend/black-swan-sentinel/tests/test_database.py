@@ -0,0 +1,33 @@
+from app.core.config import settings
+from app.core.database import engine_options
+
+
+def test_sqlite_keeps_the_default_pool():
+    options = engine_options("sqlite+aiosqlite:///./test.db")
+
+    assert options == {"echo": settings.debug, "future": True}
+
+
+def test_server_databases_use_the_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 7)
+    monkeypatch.setattr(settings, "db_max_overflow", 3)
+    monkeypatch.setattr(settings, "db_pool_pre_ping", False)
+
+    options = engine_options("mysql+aiomysql://user:secret@db/app")
+
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_timeout"] == settings.db_pool_timeout_seconds
+    assert options["pool_recycle"] == settings.db_pool_recycle_seconds
+    assert options["pool_pre_ping"] is False
+    assert "connect_args" not in options
+
+
+def test_asyncpg_sizes_both_statement_caches(monkeypatch):
+    # 0 behind pgbouncer in transaction mode, which cannot keep prepared statements
+    monkeypatch.setattr(settings, "db_statement_cache_size", 0)
+
+    options = engine_options("postgresql+asyncpg://user:secret@db/app")
+
+    assert options["pool_size"] == settings.db_pool_size
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.portfolio import Portfolio, Transaction, TransactionType
+from app.models.user import User
+from app.services.export import create_encoder, export_response, stream_export
+
+ROWS = 5
+
+COLUMNS = list(Transaction.__table__.columns)
+
+
+async def _transactions(db):
+    user = User(email="x@example.com", username="exporter", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    portfolio = Portfolio(user_id=user.id, name="Main")
+    db.add(portfolio)
+    await db.flush()
+    await db.execute(insert(Transaction), [
+        {"portfolio_id": portfolio.id, "transaction_type": TransactionType.BUY, "symbol": f"S{i}",
+         "quantity": 1.0, "price": 10.0 * i, "amount": 10.0 * i, "transaction_date": datetime(2024, 1, i + 1)}
+        for i in range(ROWS)
+    ])
+    await db.commit()
+
+
+async def _chunks(export_format, chunk_size=2):
+    query = select(*COLUMNS).order_by(Transaction.id)
+    encoder = create_encoder(export_format, COLUMNS)
+    return [chunk async for chunk in stream_export(query, encoder, chunk_size, session_factory=AsyncSessionLocal)]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_a_header_and_every_row(db):
+    await _transactions(db)
+
+    chunks = await _chunks("csv")
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == [column.name for column in COLUMNS]
+    assert [row[rows[0].index("symbol")] for row in rows[1:]] == [f"S{i}" for i in range(ROWS)]
+    assert rows[1][rows[0].index("transaction_type")] == "buy"
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_is_streamed_in_chunks(db):
+    await _transactions(db)
+
+    chunks = await _chunks("ndjson")
+
+    # Empty header, ceil(5 / 2) row chunks, empty trailer
+    assert [chunk.count(b"\n") for chunk in chunks] == [0, 2, 2, 1, 0]
+    records = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [record["symbol"] for record in records] == [f"S{i}" for i in range(ROWS)]
+    assert records[2]["transaction_date"].startswith("2024-01-03")
+
+
+def test_export_response_headers():
+    response = export_response(Transaction, "ndjson", "portfolio-1-transactions")
+
+    assert response.media_type == "application/x-ndjson"
+    disposition = response.headers["content-disposition"]
+    assert disposition.startswith('attachment; filename="portfolio-1-transactions-') and disposition.endswith('.ndjson"')
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.api.v1.endpoints.users import delete_user
+from app.models.features import UserFeatures
+from app.models.portfolio import AssetType, Expense, Holding, Income, Portfolio
+from app.models.user import User
+from app.services.feature_store import feature_store
+from app.services.playbook_engine import load_user_parameters
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    feature_store.clear()
+    yield
+    feature_store.clear()
+
+
+async def _user_with_portfolio(db):
+    user = User(email="fs@example.com", username="fs", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    portfolio = Portfolio(user_id=user.id, name="Main", cash_balance=5000.0)
+    db.add(portfolio)
+    await db.flush()
+    db.add_all(
+        Expense(portfolio_id=portfolio.id, category="housing", amount=20000.0, description="rent",
+                is_recurring=True, frequency="monthly", expense_date=datetime(2024, month, 1))
+        for month in (10, 11, 12)
+    )
+    db.add(Income(user_id=user.id, source="salary", amount=60000.0, frequency="monthly", income_date=datetime(2024, 12, 28)))
+    await db.commit()
+    return user, portfolio
+
+
+@pytest.mark.asyncio
+async def test_whole_user_and_portfolio_parameters_agree(db):
+    user, portfolio = await _user_with_portfolio(db)
+
+    whole = await load_user_parameters(db, user)
+    single = await load_user_parameters(db, user, portfolio.id)
+
+    assert whole["monthly_expenses"] == single["monthly_expenses"] == "₹20,000"
+    assert whole["monthly_income"] == single["monthly_income"] == "₹60,000"
+
+
+@pytest.mark.asyncio
+async def test_holdings_are_valued_at_their_current_price(db):
+    user, portfolio = await _user_with_portfolio(db)
+    db.add_all([
+        # No stored value: quantity times the current price, not the average cost
+        Holding(portfolio_id=portfolio.id, symbol="ACME", name="Acme", asset_type=AssetType.EQUITY,
+                quantity=10.0, average_price=100.0, current_price=300.0),
+        Holding(portfolio_id=portfolio.id, symbol="BETA", name="Beta", asset_type=AssetType.EQUITY,
+                quantity=10.0, average_price=100.0, current_price=500.0, current_value=1000.0),
+    ])
+    await db.commit()
+
+    whole = await load_user_parameters(db, user)
+    single = await load_user_parameters(db, user, portfolio.id)
+
+    assert whole["top_holding"] == single["top_holding"] == "ACME"
+    assert whole["top_holding_weight"] == single["top_holding_weight"] == "75%"
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_leaves_no_features(db):
+    user, _ = await _user_with_portfolio(db)
+    user_id = user.id
+    assert await feature_store.refresh([user_id]) == 1
+
+    await delete_user(user_id, current_user=user, db=db)
+    # Cascaded portfolio deletes mark the user dirty; the refresh must not bring the row back
+    feature_store.mark_dirty([user_id])
+    await feature_store.refresh_dirty()
+
+    assert (await db.execute(select(UserFeatures).where(UserFeatures.user_id == user_id))).first() is None
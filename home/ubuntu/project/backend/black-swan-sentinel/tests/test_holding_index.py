@@ -0,0 +1,129 @@
+import pytest
+from sqlalchemy import delete, event
+
+from app.core import commit_hooks
+from app.models.portfolio import AssetType, Holding, Portfolio
+from app.models.user import User
+from app.services import holding_index as holding_index_module
+from app.services.holding_index import HoldingEntry, HoldingIndex, holding_index
+
+
+@pytest.fixture(autouse=True)
+def clean_index():
+    holding_index.clear()
+    yield
+    holding_index.clear()
+
+
+def _holding(portfolio_id, symbol="ACME", value=100.0):
+    return Holding(portfolio_id=portfolio_id, symbol=symbol, name=symbol, asset_type=AssetType.EQUITY,
+                   sector="tech", quantity=1.0, average_price=value)
+
+
+async def _portfolio(db):
+    user = User(email="h@example.com", username="holder", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    portfolio = Portfolio(user_id=user.id, name="Main")
+    db.add(portfolio)
+    await db.commit()
+    return user.id, portfolio
+
+
+def _portfolio_selects(db, monkeypatch):
+    """Capture SELECTs on portfolios issued while only the index's own commit hooks run."""
+    own = (holding_index_module._apply_holdings, holding_index_module._apply_portfolios)
+    monkeypatch.setattr(commit_hooks, "_hooks", [hook for hook in commit_hooks._hooks if hook.apply in own])
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "portfolios" in statement:
+            statements.append(statement)
+
+    event.listen(db.bind.sync_engine, "before_cursor_execute", capture)
+    return statements, lambda: event.remove(db.bind.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.asyncio
+async def test_new_holding_takes_its_owner_from_the_loaded_portfolio(db, monkeypatch):
+    user_id, portfolio = await _portfolio(db)
+    # Another worker's view: the index has never seen this portfolio
+    holding_index.clear()
+    statements, stop = _portfolio_selects(db, monkeypatch)
+    try:
+        db.add(_holding(portfolio.id))
+        await db.commit()
+    finally:
+        stop()
+
+    assert statements == []
+    assert [exposure.user_id for exposure in holding_index.user_exposures(["ACME"])] == [user_id]
+
+
+@pytest.mark.asyncio
+async def test_holding_of_an_unknown_portfolio_is_left_to_the_rebuild(db, monkeypatch):
+    user_id, portfolio = await _portfolio(db)
+    portfolio_id = portfolio.id
+    holding_index.clear()
+    db.expunge_all()
+    statements, stop = _portfolio_selects(db, monkeypatch)
+    try:
+        db.add(_holding(portfolio_id))
+        await db.commit()
+    finally:
+        stop()
+
+    assert statements == []
+    assert holding_index.user_exposures(["ACME"]) == []
+
+    await holding_index.rebuild(db)
+    assert [exposure.user_id for exposure in holding_index.user_exposures(["ACME"])] == [user_id]
+
+
+def test_remove_portfolio_drops_only_its_holdings():
+    index = HoldingIndex()
+    index.add(HoldingEntry(1, 10, 1, "ACME", "tech", 100.0))
+    index.add(HoldingEntry(2, 10, 1, "BETA", "energy", 50.0))
+    index.add(HoldingEntry(3, 20, 1, "ACME", "tech", 25.0))
+
+    index.remove_portfolio(10)
+
+    assert len(index) == 1
+    assert index.owner_of(10) is None
+    assert [(e.portfolio_id, e.value, e.weight) for e in index.portfolio_exposures(["ACME"])] == [(20, 25.0, 1.0)]
+    assert [(e.value, e.weight) for e in index.user_exposures(["ACME", "BETA"])] == [(25.0, 1.0)]
+
+
+def test_exposures_are_weighted_by_portfolio_and_user_totals():
+    index = HoldingIndex()
+    index.add(HoldingEntry(1, 10, 1, "acme", "Tech", 300.0))
+    index.add(HoldingEntry(2, 10, 1, "BETA", "energy", 100.0))
+    index.add(HoldingEntry(3, 11, 1, "GAMMA", "tech", 600.0))
+    index.add(HoldingEntry(4, 20, 2, "ACME", None, 50.0))
+
+    by_portfolio = {(e.user_id, e.portfolio_id): (e.value, e.weight) for e in index.portfolio_exposures(["ACME"])}
+    assert by_portfolio == {(1, 10): (300.0, 0.75), (2, 20): (50.0, 1.0)}
+
+    # Symbol and sector matches of the same holding count once
+    by_user = {e.user_id: (e.value, e.weight) for e in index.user_exposures([" acme "], ["TECH"])}
+    assert by_user == {1: (900.0, 0.9), 2: (50.0, 1.0)}
+
+    index.add(HoldingEntry(1, 10, 1, "ACME", "tech", 100.0))
+    assert [(e.value, e.weight) for e in index.user_exposures(["ACME"]) if e.user_id == 1] == [(100.0, 0.125)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_bulk_deletes(db):
+    user_id, portfolio = await _portfolio(db)
+    db.add_all([_holding(portfolio.id), _holding(portfolio.id, "BETA")])
+    await db.commit()
+    assert len(holding_index) == 2
+
+    # Core deletes bypass the commit hooks, like the bulk deletes of other workers
+    await db.execute(delete(Holding).where(Holding.symbol == "ACME"))
+    await db.commit()
+    assert len(holding_index) == 2
+
+    await holding_index.refresh()
+    assert holding_index.user_exposures(["ACME"]) == []
+    assert [exposure.user_id for exposure in holding_index.user_exposures(["BETA"])] == [user_id]
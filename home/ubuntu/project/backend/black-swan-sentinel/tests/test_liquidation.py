@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.models.portfolio import AssetType
+from app.services.crisis_replay import CrisisSeries, HoldingPosition, map_positions, replay
+from app.services.liquidation import LIQUIDATION_TIERS, damage_report_fields, liquidate_replay, solve, tier_values
+
+TIER = {asset_type: tier for tier, (asset_type, _) in enumerate(LIQUIDATION_TIERS)}
+
+
+def _values(**by_type):
+    row = np.zeros(len(LIQUIDATION_TIERS))
+    for name, value in by_type.items():
+        row[TIER[AssetType(name)]] = value
+    return row[None, :]
+
+
+def test_tiers_are_sold_in_liquidity_order_with_haircuts():
+    values = np.repeat(_values(cash=100.0, mutual_fund=200.0, equity=1000.0), 3, axis=0)
+
+    result = solve(values, cash_need=[50.0, 298.0, 2000.0])
+
+    cash, fund, equity = TIER[AssetType.CASH], TIER[AssetType.MUTUAL_FUND], TIER[AssetType.EQUITY]
+    # Cash alone covers a small need
+    assert result.sold[0, cash] == pytest.approx(50.0)
+    assert result.forced_liquidation_amount[0] == 0.0
+    # 198 more from funds after a 1% haircut means selling 200 of market value
+    assert result.sold[1, fund] == pytest.approx(200.0)
+    assert result.sold[1, equity] == 0.0
+    assert result.liquidity_shortfall[1] == pytest.approx(0.0)
+    # Selling everything raises 100 + 198 + 970 and leaves the rest short
+    assert result.proceeds[2] == pytest.approx(1268.0)
+    assert result.liquidity_shortfall[2] == pytest.approx(732.0)
+    assert result.liquid_assets_remaining[2] == pytest.approx(0.0)
+
+
+def test_real_estate_is_never_sold():
+    values = tier_values(np.array([[500.0, 100.0]]), [AssetType.REAL_ESTATE, AssetType.EQUITY])
+
+    result = solve(values, cash_need=1000.0)
+
+    assert result.sold.sum() == pytest.approx(100.0)
+    assert result.liquid_assets_remaining[0] == pytest.approx(0.0)
+
+
+def test_overdraft_is_added_to_the_need_instead_of_a_negative_sale():
+    result = solve(_values(cash=100.0, equity=1000.0), cash_need=50.0, cash_balance=-300.0)
+
+    assert (result.sold >= 0).all()
+    assert result.sold[0, TIER[AssetType.CASH]] == 0.0
+    # 200 of overdraft left after cash holdings, plus the 50 needed
+    assert result.cash_need[0] == pytest.approx(250.0)
+    assert result.proceeds[0] == pytest.approx(250.0)
+    assert result.forced_liquidation_amount[0] == pytest.approx(250.0 / 0.97)
+
+
+def test_damage_report_fields_from_a_replay():
+    crisis = CrisisSeries("flat", "", "synthetic", np.arange(3).astype("datetime64[D]"), ("market",),
+                          np.zeros((3, 1), dtype=np.float32))
+    buckets = map_positions(crisis, [
+        HoldingPosition("CASH", AssetType.CASH, None, 100.0),
+        HoldingPosition("IDX", AssetType.EQUITY, None, 900.0),
+    ])
+    result = replay(crisis, buckets)
+
+    fields = damage_report_fields(result, liquidate_replay(result, cash_need=200.0))
+
+    assert fields["total_portfolio_loss"] == pytest.approx(0.0)
+    assert fields["liquidity_shortfall"] == pytest.approx(0.0)
+    assert fields["forced_liquidation_amount"] == pytest.approx(100.0 / 0.97)
+    assert fields["liquid_assets_remaining"] == pytest.approx(1000.0 - 100.0 - 100.0 / 0.97)
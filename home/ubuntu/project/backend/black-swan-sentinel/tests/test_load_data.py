@@ -0,0 +1,61 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+
+from app.models.portfolio import Holding, Portfolio
+from scripts.generate_load_data import Generator, LoadSpec, generate
+
+SPEC = LoadSpec(users=6, years=1, instruments=80, max_holdings=8, articles_per_day=2, seed=5, end_date="2025-01-01")
+
+
+def _equal(left, right):
+    # Dividends carry NaN quantities and prices
+    if isinstance(left, np.ndarray) and left.dtype.kind == "f":
+        return np.array_equal(left, right, equal_nan=True)
+    return list(left) == list(right)
+
+
+def _same_output(first, second):
+    """Chunk-by-chunk equality, ignoring the salted password hashes."""
+    pairs = list(zip(Generator(first).chunks(), Generator(second).chunks()))
+    return all(
+        left_table is right_table and left.keys() == right.keys() and all(
+            _equal(left[name], right[name]) for name in left if name != "hashed_password"
+        )
+        for (left_table, left), (right_table, right) in pairs
+    )
+
+
+def test_output_is_determined_by_seed_and_end_date():
+    assert _same_output(SPEC, SPEC)
+    assert not _same_output(SPEC, replace(SPEC, seed=6))
+
+
+def test_holdings_reference_generated_portfolios():
+    chunks = list(Generator(SPEC).chunks())
+    portfolio_ids = np.concatenate([data["id"] for table, data in chunks if table.name == "portfolios"])
+    holding_portfolios = np.concatenate([data["portfolio_id"] for table, data in chunks if table.name == "holdings"])
+
+    assert set(holding_portfolios) <= set(portfolio_ids)
+    assert (np.bincount(holding_portfolios) <= SPEC.max_holdings).all()
+
+
+@pytest.mark.asyncio
+async def test_generate_writes_every_chunk(db):
+    rows = await generate(SPEC)
+
+    assert rows["users"] == SPEC.users
+    assert rows["news_articles"] > 0
+    assert await db.scalar(select(func.count()).select_from(Holding)) == rows["holdings"]
+    # Raw writes fill scalar Python-side defaults too
+    assert await db.scalar(select(func.count()).select_from(Portfolio).where(Portfolio.is_active.is_(None))) == 0
+
+
+@pytest.mark.asyncio
+async def test_generate_refuses_a_populated_database(db):
+    await generate(SPEC)
+
+    with pytest.raises(RuntimeError, match="empty database"):
+        await generate(SPEC)
@@ -0,0 +1,76 @@
+import httpx
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.main import app
+
+
+def _client(host="127.0.0.1"):
+    transport = httpx.ASGITransport(app=app, client=(host, 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_served_to_loopback_only():
+    async with _client() as client:
+        assert (await client.get("/metrics")).status_code == 200
+    async with _client("203.0.113.9") as client:
+        assert (await client.get("/metrics")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_metrics_token_admits_other_clients(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+
+    async with _client("203.0.113.9") as client:
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 403
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_allowed_networks_are_configurable(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_allowed_networks", "10.0.0.0/8")
+
+    async with _client("10.2.3.4") as client:
+        assert (await client.get("/metrics")).status_code == 200
+    async with _client() as client:
+        assert (await client.get("/metrics")).status_code == 403
+
+
+def test_counter_and_histogram_rendering():
+    counter = metrics.Counter("jobs_total", "Jobs run.", ("queue",))
+    counter.inc("default")
+    counter.inc("default", amount=2)
+    counter.inc('say "hi"\n')
+    histogram = metrics.Histogram("job_seconds", "Job time.", (0.1, 1.0), ("queue",))
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, "default")
+
+    assert counter.render() == [
+        "# HELP jobs_total Jobs run.",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="default"} 3',
+        'jobs_total{queue="say \\"hi\\"\\n"} 1',
+    ]
+    assert histogram.render()[2:] == [
+        'job_seconds_bucket{queue="default",le="0.1"} 1',
+        'job_seconds_bucket{queue="default",le="1"} 2',
+        'job_seconds_bucket{queue="default",le="+Inf"} 3',
+        'job_seconds_sum{queue="default"} 3.55',
+        'job_seconds_count{queue="default"} 3',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template():
+    async with _client() as client:
+        await client.get("/api/v1/simulation/12345")
+        await client.get("/no/such/page")
+        body = (await client.get("/metrics")).text
+
+    assert 'http_requests_total{method="GET",route="/api/v1/simulation/{simulation_id}",status="' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert "12345" not in body
+    # Scrapes are not counted as traffic
+    assert 'route="/metrics"' not in body
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models.news import ArchivedNewsArticle, NewsArticle
+from app.services.news_retention import archive_old_articles
+
+
+async def _articles(db):
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        NewsArticle(title=f"Old {i}", source="wire", category="market", content=f"body {i}",
+                    summary="summary", excerpt="excerpt", keywords=["rates"], published_at=now - timedelta(days=200 + i))
+        for i in range(5)
+    )
+    db.add(NewsArticle(title="Fresh", source="wire", content="fresh body", published_at=now - timedelta(days=1)))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_old_articles_are_archived_and_stripped(db):
+    await _articles(db)
+
+    assert await archive_old_articles(retention_days=90, batch_size=2, pause_seconds=0) == 5
+
+    db.expire_all()
+    archived = (await db.execute(select(ArchivedNewsArticle).order_by(ArchivedNewsArticle.id))).scalars().all()
+    assert [(row.title, row.content, row.summary, row.keywords) for row in archived] == [
+        (f"Old {i}", f"body {i}", "summary", ["rates"]) for i in range(5)
+    ]
+    hot = {row.title: row for row in (await db.execute(select(NewsArticle))).scalars()}
+    for i in range(5):
+        old = hot[f"Old {i}"]
+        assert old.is_archived and old.category == "market"
+        assert (old.content, old.summary, old.excerpt) == (None, None, None)
+    assert not hot["Fresh"].is_archived and hot["Fresh"].content == "fresh body"
+
+
+@pytest.mark.asyncio
+async def test_rerun_archives_nothing_twice(db):
+    await _articles(db)
+    await archive_old_articles(retention_days=90, batch_size=10, pause_seconds=0)
+
+    assert await archive_old_articles(retention_days=90, batch_size=10, pause_seconds=0) == 0
+    assert len((await db.execute(select(ArchivedNewsArticle.id))).all()) == 5
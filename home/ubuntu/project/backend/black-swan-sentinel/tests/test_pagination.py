@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, literal_column, select, update
+
+from app.models.user import User
+from app.utils.pagination import decode_cursor, encode_cursor, paginate
+
+
+async def _add_users(db, count):
+    db.add_all(
+        User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+        for i in range(count)
+    )
+    await db.commit()
+
+
+async def _walk(db, limit):
+    """Every page of the user list, stopping if a cursor repeats."""
+    pages, cursor, seen = [], None, set()
+    while True:
+        rows, cursor = await paginate(db, select(User), User, cursor, limit)
+        pages.append([user.id for user in rows])
+        if cursor is None:
+            return pages
+        assert cursor not in seen, f"cursor repeated after {len(pages)} pages"
+        seen.add(cursor)
+
+
+@pytest.mark.asyncio
+async def test_same_second_server_default_timestamps(db):
+    await _add_users(db, 25)
+    # What func.now() stores on SQLite: whole seconds, no fraction
+    await db.execute(update(User).values(created_at=literal_column("'2025-01-01 10:00:00'")))
+    await db.commit()
+
+    pages = await _walk(db, limit=10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == list(range(25, 0, -1))
+
+
+@pytest.mark.asyncio
+async def test_mixed_timestamp_precision(db):
+    await _add_users(db, 12)
+    await db.execute(update(User).where(User.id <= 6).values(created_at=literal_column("'2025-01-01 10:00:00'")))
+    await db.execute(update(User).where(User.id > 6).values(created_at=literal_column("'2025-01-01 10:00:00.500000'")))
+    await db.commit()
+
+    pages = await _walk(db, limit=5)
+
+    assert sum(pages, []) == list(range(12, 0, -1))
+
+
+@pytest.mark.asyncio
+async def test_next_page_seeks_the_index(db):
+    await _add_users(db, 3)
+    _, cursor = await paginate(db, select(User), User, None, 1)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        await paginate(db, select(User), User, cursor, 1)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+    raw = await (await db.connection()).get_raw_connection()
+
+    plan = " ".join(row[-1] for row in await raw.driver_connection.execute_fetchall(f"EXPLAIN QUERY PLAN {statement}", parameters))
+
+    assert "SEARCH" in plan and "ix_users_created_at_id" in plan, plan
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 1, 10, 0, 0, 500000)
+    assert decode_cursor(encode_cursor(created_at, 7)) == (created_at.isoformat(), 7)
@@ -0,0 +1,71 @@
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+
+from app.core import auth_cache
+from app.core.config import settings
+from app.core.query_audit import assert_max_queries
+from app.core.security import create_access_token
+from app.main import app
+from app.models.news import NewsArticle
+from app.models.playbook import DefensePlaybook
+from app.models.simulation import DamageReport, DisasterSimulation
+from app.models.user import User
+
+ROWS = 25
+
+# (path, statement budget); authentication is served from its cache, so budgets
+# count only the endpoint's own statements
+ENDPOINT_BUDGETS = [
+    ("/api/v1/users/", 1),
+    ("/api/v1/news/", 1),
+    ("/api/v1/playbook/", 1),
+    ("/api/v1/playbook/1", 1),
+    ("/api/v1/simulation/history", 1),
+    # Simulation plus one selectin query for its damage reports
+    ("/api/v1/simulation/1", 2),
+]
+
+
+@pytest_asyncio.fixture
+async def client(db, monkeypatch):
+    """A client for the app over a database with related rows for every audited endpoint."""
+    monkeypatch.setattr(settings, "response_cache_enabled", False)
+    auth_cache.clear()
+    await db.execute(insert(User), [
+        {"email": f"user{i}@example.com", "username": f"user{i}", "hashed_password": "x", "is_admin": i == 0}
+        for i in range(ROWS)
+    ])
+    await db.execute(insert(NewsArticle), [
+        {"title": f"Headline {i}", "source": "wire"} for i in range(ROWS)
+    ])
+    await db.execute(insert(DefensePlaybook), [
+        {"user_id": 1, "title": f"Playbook {i}", "scenario_type": "market_crash", "risk_level": "high",
+         "strategies": []}
+        for i in range(ROWS)
+    ])
+    await db.execute(insert(DisasterSimulation), [
+        {"user_id": 1, "name": f"Simulation {i}", "scenario_type": "market_crash", "scenario_config": {}}
+        for i in range(ROWS)
+    ])
+    await db.execute(insert(DamageReport), [
+        {"simulation_id": 1 + i % 3, "total_portfolio_loss": 1000.0, "total_portfolio_loss_percent": 10.0}
+        for i in range(ROWS)
+    ])
+    await db.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user0', 'user_id': 1})}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        # Warm up authentication caches so every endpoint is measured the same way
+        (await client.get("/api/v1/auth/me")).raise_for_status()
+        yield client
+    auth_cache.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, budget", ENDPOINT_BUDGETS)
+async def test_read_endpoint_stays_within_query_budget(client, path, budget):
+    with assert_max_queries(budget, max_repeats=1):
+        response = await client.get(path)
+    assert response.status_code == 200, response.text
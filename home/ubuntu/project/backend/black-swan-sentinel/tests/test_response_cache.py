@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core.response_cache import RedisBackend, ResponseCache
+from app.models.portfolio import Portfolio
+
+pytest.importorskip("redis")
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the version counters, shared between backends."""
+
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.keys = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        await asyncio.sleep(0)
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        for key in self.keys:
+            self.redis.values[key] = self.redis.values.get(key, 0) + 1
+
+
+def _worker(redis):
+    backend = RedisBackend("redis://localhost:6379/0", ttl=60)
+    backend._redis = redis
+    return ResponseCache(backend)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_workers_share_keys_once_a_bump_is_published():
+    redis = FakeRedis()
+    writer, reader = _worker(redis), _worker(redis)
+    before = await reader.key(1, "/api/v1/portfolio/", b"", [Portfolio])
+
+    writer.bump(["portfolios"])
+    # The writer bypasses the cache until its INCR reaches Redis
+    assert await writer.key(1, "/api/v1/portfolio/", b"", [Portfolio]) is None
+
+    await _settle()
+    after = await writer.key(1, "/api/v1/portfolio/", b"", [Portfolio])
+    assert after is not None and after != before
+    assert await reader.key(1, "/api/v1/portfolio/", b"", [Portfolio]) == after
+
+
+@pytest.mark.asyncio
+async def test_failed_bump_bypasses_the_cache_until_a_later_one_succeeds():
+    redis = FakeRedis()
+    cache = _worker(redis)
+
+    redis.fail = True
+    cache.bump(["portfolios"])
+    await _settle()
+    assert await cache.key(1, "/api/v1/portfolio/", b"", [Portfolio]) is None
+
+    redis.fail = False
+    cache.bump(["portfolios"])
+    await _settle()
+    assert await cache.key(1, "/api/v1/portfolio/", b"", [Portfolio]) is not None
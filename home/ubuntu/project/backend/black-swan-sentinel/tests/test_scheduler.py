@@ -0,0 +1,9 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_app_lifespan_runs_twice():
+    for _ in range(2):
+        with TestClient(app) as client:
+            assert client.get("/health").status_code == 200
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setattr(security, "_hash_limit", 1)
+
+
+@pytest.mark.asyncio
+async def test_hashing_works_after_shutdown():
+    security.shutdown_password_hashing()
+    assert await security._run_hash(pow, 2, 10) == 1024
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hash_holds_its_slot_until_the_thread_finishes(one_slot):
+    release = threading.Event()
+    task = asyncio.create_task(security._run_hash(release.wait))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The thread is still busy with the cancelled call
+    with pytest.raises(HTTPException) as error:
+        await security._run_hash(pow, 2, 10)
+    assert error.value.status_code == 429
+
+    release.set()
+    for _ in range(100):
+        if not security._hash_pending:
+            break
+        await asyncio.sleep(0.01)
+    assert await security._run_hash(pow, 2, 10) == 1024
@@ -0,0 +1,132 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import sqlite
+from app.core.database import Base
+from app.core.write_queue import WriteQueue
+from app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_concurrent_read_then_write_transactions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'wal.db')}")
+    sqlite.configure_engine(engine)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def request(i):
+        async with sessions() as db:
+            await db.execute(select(func.count(User.id)))
+            await asyncio.sleep(0)
+            db.add(User(email=f"wal{i}@example.com", username=f"wal{i}", hashed_password="x"))
+            await db.flush()
+            async with db.begin_nested():
+                await db.execute(text("SELECT 1"))
+            await db.commit()
+
+    async def read_only():
+        async with sessions() as db:
+            await db.execute(select(1))
+
+    outcomes = await asyncio.gather(*(request(i) for i in range(50)), *(read_only() for _ in range(10)), return_exceptions=True)
+
+    assert [outcome for outcome in outcomes if isinstance(outcome, Exception)] == []
+    assert not sqlite.write_lock.locked()
+    async with sessions() as db:
+        assert (await db.execute(select(func.count(User.id)))).scalar_one() == 50
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_transaction_releases_the_lock(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'wal.db')}")
+    sqlite.configure_engine(engine)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    with pytest.raises(Exception):
+        async with sessions() as db, db.begin():
+            db.add_all([
+                User(email="same@example.com", username="a", hashed_password="x"),
+                User(email="same@example.com", username="b", hashed_password="x"),
+            ])
+
+    assert not sqlite.write_lock.locked()
+    await engine.dispose()
+
+
+async def _engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'wal.db')}")
+    sqlite.configure_engine(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_read_only_transactions_take_no_lock(tmp_path):
+    engine, sessions = await _engine(tmp_path)
+    async with sessions() as reader:
+        await reader.execute(select(func.count(User.id)))
+        assert not sqlite.write_lock.locked()
+
+        # A writer is not held up by the open read transaction
+        async def write():
+            async with sessions() as db:
+                db.add(User(email="w@example.com", username="w", hashed_password="x"))
+                await db.commit()
+        await asyncio.wait_for(write(), timeout=1)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_write_after_another_commit_upgrades_the_transaction(tmp_path):
+    engine, sessions = await _engine(tmp_path)
+    async with sessions() as first, sessions() as second:
+        await first.execute(select(func.count(User.id)))
+        second.add(User(email="b@example.com", username="b", hashed_password="x"))
+        await second.commit()
+
+        # A savepoint opened before the first write survives the restart to BEGIN IMMEDIATE
+        async with first.begin_nested():
+            await first.execute(select(1))
+            first.add(User(email="a@example.com", username="a", hashed_password="x"))
+            await first.flush()
+        assert sqlite.write_lock.locked()
+        await first.commit()
+
+    assert not sqlite.write_lock.locked()
+    async with sessions() as db:
+        assert (await db.execute(select(func.count(User.id)))).scalar_one() == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_submitting_while_holding_the_lock_fails_instead_of_hanging(tmp_path):
+    engine, sessions = await _engine(tmp_path)
+    queue = WriteQueue(session_factory=sessions)
+    queue.start()
+
+    async def request():
+        async with sessions() as db:
+            db.add(User(email="q@example.com", username="q", hashed_password="x"))
+            await db.flush()
+
+            async def work(other):
+                await other.execute(select(1))
+
+            with pytest.raises(RuntimeError):
+                await queue.submit(work)
+            await db.rollback()
+
+    try:
+        await asyncio.wait_for(request(), timeout=1)
+    finally:
+        await queue.stop()
+        await engine.dispose()
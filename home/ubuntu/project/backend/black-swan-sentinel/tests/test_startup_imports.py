@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+from scripts.profile_startup import HEAVY_MODULES, PROJECT_ROOT, parse_importtime
+
+# The test database from conftest is inherited through the environment
+_LOADED = "import json, sys, app.main; print(json.dumps(sorted(sys.modules)))"
+
+
+def test_importing_the_app_loads_no_heavy_modules():
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT}
+    result = subprocess.run([sys.executable, "-c", _LOADED], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    loaded = {name.split(".")[0] for name in json.loads(result.stdout.strip().splitlines()[-1])}
+    assert "app" in loaded
+    assert loaded.isdisjoint(HEAVY_MODULES)
+
+
+def test_parse_importtime_skips_the_header():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   numpy.core\n"
+        "import time:        80 |        200 | numpy\n"
+        "unrelated warning\n"
+    )
+
+    assert parse_importtime(stderr) == [("numpy.core", 120, 120), ("numpy", 80, 200)]
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import insert
+
+from app.models.news import NewsSubscription
+from app.models.user import User
+from app.services.subscription_matcher import SubscriptionEntry, SubscriptionMatcher, subscription_matcher
+
+
+def _entry(subscription_id, user_id=1, categories=(), sectors=(), keywords=(), min_impact_score=50.0):
+    return SubscriptionEntry(
+        subscription_id, user_id, frozenset(categories), frozenset(sectors), frozenset(keywords),
+        min_impact_score, "immediate", True, True
+    )
+
+
+def _matched(matcher, **terms):
+    return sorted(entry.subscription_id for entry in matcher.match(**terms))
+
+
+def test_match_on_any_term():
+    matcher = SubscriptionMatcher()
+    matcher.add(_entry(1, categories={"market"}))
+    matcher.add(_entry(2, sectors={"banking"}))
+    matcher.add(_entry(3, keywords={"acme"}))
+    matcher.add(_entry(4, sectors={"energy"}))
+
+    assert _matched(matcher, categories=["Market"], sectors=[" BANKING "], keywords=["ACME"]) == [1, 2, 3]
+    assert _matched(matcher, sectors=["retail"]) == []
+
+
+def test_impact_threshold():
+    matcher = SubscriptionMatcher()
+    matcher.add(_entry(1, sectors={"banking"}, min_impact_score=40.0))
+    matcher.add(_entry(2, sectors={"banking"}, min_impact_score=45.0))
+    matcher.add(_entry(3, sectors={"banking"}, min_impact_score=70.0))
+
+    assert _matched(matcher, sectors=["banking"], impact_score=44.0) == [1]
+    assert _matched(matcher, sectors=["banking"], impact_score=45.0) == [1, 2]
+    # Alerts without a score pass every threshold
+    assert _matched(matcher, sectors=["banking"]) == [1, 2, 3]
+
+
+def test_wildcards_and_removal():
+    matcher = SubscriptionMatcher()
+    matcher.add(_entry(1, min_impact_score=60.0))
+    matcher.add(_entry(2, user_id=2, sectors={"banking"}))
+
+    assert _matched(matcher, sectors=["energy"], impact_score=80.0) == [1]
+    assert _matched(matcher, sectors=["energy"], impact_score=50.0) == []
+
+    matcher.add(_entry(2, user_id=2, sectors={"energy"}))
+    assert _matched(matcher, sectors=["banking"], impact_score=50.0) == []
+    assert _matched(matcher, sectors=["energy"], impact_score=50.0) == [2]
+
+    matcher.deactivate(2, 2)
+    assert _matched(matcher, sectors=["energy"], impact_score=50.0) == []
+    assert matcher.user_subscriptions(2) == []
+    matcher.remove(2)
+    assert matcher.user_subscriptions(2) is None
+    assert len(matcher) == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_bulk_inserts(db):
+    user = User(email="s@example.com", username="subscriber", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    # Core inserts bypass the commit hooks, like bulk imports and other workers
+    await db.execute(insert(NewsSubscription), [
+        {"user_id": user.id, "sectors": ["banking"]},
+        {"user_id": user.id, "sectors": ["energy"], "is_active": False},
+    ])
+    await db.commit()
+    subscription_matcher.clear()
+
+    try:
+        assert subscription_matcher.match(sectors=["banking"]) == []
+        await subscription_matcher.refresh()
+        assert [entry.user_id for entry in subscription_matcher.match(sectors=["banking"])] == [user.id]
+        assert subscription_matcher.match(sectors=["energy"]) == []
+        assert len(subscription_matcher.user_subscriptions(user.id)) == 1
+    finally:
+        subscription_matcher.clear()
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from scripts.synthetic_dataset import DatasetSpec, build_dataset, generate_rows
+
+SPEC = DatasetSpec(users=4, portfolios_per_user=2, holdings_per_portfolio=3, transactions_per_portfolio=5,
+                   expenses_per_user=2, articles=7, subscriptions_per_user=1, simulations_per_user=1, seed=3)
+
+
+def _snapshot(seed):
+    rows = generate_rows(DatasetSpec(**{**SPEC.__dict__, "seed": seed}), datetime(2025, 1, 1))
+    # Password hashes are salted; everything else follows from the seed
+    return {
+        model.__tablename__: [{k: v for k, v in row.items() if k != "hashed_password"} for row in generated]
+        for model, generated in rows.items()
+    }
+
+
+def test_rows_are_determined_by_the_seed():
+    assert _snapshot(3) == _snapshot(3)
+    assert _snapshot(3) != _snapshot(4)
+
+
+@pytest.mark.asyncio
+async def test_build_fills_every_table_to_spec(db):
+    counts = await build_dataset(SPEC)
+
+    assert counts["users"] == 4
+    assert counts["portfolios"] == 8
+    assert counts["holdings"] == 24
+    assert counts["transactions"] == 40
+    assert counts["news_articles"] == 7
+    assert counts["news_subscriptions"] == 4
+    assert counts["disaster_simulations"] == 4
+
+    with pytest.raises(RuntimeError, match="empty database"):
+        await build_dataset(SPEC)
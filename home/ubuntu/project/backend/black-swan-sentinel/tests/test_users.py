@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, select
+
+from app.api.v1.endpoints.users import delete_user
+from app.models.news import NewsSubscription
+from app.models.portfolio import Income
+from app.models.risk import RiskAlert, RiskAssessment, RiskThreshold
+from app.models.simulation import DisasterSimulation, SimulationResult
+from app.models.user import User
+from app.schemas.auth import UserUpdate
+from app.services.subscription_matcher import subscription_matcher
+
+
+@pytest.mark.parametrize("field", ["email", "username", "risk_tolerance"])
+def test_update_rejects_null_for_required_fields(field):
+    with pytest.raises(ValidationError):
+        UserUpdate(**{field: None})
+
+
+def test_update_allows_omitted_and_nullable_fields():
+    assert UserUpdate(full_name=None).model_dump(exclude_unset=True) == {"full_name": None}
+
+
+@pytest.mark.asyncio
+async def test_delete_user_removes_rows_without_relationships(db):
+    user = User(email="gone@example.com", username="gone", hashed_password="x")
+    admin = User(email="admin@example.com", username="admin", hashed_password="x", is_admin=True)
+    db.add_all([user, admin])
+    await db.flush()
+    assessment = RiskAssessment(user_id=user.id, overall_risk_score=70.0, risk_level="high")
+    simulation = DisasterSimulation(user_id=user.id, name="Crash", scenario_type="market_crash", scenario_config={})
+    subscription = NewsSubscription(user_id=user.id, keywords=["rates"])
+    db.add_all([assessment, simulation, subscription])
+    await db.flush()
+    db.add_all([
+        Income(user_id=user.id, source="salary", amount=1000.0, frequency="monthly", income_date=datetime(2024, 1, 1)),
+        RiskThreshold(user_id=user.id),
+        RiskAlert(assessment_id=assessment.id, user_id=user.id, alert_type="liquidity", severity="high",
+                  title="Low cash", message="Cash is low"),
+        SimulationResult(simulation_id=simulation.id, iteration_number=1, final_portfolio_value=1.0,
+                         total_loss=0.0, loss_percentage=0.0),
+    ])
+    await db.commit()
+    assert any(entry.user_id == user.id for entry in subscription_matcher.match([], [], ["rates"], None))
+
+    await delete_user(user.id, current_user=admin, db=db)
+
+    for model in (Income, NewsSubscription, RiskThreshold, RiskAlert, SimulationResult):
+        assert (await db.execute(select(func.count()).select_from(model))).scalar_one() == 0
+    assert not any(entry.user_id == user.id for entry in subscription_matcher.match([], [], ["rates"], None))